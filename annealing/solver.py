@@ -52,7 +52,9 @@ def compute_distances(grid, target):
     return dist
 
 def evaluate(grid, spawns, target):
-    dist = compute_distances(grid, target)
+    return score_of(compute_distances(grid, target), spawns)
+
+def score_of(dist, spawns):
     values = []
     for sr, sc in spawns:
         d = dist[sr][sc]
@@ -120,74 +122,512 @@ def remove_piece(grid, coords):
     for (r,c) in coords:
         grid[r][c] = "."
 
+def solution_lines(grid):
+    """Rows with every piece written as '#', the solution-file convention
+    `interdiction.grid.parse_solution` reads (e.g. `--seed` of the MILP CLI).
+    """
+    return ["".join(ch if ch in ".STX#" else "#" for ch in row)
+            for row in grid]
+
+def write_solution(grid, path):
+    with open(path, "w") as f:
+        for line in solution_lines(grid):
+            f.write(line + "\n")
+
+# ---------------------------
+# Path-guided proposals
+# ---------------------------
+DIRS = [(-1,0),(1,0),(0,-1),(0,1)]
+
+def propose_add(R, C, dag_cells, proposal, path_bias):
+    """(symbol, shape, r, c): on the binding DAG with prob. path_bias."""
+    symbol, orientations = random.choice(PIECES)
+    shape = random.choice(orientations)
+    if proposal == "path" and dag_cells and random.random() < path_bias:
+        pr, pc = random.choice(dag_cells)
+        dr, dc = random.choice(shape)     # anchor so this piece cell hits the DAG
+        return symbol, shape, pr - dr, pc - dc
+    return symbol, shape, random.randrange(R), random.randrange(C)
+
+def propose_remove(store, near, proposal, path_bias):
+    if proposal == "path" and near and random.random() < path_bias:
+        return store.get(random.choice(near))
+    return store.choice()
+
+def pieces_near(store, dag):
+    """Keys of placed pieces with a cell 4-adjacent to the DAG."""
+    near = set()
+    owner = store.owner
+    for r, c in dag:
+        for dr, dc in DIRS:
+            key = owner.get((r+dr, c+dc))
+            if key is not None:
+                near.add(key)
+    return list(near)
+
+# ---------------------------
+# Incremental distances
+# ---------------------------
+WALKABLE = ('.','S','T','X')
+FULL_BFS_FRACTION = 0.05    # share of changed cells past which a full BFS is cheaper
+
+def _waves(seeds, q):
+    """Yield (distance, cell) in nondecreasing distance: the sorted seeds
+    merged with FIFO queue `q`, which the caller extends by distance + 1.
+    """
+    seeds.sort()
+    i, n = 0, len(seeds)
+    while i < n or q:
+        if i < n and (not q or seeds[i][0] <= q[0][0]):
+            yield seeds[i]
+            i += 1
+        else:
+            yield q.popleft()
+
+class IncrementalDistances:
+    """The `compute_distances` field, repaired locally after each piece move.
+
+    Cells are flat indices r*C + c with precomputed neighbor lists. Blocking
+    only lengthens distances, and only for cells that lose every parent (a
+    neighbor one step closer); those are found in distance order and
+    re-settled from their unaffected neighbors. Unblocking only shortens
+    distances, so a relaxation from the freed cells suffices. A move that
+    changes more than FULL_BFS_FRACTION of the cells (a cut or shortcut
+    through a long maze corridor) falls back to one plain BFS, which is
+    cheaper per cell.
+
+    Writes are logged until `commit()`; `rollback()` undoes a rejected move.
+    Several roots give the distance to the nearest of them.
+    """
+
+    def __init__(self, grid, *roots):
+        R, C = len(grid), len(grid[0])
+        self.R, self.C = R, C
+        self.roots = [r * C + c for r, c in roots]
+        self.open = [grid[i // C][i % C] in WALKABLE for i in range(R * C)]
+        self.adj = []
+        for r in range(R):
+            for c in range(C):
+                self.adj.append([nr * C + nc for nr, nc in
+                                 ((r-1, c), (r+1, c), (r, c-1), (r, c+1))
+                                 if 0 <= nr < R and 0 <= nc < C])
+        self.dist = self._bfs()
+        self.log = []       # (cell, old distance) since the last commit
+        self.saved = None   # whole field before a full recompute
+        self.opened = []    # (cell, old walkability) since the last commit
+
+    def _bfs(self):
+        dist = [None] * (self.R * self.C)
+        for u in self.roots:
+            dist[u] = 0
+        adj, open_ = self.adj, self.open
+        level, d = list(self.roots), 0
+        while level:
+            d += 1
+            nxt = []
+            for u in level:
+                for w in adj[u]:
+                    if dist[w] is None and open_[w]:
+                        dist[w] = d
+                        nxt.append(w)
+            level = nxt
+        return dist
+
+    def rows(self):
+        """The field as `compute_distances` returns it."""
+        C = self.C
+        return [self.dist[r*C:(r+1)*C] for r in range(self.R)]
+
+    def score(self, spawns):
+        C, dist = self.C, self.dist
+        best = None
+        for r, c in spawns:
+            d = dist[r*C + c]
+            if d is None:
+                return -1e6
+            if best is None or d < best:
+                best = d
+        return best
+
+    def binding_dag(self, spawns):
+        """Cells on any shortest path from the binding (closest) spawns to the
+        target, as (r, c). A piece covering none of them can't raise the score.
+        """
+        C, dist, adj = self.C, self.dist, self.adj
+        ds = [dist[r*C + c] for r, c in spawns]
+        if any(d is None for d in ds):
+            return set()
+        best = min(ds)
+        dag = {r*C + c for (r, c), d in zip(spawns, ds) if d == best}
+        stack = list(dag)
+        while stack:
+            u = stack.pop()
+            d = dist[u] - 1
+            for w in adj[u]:
+                if dist[w] == d and w not in dag:
+                    dag.add(w)
+                    stack.append(w)
+        return {(u // C, u % C) for u in dag}
+
+    def detour(self, coords, from_spawns):
+        """Length of the best spawn->target path through the walls `coords`
+        if they were removed, entering and leaving them once; `from_spawns`
+        is the field rooted at the spawns. An upper bound on the score after
+        the removal (it ignores paths that leave the cells and come back),
+        found without touching either field.
+        """
+        C, dist, adj, back = self.C, self.dist, self.adj, from_spawns.dist
+        cells = [r*C + c for r, c in coords]
+        inside = set(cells)
+        enter, leave = {}, {}
+        for u in cells:
+            e = x = None
+            for w in adj[u]:
+                if w in inside:
+                    continue
+                if back[w] is not None and (e is None or back[w] < e):
+                    e = back[w]
+                if dist[w] is not None and (x is None or dist[w] < x):
+                    x = dist[w]
+            enter[u], leave[u] = e, x
+        best = math.inf
+        for u in cells:
+            if enter[u] is None:
+                continue
+            # BFS inside the piece from the entry cell u
+            seen, level, d = {u}, [u], 0
+            while level:
+                for v in level:
+                    if leave[v] is not None:
+                        best = min(best, enter[u] + d + leave[v] + 2)
+                nxt = []
+                for v in level:
+                    for w in adj[v]:
+                        if w in inside and w not in seen:
+                            seen.add(w)
+                            nxt.append(w)
+                level, d = nxt, d + 1
+        return best
+
+    def _toggle(self, coords, walkable):
+        C = self.C
+        cells = [r*C + c for r, c in coords]
+        for u in cells:
+            self.opened.append((u, self.open[u]))
+            self.open[u] = walkable
+        return cells
+
+    def _full(self):
+        dist = self.dist
+        for u, d in reversed(self.log):
+            dist[u] = d
+        self.log = []
+        self.saved = dist
+        self.dist = self._bfs()
+
+    def block(self, coords):
+        cells = self._toggle(coords, False)
+        dist, adj, open_, log = self.dist, self.adj, self.open, self.log
+        seeds = []
+        for u in cells:
+            d = dist[u]
+            if d is None:
+                continue        # already cut off: nothing depended on it
+            log.append((u, d))
+            dist[u] = None
+            for w in adj[u]:
+                if dist[w] == d + 1:
+                    seeds.append((d + 1, w))
+
+        # cells whose every parent is blocked or affected, in distance order
+        limit = FULL_BFS_FRACTION * len(dist)
+        affected = set()
+        seen = set()
+        q = deque()
+        for d, u in _waves(seeds, q):
+            if u in seen or not open_[u]:
+                continue
+            seen.add(u)
+            p = d - 1
+            for w in adj[u]:
+                if dist[w] == p and w not in affected:
+                    break
+            else:
+                affected.add(u)
+                if len(affected) > limit:
+                    self._full()
+                    return
+                n = d + 1
+                for w in adj[u]:
+                    if dist[w] == n:
+                        q.append((n, w))
+        if not affected:
+            return
+
+        # re-settle the affected cells from their unaffected boundary
+        for u in affected:
+            log.append((u, dist[u]))
+            dist[u] = None
+        seeds = []
+        for u in affected:
+            best = None
+            for w in adj[u]:
+                dw = dist[w]
+                if dw is not None and (best is None or dw < best):
+                    best = dw
+            if best is not None:
+                dist[u] = best + 1
+                seeds.append((best + 1, u))
+        self._settle(seeds, q, affected)
+
+    def unblock(self, coords):
+        cells = self._toggle(coords, True)
+        dist, adj, log = self.dist, self.adj, self.log
+        seeds = []
+        for u in cells:
+            best = None
+            for w in adj[u]:
+                dw = dist[w]
+                if dw is not None and (best is None or dw < best):
+                    best = dw
+            if best is not None:
+                log.append((u, dist[u]))
+                dist[u] = best + 1
+                seeds.append((best + 1, u))
+        if self._settle(seeds, deque(), None) is False:
+            self._full()
+
+    def _settle(self, seeds, q, within):
+        """Relax outward from the labeled seeds; a label is set on push and
+        skipped when popped if it was improved since. `within` None means an
+        unblock: any open cell may shorten, every write is logged, and False
+        is returned past the full-BFS limit. Otherwise only cells of `within`
+        (already logged) are labeled.
+        """
+        dist, adj, open_, log = self.dist, self.adj, self.open, self.log
+        limit = FULL_BFS_FRACTION * len(dist)
+        for d, u in _waves(seeds, q):
+            if dist[u] != d:
+                continue
+            n = d + 1
+            for w in adj[u]:
+                old = dist[w]
+                if old is not None and old <= n:
+                    continue
+                if within is None:
+                    if not open_[w]:
+                        continue
+                    log.append((w, old))
+                elif w not in within:
+                    continue
+                dist[w] = n
+                q.append((n, w))
+            if within is None and len(log) > limit:
+                return False
+        return True
+
+    def commit(self):
+        """Keep the changes since the last commit."""
+        self.log, self.saved, self.opened = [], None, []
+
+    def rollback(self):
+        for u, was in reversed(self.opened):
+            self.open[u] = was
+        if self.saved is not None:
+            self.dist = self.saved
+        else:
+            dist = self.dist
+            for u, d in reversed(self.log):
+                dist[u] = d
+        self.commit()
+
+# ---------------------------
+# Piece store
+# ---------------------------
+class PieceStore:
+    """Placed pieces with O(1) add, remove and uniform random choice.
+
+    Pieces live in a list; `index` maps a piece's coords to its slot and a
+    removal swaps the last piece into the hole. `owner` maps each covered
+    cell to the coords of its piece.
+    """
+
+    def __init__(self):
+        self.pieces = []    # (coords, symbol)
+        self.index = {}     # coords -> slot in pieces
+        self.owner = {}     # cell -> coords
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def add(self, coords, symbol):
+        coords = tuple(coords)
+        self.index[coords] = len(self.pieces)
+        self.pieces.append((coords, symbol))
+        for cell in coords:
+            self.owner[cell] = coords
+
+    def remove(self, coords):
+        i = self.index.pop(coords)
+        last = self.pieces.pop()
+        if last[0] != coords:
+            self.pieces[i] = last
+            self.index[last[0]] = i
+        for cell in coords:
+            del self.owner[cell]
+
+    def get(self, coords):
+        return self.pieces[self.index[coords]]
+
+    def choice(self):
+        return random.choice(self.pieces)
+
 # ---------------------------
 # Simulated Annealing with pieces
 # ---------------------------
 def simulated_annealing(lines, spawns, target, obstacles, unbuildables,
-                        max_iter=200000, T0=50.0, alpha=0.9995):
+                        max_iter=200000, T0=50.0, alpha=0.9995,
+                        proposal="path", path_bias=0.9, target_score=None,
+                        stats=None, start=(), time_limit=None, verbose=True):
+    """Anneal piece placements; returns (best_grid, best_score).
+
+    proposal="path" samples add moves that cover a cell of the current
+    binding shortest-path DAG and prefers removing pieces next to it (each
+    with probability path_bias); "uniform" is the original random (r, c).
+    The chain starts from the (coords, symbol) pieces in `start` and stops
+    after max_iter iterations or time_limit seconds. `stats`, if given, is
+    filled with acceptance and throughput counters, when `target_score` was
+    first reached, and the final chain state (`pieces`, `score`).
+    """
     R, C = len(lines), len(lines[0])
 
     # Mutable grid
     grid = [list(row) for row in lines]
+    store = PieceStore()
+    for coords, symbol in start:
+        place_piece(grid, coords, symbol)
+        store.add(coords, symbol)
 
     best_grid = [row[:] for row in grid]
-    best_score = evaluate(grid, spawns, target)
-
     current_grid = [row[:] for row in grid]
+    field = IncrementalDistances(current_grid, target)
+    # path-guided removals hit the binding path and are often rejected; a
+    # field rooted at the spawns lets `detour` reject them before a repair.
+    # Uniform removals are nearly always free, so they skip its upkeep.
+    from_spawns = (IncrementalDistances(current_grid, *spawns)
+                   if proposal == "path" else None)
+    best_score = field.score(spawns)
     current_score = best_score
 
-    placed_pieces = []  # list of (coords, symbol)
+    dag_stale = True    # the DAG and the pieces near it are rebuilt lazily
+    dag, dag_cells, near = set(), [], None
 
     T = T0
     start_time = time.time()
+    proposed = accepted = changed = 0   # changed: accepted with delta != 0
+    reached = None      # (iteration, seconds) when target_score was first hit
 
+    deadline = None if time_limit is None else start_time + time_limit
+    it = -1
     for it in range(max_iter):
+        if deadline is not None and it % 256 == 0 and time.time() >= deadline:
+            break
         # bias towards adding when few pieces present
-        move_type = "add" if not placed_pieces or random.random() < 0.6 else "remove"
+        move_type = "add" if not store or random.random() < 0.6 else "remove"
+        if proposal == "path" and dag_stale:
+            dag = field.binding_dag(spawns)
+            dag_cells, near = list(dag), None
+            dag_stale = False
 
         if move_type == "add":
-            symbol, orientations = random.choice(PIECES)
-            shape = random.choice(orientations)
-            r, c = random.randrange(R), random.randrange(C)
+            symbol, shape, r, c = propose_add(R, C, dag_cells, proposal, path_bias)
             coords = can_place(current_grid, r, c, shape, obstacles, unbuildables)
             if coords is None:
                 continue
+            proposed += 1
 
             # Tentative add
             place_piece(current_grid, coords, symbol)
-            score = evaluate(current_grid, spawns, target)
+            field.block(coords)
+            score = field.score(spawns)
 
             delta = score - current_score
             if delta >= 0 or random.random() < math.exp(delta / T):
+                accepted += 1
+                changed += delta != 0
                 current_score = score
-                placed_pieces.append((coords, symbol))
+                store.add(coords, symbol)
+                field.commit()
+                if from_spawns is not None:
+                    from_spawns.block(coords)
+                    from_spawns.commit()
+                dag_stale = True
                 if score > best_score:
                     best_score, best_grid = score, [row[:] for row in current_grid]
             else:
                 remove_piece(current_grid, coords)
+                field.rollback()
 
         else:  # remove
-            coords, symbol = random.choice(placed_pieces)
-
-            # Tentative remove
-            remove_piece(current_grid, coords)
-            score = evaluate(current_grid, spawns, target)
-
-            delta = score - current_score
-            if delta >= 0 or random.random() < math.exp(delta / T):
-                current_score = score
-                placed_pieces.remove((coords, symbol))
-                if score > best_score:
-                    best_score, best_grid = score, [row[:] for row in current_grid]
-            else:
-                place_piece(current_grid, coords, symbol)
+            if proposal == "path" and near is None:
+                near = pieces_near(store, dag)
+            coords, symbol = propose_remove(store, near, proposal, path_bias)
+            proposed += 1
+
+            # A removal can only lower the score, so the Metropolis draw
+            # comes first and gives the highest score that is rejected. A
+            # detour through the freed cells that already falls that low
+            # rejects the move before any repair.
+            draw = random.random()
+            reject_at = (current_score + T * math.log(draw) if draw > 0
+                         else -math.inf)
+            if from_spawns is None or \
+                    field.detour(coords, from_spawns) > reject_at:
+                # Tentative remove
+                remove_piece(current_grid, coords)
+                field.unblock(coords)
+                score = field.score(spawns)
+
+                if score > reject_at:
+                    accepted += 1
+                    changed += score != current_score
+                    current_score = score
+                    store.remove(coords)
+                    field.commit()
+                    if from_spawns is not None:
+                        from_spawns.unblock(coords)
+                        from_spawns.commit()
+                    dag_stale = True
+                    if score > best_score:
+                        best_score, best_grid = score, [row[:] for row in current_grid]
+                else:
+                    place_piece(current_grid, coords, symbol)
+                    field.rollback()
+
+        if reached is None and target_score is not None \
+                and best_score >= target_score:
+            reached = (it, time.time() - start_time)
 
         T *= alpha
-        if it % 5000 == 0:
+        if verbose and it % 5000 == 0:
             print(f"Iter {it}, Temp={T:.3f}, Best={best_score}")
 
+    iterations = it + 1
     elapsed = time.time() - start_time
-    print(f"SA finished in {elapsed:.2f}s — best distance = {best_score}")
+    rate = accepted / proposed if proposed else 0.0
+    if verbose:
+        print(f"SA finished in {elapsed:.2f}s — best distance = {best_score}")
+        print(f"proposal={proposal}: {iterations / max(elapsed, 1e-9):.0f} it/s, "
+              f"{proposed} evaluated, acceptance {100 * rate:.1f}% "
+              f"({100 * changed / max(proposed, 1):.1f}% changed the score)")
+        if target_score is not None:
+            print(f"target {target_score}: " + ("not reached" if reached is None
+                  else f"iteration {reached[0]} after {reached[1]:.2f}s"))
+    if stats is not None:
+        stats.update(iterations=iterations, seconds=elapsed, proposed=proposed,
+                     accepted=accepted, changed=changed, acceptance=rate,
+                     reached=reached, pieces=list(store.pieces),
+                     score=current_score)
 
     return best_grid, best_score
 
@@ -195,16 +635,35 @@ def simulated_annealing(lines, spawns, target, obstacles, unbuildables,
 # Main
 # ---------------------------
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) != 2:
-        print("Usage: python sa_solver.py map.txt")
-        sys.exit(1)
-
-    mapfile = sys.argv[1]
-    lines, spawns, target, obstacles, unbuildables = read_map_file(mapfile)
-
-    best_grid, score = simulated_annealing(lines, spawns, target, obstacles, unbuildables)
+    import argparse
+    ap = argparse.ArgumentParser(prog="solver.py")
+    ap.add_argument("map")
+    ap.add_argument("--iters", type=int, default=200000)
+    ap.add_argument("--time", type=float,
+                    help="stop after this many seconds (default: run all --iters)")
+    ap.add_argument("--out", help="also write the best solution here, walls as '#'")
+    ap.add_argument("--proposal", choices=("path", "uniform"), default="path",
+                    help="add/remove move distribution (default: path)")
+    ap.add_argument("--path-bias", type=float, default=0.9,
+                    help="probability of a path-guided move (default: 0.9)")
+    ap.add_argument("--target-score", type=int,
+                    help="report when the best score first reaches this")
+    ap.add_argument("--seed", type=int, help="random seed")
+    args = ap.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    lines, spawns, target, obstacles, unbuildables = read_map_file(args.map)
+
+    best_grid, score = simulated_annealing(lines, spawns, target, obstacles, unbuildables,
+                                           max_iter=args.iters, proposal=args.proposal,
+                                           path_bias=args.path_bias,
+                                           target_score=args.target_score,
+                                           time_limit=args.time)
 
     print("\nBest solution:")
     for row in best_grid:
         print("".join(row))
+    if args.out:
+        write_solution(best_grid, args.out)
+        print(f"written to {args.out}")
@@ -0,0 +1,164 @@
+"""Parallel tempering (replica exchange) around `simulated_annealing`.
+
+    python annealing/tempering.py maps/endless.txt --time 600 \
+        --out maps/endless_annealing_solution.txt
+    python -m interdiction maps/endless.txt \
+        --seed maps/endless_annealing_solution.txt
+
+M replicas run fixed-temperature chains on a geometric ladder between
+--t-min and --t-max, one process each (spawn pool). After each round of
+--round seconds, neighbouring temperatures try to swap states with the
+Metropolis rule for replica exchange, so good configurations found hot
+drift down to the cold chains that refine them. The best state any
+replica has seen is shared: it is written to --out (walls as '#') on
+every improvement, so the file is usable while the run continues.
+"""
+
+import argparse
+import concurrent.futures as cf
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+from solver import read_map_file, simulated_annealing, write_solution
+
+
+def ladder(t_min, t_max, m):
+    """m temperatures, geometric from t_min (coldest) to t_max."""
+    if m == 1:
+        return [t_min]
+    return [t_min * (t_max / t_min) ** (k / (m - 1)) for k in range(m)]
+
+
+def swap_probability(score_i, score_j, t_i, t_j):
+    """Acceptance for exchanging the states at t_i and t_j (maximizing)."""
+    x = (score_j - score_i) * (1 / t_i - 1 / t_j)
+    return 1.0 if x >= 0 else math.exp(x)
+
+
+def run_replica(problem, pieces, T, seconds, seed, proposal, path_bias):
+    """Pool job: one round of a fixed-temperature chain from `pieces`.
+
+    Returns (pieces, score, best_grid, best_score, iterations).
+    """
+    random.seed(seed)
+    stats = {}
+    best_grid, best_score = simulated_annealing(
+        *problem, max_iter=sys.maxsize, T0=T, alpha=1.0, proposal=proposal,
+        path_bias=path_bias, stats=stats, start=pieces, time_limit=seconds,
+        verbose=False)
+    return (stats["pieces"], stats["score"], best_grid, best_score,
+            stats["iterations"])
+
+
+def parallel_tempering(problem, *, time_limit, replicas, workers, t_min,
+                       t_max, round_time, seed=None, proposal="path",
+                       path_bias=0.9, on_best=None):
+    """Run until time_limit; returns (best_grid, best_score, stats).
+
+    `on_best(grid, score)` is called whenever the shared best improves.
+    """
+    rng = random.Random(seed)
+    temps = ladder(t_min, t_max, replicas)
+    states = [([], None)] * replicas        # (pieces, score) per temperature
+    best_grid, best_score = None, None
+    tries = [0] * (replicas - 1)            # swap attempts per neighbour pair
+    swaps = [0] * (replicas - 1)
+    iterations = rounds = 0
+    start = time.time()
+    deadline = start + time_limit
+
+    # spawn, like the rest of the repo: workers start clean
+    with cf.ProcessPoolExecutor(max_workers=workers,
+                                mp_context=mp.get_context("spawn")) as pool:
+        while True:
+            left = deadline - time.time()
+            if left <= 0:
+                break
+            # replicas beyond `workers` queue up within a round
+            seconds = min(round_time, left / math.ceil(replicas / workers))
+            futures = [pool.submit(run_replica, problem, states[k][0],
+                                   temps[k], seconds, rng.getrandbits(32),
+                                   proposal, path_bias)
+                       for k in range(replicas)]
+            for k, fut in enumerate(futures):
+                pieces, score, grid, b, its = fut.result()
+                states[k] = (pieces, score)
+                iterations += its
+                if best_score is None or b > best_score:
+                    best_grid, best_score = grid, b
+                    if on_best is not None:
+                        on_best(best_grid, best_score)
+
+            # alternate even and odd neighbour pairs between rounds
+            for k in range(rounds % 2, replicas - 1, 2):
+                tries[k] += 1
+                p = swap_probability(states[k][1], states[k + 1][1],
+                                     temps[k], temps[k + 1])
+                if rng.random() < p:
+                    states[k], states[k + 1] = states[k + 1], states[k]
+                    swaps[k] += 1
+            rounds += 1
+            print(f"[pt] round {rounds} t={time.time() - start:.0f}s "
+                  f"best={best_score} "
+                  f"chains={','.join(str(s) for _, s in states)}",
+                  flush=True)
+
+    stats = {"rounds": rounds, "iterations": iterations,
+             "seconds": time.time() - start, "temperatures": temps,
+             "swap_rates": [s / t if t else 0.0 for s, t in zip(swaps, tries)]}
+    return best_grid, best_score, stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="tempering.py")
+    ap.add_argument("map")
+    ap.add_argument("--time", type=float, default=300.0,
+                    help="wall-clock budget in seconds (default: 300)")
+    ap.add_argument("--replicas", type=int,
+                    help="temperatures on the ladder (default: max(cores, 4))")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="processes (default: all cores)")
+    ap.add_argument("--t-min", type=float, default=0.1,
+                    help="coldest temperature (default: 0.1)")
+    ap.add_argument("--t-max", type=float, default=2.0,
+                    help="hottest temperature (default: 2.0)")
+    ap.add_argument("--round", type=float, default=2.0,
+                    help="seconds each chain runs between swap attempts")
+    ap.add_argument("--proposal", choices=("path", "uniform"), default="path")
+    ap.add_argument("--path-bias", type=float, default=0.9)
+    ap.add_argument("--seed", type=int, help="random seed")
+    ap.add_argument("--out",
+                    help="solution file, walls as '#' (default: "
+                         "<map>_annealing_solution.txt)")
+    args = ap.parse_args(argv)
+
+    out = args.out or os.path.splitext(args.map)[0] + "_annealing_solution.txt"
+    replicas = args.replicas or max(os.cpu_count() or 1, 4)
+    problem = read_map_file(args.map)
+
+    def on_best(grid, score):
+        write_solution(grid, out)
+
+    best_grid, best_score, stats = parallel_tempering(
+        problem, time_limit=args.time, replicas=replicas,
+        workers=min(args.workers, replicas), t_min=args.t_min,
+        t_max=args.t_max, round_time=args.round, seed=args.seed,
+        proposal=args.proposal, path_bias=args.path_bias, on_best=on_best)
+
+    temps = " ".join(f"{t:.2f}" for t in stats["temperatures"])
+    rates = " ".join(f"{100 * r:.0f}%" for r in stats["swap_rates"])
+    print(f"PT finished in {stats['seconds']:.1f}s — best distance = "
+          f"{best_score} ({stats['rounds']} rounds, "
+          f"{stats['iterations'] / stats['seconds']:.0f} it/s total)")
+    print(f"temperatures: {temps}")
+    print(f"swap acceptance: {rates}")
+    print(f"written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,90 @@
-import random, heapq, math, time
+import random, math, time
+from collections import OrderedDict
 from typing import List, Tuple, Optional, Set
 import numpy as np
 
-# ---------- Utilities: A* shortest path on grid (orthogonal moves) ----------
-def astar_shortest_path_length(walls: np.ndarray, src: Tuple[int,int], dst: Tuple[int,int]) -> Optional[int]:
-    nrows, ncols = walls.shape
-    (sr, sc), (tr, tc) = src, dst
-    if (sr,sc) == (tr,tc):
-        return 0
-    if walls[sr,sc] == 1 or walls[tr,tc] == 1:
-        return None
-    open_set = [(abs(tr-sr)+abs(tc-sc), 0, sr, sc)]
-    gscore = { (sr,sc): 0 }
-    visited = set()
-    while open_set:
-        f, g, r, c = heapq.heappop(open_set)
-        if (r,c) in visited:
-            continue
-        visited.add((r,c))
-        if (r,c) == (tr,tc):
-            return g
-        for dr,dc in ((1,0),(-1,0),(0,1),(0,-1)):
-            nr, nc = r+dr, c+dc
-            if 0 <= nr < nrows and 0 <= nc < ncols and walls[nr,nc] == 0:
-                ng = g + 1
-                if ng < gscore.get((nr,nc), 10**9):
-                    gscore[(nr,nc)] = ng
-                    heur = abs(tr-nr) + abs(tc-nc)
-                    heapq.heappush(open_set, (ng + heur, ng, nr, nc))
-    return None
-
-# Shortest path on empty grid (for repair)
-def bfs_shortest_path_on_empty(nrows:int,ncols:int, src:Tuple[int,int], dst:Tuple[int,int]):
-    from collections import deque
-    q = deque([src])
-    parent = {src: None}
-    while q:
-        r,c = q.popleft()
-        if (r,c) == dst:
-            path = []
-            cur = dst
-            while cur:
-                path.append(cur)
-                cur = parent[cur]
-            path.reverse()
-            return path
-        for dr,dc in ((1,0),(-1,0),(0,1),(0,-1)):
-            nr,nc = r+dr, c+dc
-            if 0 <= nr < nrows and 0 <= nc < ncols and (nr,nc) not in parent:
-                parent[(nr,nc)] = (r,c)
-                q.append((nr,nc))
-    return []
+# ---------- Utilities: target-rooted searches on the flat grid ----------
+_NEIGHBORS = {}
+
+def _neighbors(nrows:int, ncols:int):
+    """Flat-index 4-neighbor lists for an nrows x ncols grid, cached."""
+    key = (nrows, ncols)
+    if key not in _NEIGHBORS:
+        _NEIGHBORS[key] = [[nr*ncols + nc for nr, nc in ((r-1,c),(r+1,c),(r,c-1),(r,c+1))
+                            if 0 <= nr < nrows and 0 <= nc < ncols]
+                           for r in range(nrows) for c in range(ncols)]
+    return _NEIGHBORS[key]
+
+def target_distances(chrom: np.ndarray, nrows:int, ncols:int, dst:Tuple[int,int]) -> list:
+    """One reverse BFS from `dst`: flat list of distances, None if unreachable."""
+    walls = chrom.tolist()
+    adj = _neighbors(nrows, ncols)
+    dist = [None] * (nrows*ncols)
+    t = dst[0]*ncols + dst[1]
+    if walls[t]:
+        return dist
+    dist[t] = 0
+    level, d = [t], 0
+    while level:
+        d += 1
+        nxt = []
+        for u in level:
+            for v in adj[u]:
+                if dist[v] is None and not walls[v]:
+                    dist[v] = d
+                    nxt.append(v)
+        level = nxt
+    return dist
+
+def min_crossing_walls(chrom: np.ndarray, nrows:int, ncols:int,
+                       spawns:List[Tuple[int,int]], dst:Tuple[int,int],
+                       obstacles:Set[Tuple[int,int]]) -> Set[int]:
+    """Walls to open so every spawn reaches `dst`, fewest per spawn.
+
+    One 0-1 BFS from `dst` where entering a wall costs 1 and obstacles are
+    impassable, run as buckets of equal cost: free cells join the current
+    bucket, walls the next, so each cell is labeled once. Each cut-off
+    spawn's parent chain is a path crossing the fewest walls. Returns
+    their flat indices (empty if already feasible).
+    """
+    weight = chrom.tolist()
+    for r, c in obstacles:
+        weight[r*ncols + c] = 2
+    adj = _neighbors(nrows, ncols)
+    n = nrows*ncols
+    cost = [None] * n
+    parent = [-1] * n
+    t = dst[0]*ncols + dst[1]
+    targets = {r*ncols + c for r, c in spawns}
+    cost[t] = 0
+    targets.discard(t)
+    bucket, k = [t], 0
+    while bucket and targets:
+        nxt = []
+        for u in bucket:            # grows while iterating: free cells stay at k
+            for v in adj[u]:
+                if cost[v] is None:
+                    w = weight[v]
+                    if w == 0:
+                        cost[v] = k
+                        bucket.append(v)
+                    elif w == 1:
+                        cost[v] = k + 1
+                        nxt.append(v)
+                    else:
+                        continue
+                    parent[v] = u
+                    targets.discard(v)
+        bucket, k = nxt, k + 1
+    opened = set()
+    for r, c in spawns:
+        v = r*ncols + c
+        if cost[v]:
+            while v != t:
+                if weight[v] == 1:
+                    opened.add(v)
+                v = parent[v]
+    return opened
 
 # ---------- Helpers ----------
 def chromosome_to_grid(chrom: np.ndarray, nrows:int, ncols:int) -> np.ndarray:
@@ -78,26 +112,143 @@ def create_random_chrom(nrows:int,ncols:int, wall_prob:float,
 def repair_chromosome(chrom: np.ndarray, nrows:int, ncols:int,
                       spawns:List[Tuple[int,int]], dst:Tuple[int,int],
                       obstacles:Set[Tuple[int,int]], unbuildables:Set[Tuple[int,int]]):
-    grid = chromosome_to_grid(chrom, nrows, ncols)
-    feasible = True
-    for s in spawns:
-        if astar_shortest_path_length(grid, s, dst) is None:
-            feasible = False
-            path = bfs_shortest_path_on_empty(nrows,ncols,s,dst)
-            for (r,c) in path:
-                grid[r,c] = 0
-    chrom = grid.flatten()
-    chrom = apply_masks(chrom, nrows, ncols, spawns, dst, obstacles, unbuildables)
+    """Make every spawn reach `dst` by opening the fewest walls on its path."""
+    chrom = apply_masks(chrom.copy(), nrows, ncols, spawns, dst, obstacles, unbuildables)
+    opened = min_crossing_walls(chrom, nrows, ncols, spawns, dst, obstacles)
+    if opened:
+        chrom[list(opened)] = 0
     return chrom
 
 def fitness(chrom: np.ndarray, nrows:int, ncols:int,
             spawns:List[Tuple[int,int]], dst:Tuple[int,int]) -> float:
-    grid = chromosome_to_grid(chrom, nrows, ncols)
-    dists = [astar_shortest_path_length(grid, s, dst) for s in spawns]
+    dist = target_distances(chrom, nrows, ncols, dst)
+    dists = [dist[r*ncols + c] for r, c in spawns]
     if any(d is None for d in dists):
         return -1e6
     return float(min(dists))   # worst-case enemy path
 
+# ---------- Whole-population evaluation (NumPy) ----------
+def _pack_rows(cells: np.ndarray) -> np.ndarray:
+    """(pop, rows, cols) bools -> (pop, rows, words) uint64 row bitboards;
+    bit j of word w is column 64*w + j."""
+    P, R, C = cells.shape
+    W = (C + 63) // 64
+    padded = np.zeros((P, R, W*64), dtype=bool)
+    padded[:, :, :C] = cells
+    return np.packbits(padded, axis=2, bitorder="little").view("<u8")
+
+def population_distances(walls: np.ndarray, dst: Tuple[int,int],
+                         spawns: List[Tuple[int,int]]) -> np.ndarray:
+    """Spawn distances for a stack of wall grids, shape (pop, rows, cols).
+
+    One BFS frontier sweep rooted at `dst` advances every individual a
+    level at a time, on row bitboards so a level is a handful of word-wide
+    shifts and masks. It stops once every spawn is settled or no frontier
+    is left. Returns a (pop, len(spawns)) int array, -1 where unreachable.
+    """
+    P = walls.shape[0]
+    open_ = _pack_rows(walls == 0)
+    one, top = np.uint64(1), np.uint64(63)
+    sr = np.array([r for r, _ in spawns]); sc = np.array([c for _, c in spawns])
+    sw, sb = sc // 64, (sc % 64).astype(np.uint64)
+    dist = np.full((P, len(spawns)), -1, dtype=np.int32)
+    frontier = np.zeros_like(open_)
+    frontier[:, dst[0], dst[1] // 64] = one << np.uint64(dst[1] % 64)
+    frontier &= open_
+    visited = frontier.copy()
+    nxt = np.empty_like(frontier)
+    step = 0
+    while True:
+        hit = (((visited[:, sr, sw] >> sb) & one) == one) & (dist < 0)
+        dist[hit] = step
+        if (dist >= 0).all() or not frontier.any():
+            return dist
+        step += 1
+        np.left_shift(frontier, one, out=nxt)             # column + 1
+        nxt[:, :, 1:] |= frontier[:, :, :-1] >> top
+        nxt |= frontier >> one                            # column - 1
+        nxt[:, :, :-1] |= frontier[:, :, 1:] << top
+        nxt[:, 1:] |= frontier[:, :-1]                    # row + 1
+        nxt[:, :-1] |= frontier[:, 1:]                    # row - 1
+        nxt &= open_
+        nxt &= ~visited
+        visited |= nxt
+        frontier, nxt = nxt, frontier
+
+def _mask_indices(nrows:int, ncols:int, spawns, dst, obstacles, unbuildables):
+    walls = np.array([r*ncols + c for r, c in obstacles], dtype=np.intp)
+    free = np.array([r*ncols + c for r, c in list(unbuildables) + list(spawns) + [dst]],
+                    dtype=np.intp)
+    return walls, free
+
+def evaluate_population(pop: np.ndarray, nrows:int, ncols:int,
+                        spawns:List[Tuple[int,int]], dst:Tuple[int,int],
+                        obstacles:Set[Tuple[int,int]], unbuildables:Set[Tuple[int,int]]):
+    """`repair_chromosome` + `fitness` for a (pop, rows*cols) array.
+
+    Scoring is one bitboard sweep for the whole population. Repair is not
+    batched: each individual with a cut-off spawn runs its own Python 0-1
+    BFS (`min_crossing_walls`), then only those are re-swept. Repairs in
+    place; returns the fitness array.
+    """
+    walls_idx, free_idx = _mask_indices(nrows, ncols, spawns, dst, obstacles, unbuildables)
+    pop[:, walls_idx] = 1
+    pop[:, free_idx] = 0
+    grids = pop.reshape((-1, nrows, ncols))
+    dist = population_distances(grids, dst, spawns)
+    bad = (dist < 0).any(axis=1)
+    if bad.any():
+        for i in np.flatnonzero(bad):
+            opened = min_crossing_walls(pop[i], nrows, ncols, spawns, dst, obstacles)
+            pop[i, list(opened)] = 0
+        dist[bad] = population_distances(grids[bad], dst, spawns)
+    fit = dist.min(axis=1).astype(float)
+    fit[(dist < 0).any(axis=1)] = -1e6
+    return fit
+
+class FitnessCache:
+    """Bounded LRU of chromosome bytes -> (fitness, repaired bytes or None).
+
+    Keys are the masked chromosome before repair, so a hit also restores the
+    repaired form. `evaluate` serves hits and identical siblings from the
+    cache and sends only the distinct misses to `evaluate_population`.
+    """
+
+    def __init__(self, maxsize:int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def evaluate(self, pop: np.ndarray, nrows:int, ncols:int,
+                 spawns:List[Tuple[int,int]], dst:Tuple[int,int],
+                 obstacles:Set[Tuple[int,int]], unbuildables:Set[Tuple[int,int]]):
+        """Like `evaluate_population`; returns (fitness, number evaluated)."""
+        walls_idx, free_idx = _mask_indices(nrows, ncols, spawns, dst, obstacles, unbuildables)
+        pop[:, walls_idx] = 1
+        pop[:, free_idx] = 0
+        fit = np.empty(len(pop))
+        misses = {}     # key -> row indices
+        for i, row in enumerate(pop):
+            key = row.tobytes()
+            hit = self.entries.get(key)
+            if hit is None:
+                misses.setdefault(key, []).append(i)
+                continue
+            self.entries.move_to_end(key)
+            fit[i] = hit[0]
+            if hit[1] is not None:
+                pop[i] = np.frombuffer(hit[1], dtype=pop.dtype)
+        if misses:
+            batch = pop[[rows[0] for rows in misses.values()]]
+            batch_fit = evaluate_population(batch, nrows,ncols,spawns,dst,obstacles,unbuildables)
+            for (key, rows), row, f in zip(misses.items(), batch, batch_fit):
+                repaired = row.tobytes()
+                self.entries[key] = (float(f), None if repaired == key else repaired)
+                pop[rows] = row
+                fit[rows] = f
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return fit, len(misses)
+
 def tournament_selection(pop, pop_fitness, k:int=3):
     inds = random.sample(range(len(pop)), k)
     best = max(inds, key=lambda i: pop_fitness[i])
@@ -121,15 +272,37 @@ def run_ga(nrows:int, ncols:int, spawns:List[Tuple[int,int]], dst:Tuple[int,int]
            obstacles:Set[Tuple[int,int]]=set(), unbuildables:Set[Tuple[int,int]]=set(),
            pop_size:int=80, generations:int=200, wall_prob:float=0.20,
            mutation_rate:float=0.01, elite_frac:float=0.05, tournament_k:int=3,
-           seed:int=None, verbose:bool=True):
+           seed:int=None, verbose:bool=True, cache_size:int=20000,
+           init_pop:Optional[np.ndarray]=None, init_fits:Optional[np.ndarray]=None,
+           cache:Optional[FitnessCache]=None, stats:Optional[dict]=None):
+    """Evolve walls; returns (best chromosome, best score).
+
+    `init_pop` (a (pop, rows*cols) array) replaces the random initial
+    population and sets pop_size; with `init_fits`, its fitness from an
+    earlier run, it is not evaluated again. `cache` continues an earlier
+    run's FitnessCache instead of a new one of `cache_size`. `stats`, if
+    given, receives the final population and its fitness (`pop`,
+    `fitness`), the cache and the number of evaluations run.
+    """
     if seed is not None:
         random.seed(seed); np.random.seed(seed)
-    pop = [create_random_chrom(nrows,ncols,wall_prob,spawns,dst,obstacles,unbuildables)
-           for _ in range(pop_size)]
-    pop = [repair_chromosome(ind, nrows,ncols,spawns,dst,obstacles,unbuildables) for ind in pop]
-    pop_fitness = [fitness(ind,nrows,ncols,spawns,dst) for ind in pop]
+    start = time.time()
+    if cache is None:
+        cache = FitnessCache(cache_size)
+    total_evals = 0
+    if init_pop is not None:
+        pop = init_pop.copy()
+        pop_size = len(pop)
+    else:
+        pop = np.stack([create_random_chrom(nrows,ncols,wall_prob,spawns,dst,obstacles,unbuildables)
+                        for _ in range(pop_size)])
+    if init_pop is not None and init_fits is not None:
+        pop_fitness = np.array(init_fits, dtype=float)
+    else:
+        pop_fitness, evals = cache.evaluate(pop, nrows,ncols,spawns,dst,obstacles,unbuildables)
+        total_evals += evals
     best_idx = int(np.argmax(pop_fitness))
-    best = pop[best_idx].copy(); best_score = pop_fitness[best_idx]
+    best = pop[best_idx].copy(); best_score = float(pop_fitness[best_idx])
     if verbose:
         print(f"Init best distance = {best_score}")
     elite_n = max(1, int(math.ceil(elite_frac * pop_size)))
@@ -138,25 +311,38 @@ def run_ga(nrows:int, ncols:int, spawns:List[Tuple[int,int]], dst:Tuple[int,int]
         elites_idx = sorted(range(len(pop)), key=lambda i: pop_fitness[i], reverse=True)[:elite_n]
         for i in elites_idx:
             newpop.append(pop[i].copy())
+        elite_fitness = pop_fitness[elites_idx]     # carried forward, not re-evaluated
         while len(newpop) < pop_size:
             p1 = tournament_selection(pop, pop_fitness, k=tournament_k)
             p2 = tournament_selection(pop, pop_fitness, k=tournament_k)
             c1,c2 = two_point_crossover(p1,p2)
             mutate(c1, mutation_rate); mutate(c2, mutation_rate)
-            c1 = repair_chromosome(c1, nrows,ncols,spawns,dst,obstacles,unbuildables)
-            c2 = repair_chromosome(c2, nrows,ncols,spawns,dst,obstacles,unbuildables)
             newpop.append(c1)
             if len(newpop) < pop_size:
                 newpop.append(c2)
-        pop = newpop
-        pop_fitness = [fitness(ind,nrows,ncols,spawns,dst) for ind in pop]
+        pop = np.stack(newpop)
+        children = pop[elite_n:]
+        child_fitness, evals = cache.evaluate(children, nrows,ncols,spawns,dst,obstacles,unbuildables)
+        pop[elite_n:] = children
+        pop_fitness = np.concatenate([elite_fitness, child_fitness])
+        total_evals += evals
         gen_best_idx = int(np.argmax(pop_fitness))
-        gen_best_score = pop_fitness[gen_best_idx]
+        gen_best_score = float(pop_fitness[gen_best_idx])
         if gen_best_score > best_score:
             best_score = gen_best_score; best = pop[gen_best_idx].copy()
         if verbose and (gen % max(1, generations//10) == 0 or gen <= 5):
             mean_f = sum(pop_fitness)/len(pop_fitness)
-            print(f"Gen {gen:4d}: best={gen_best_score:.1f}, global_best={best_score:.1f}, mean={mean_f:.2f}")
+            hit_rate = 1 - evals / max(1, len(children))
+            print(f"Gen {gen:4d}: best={gen_best_score:.1f}, global_best={best_score:.1f}, mean={mean_f:.2f}, "
+                  f"cache hits={hit_rate:.0%}, evals saved={pop_size - evals}")
+    if verbose:
+        elapsed = time.time() - start
+        saved = pop_size * (generations + 1) - total_evals
+        print(f"{generations} generations in {elapsed:.1f}s ({generations/elapsed:.2f} gen/s), "
+              f"{total_evals} evaluations, {saved} saved by elites and the cache")
+    if stats is not None:
+        stats.update(pop=pop, fitness=pop_fitness, cache=cache,
+                     evaluations=total_evals)
     return best, best_score
 
 # ---------- Pretty-print ----------
@@ -0,0 +1,109 @@
+"""Island-model GA: K populations in a process pool with ring migration.
+
+Each island runs `run_ga` for --migrate-every generations per epoch in its
+own process (spawn pool). Between epochs island i sends copies of its
+--migrants best individuals to island i+1 (mod K), where they replace the
+worst. Islands evolve apart between migrations, which keeps the whole
+population from converging early. Per-island and global best are printed
+after every epoch.
+
+An island's fitness values travel with its population, so an epoch never
+re-evaluates what it starts from. Each worker process keeps one fitness
+cache for the whole run; fitness does not depend on the island, so every
+island scheduled on that worker shares it.
+"""
+
+import concurrent.futures as cf
+import multiprocessing as mp
+import random
+import time
+import uuid
+
+import numpy as np
+
+from genetic_algorithm import run_ga
+
+_cache = None   # (run id, FitnessCache) of this worker process
+
+
+def run_island(problem, pop, fits, generations, seed, ga_kwargs, run_id=None):
+    """Pool job: one epoch of one island. Returns (pop, fitness, best, score).
+
+    `fits` is the fitness of `pop` from the previous epoch. The worker's
+    fitness cache carries over between jobs with the same `run_id`.
+    """
+    global _cache
+    cache = _cache[1] if _cache is not None and _cache[0] == run_id else None
+    stats = {}
+    best, score = run_ga(*problem, generations=generations, seed=seed,
+                         verbose=False, init_pop=pop, init_fits=fits,
+                         cache=cache, stats=stats, **ga_kwargs)
+    _cache = (run_id, stats["cache"])
+    return stats["pop"], stats["fitness"], best, score
+
+
+def migrate(pops, fits, migrants):
+    """Ring migration in place: island i's best replace island i+1's worst."""
+    k = len(pops)
+    if k < 2 or migrants < 1:
+        return
+    outgoing = []
+    for pop, fit in zip(pops, fits):
+        top = np.argsort(fit)[::-1][:migrants]
+        outgoing.append((pop[top].copy(), fit[top].copy()))
+    for i in range(k):
+        pop, fit = pops[(i + 1) % k], fits[(i + 1) % k]
+        mig_pop, mig_fit = outgoing[i]
+        worst = np.argsort(fit)[:len(mig_pop)]
+        pop[worst] = mig_pop
+        fit[worst] = mig_fit
+
+
+def run_islands(nrows, ncols, spawns, dst, obstacles=set(), unbuildables=set(),
+                islands=4, generations=200, migrate_every=20, migrants=2,
+                pop_size=50, workers=None, seed=None, verbose=True,
+                **ga_kwargs):
+    """Island GA; returns (best chromosome, best score, history).
+
+    `history` has one (generation, seconds, global best, [island bests])
+    entry per epoch. Other keyword arguments go to `run_ga`.
+    """
+    rng = random.Random(seed)
+    run_id = uuid.uuid4().hex
+    problem = (nrows, ncols, spawns, dst, obstacles, unbuildables)
+    pops = [None] * islands
+    fits = [None] * islands
+    best, best_score = None, None
+    history = []
+    gen = 0
+    start = time.time()
+
+    # spawn, like the rest of the repo: workers start clean
+    with cf.ProcessPoolExecutor(max_workers=workers,
+                                mp_context=mp.get_context("spawn")) as pool:
+        while gen < generations:
+            n = min(migrate_every, generations - gen)
+            futures = []
+            for i in range(islands):
+                kwargs = dict(ga_kwargs)
+                if pops[i] is None:
+                    kwargs["pop_size"] = pop_size
+                futures.append(pool.submit(run_island, problem, pops[i],
+                                           fits[i], n, rng.getrandbits(32),
+                                           kwargs, run_id))
+            island_best = []
+            for i, fut in enumerate(futures):
+                pops[i], fits[i], b, score = fut.result()
+                island_best.append(score)
+                if best_score is None or score > best_score:
+                    best, best_score = b, score
+            gen += n
+            history.append((gen, time.time() - start, best_score, island_best))
+            if verbose:
+                print(f"[islands] gen {gen} t={time.time() - start:.1f}s "
+                      f"global_best={best_score:.1f} "
+                      f"islands={','.join(f'{s:.0f}' for s in island_best)}",
+                      flush=True)
+            if gen < generations:
+                migrate(pops, fits, migrants)
+    return best, best_score, history
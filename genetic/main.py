@@ -1,13 +1,25 @@
+import argparse
+
 import genetic_algorithm
 import map_reader
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) != 2:
-        print("Usage: python main.py map.txt")
-        sys.exit(1)
+    ap = argparse.ArgumentParser(prog="main.py")
+    ap.add_argument("map")
+    ap.add_argument("--generations", type=int, default=1000)
+    ap.add_argument("--pop-size", type=int, default=200,
+                    help="population size (per island with --islands)")
+    ap.add_argument("--islands", type=int, default=1,
+                    help="island-model GA with this many populations in a process pool")
+    ap.add_argument("--migrate-every", type=int, default=20,
+                    help="generations between ring migrations (islands)")
+    ap.add_argument("--migrants", type=int, default=2,
+                    help="best individuals each island sends to the next")
+    ap.add_argument("--workers", type=int, help="processes (default: all cores)")
+    ap.add_argument("--seed", type=int, help="random seed")
+    args = ap.parse_args()
 
-    filename = sys.argv[1]
+    filename = args.map
     grid, spawns, target, obstacles, unbuildables = map_reader.read_map_file(filename)
     nrows = len(grid)
     ncols = len(grid[0]) if nrows > 0 else 0
@@ -20,12 +32,22 @@ if __name__ == "__main__":
     print("Obstacles:", obstacles)
     print("Unbuildables:", unbuildables)
 
-    best_chrom, best_score = genetic_algorithm.run_ga(
-        nrows, ncols, spawns, target, obstacles, unbuildables,
-        pop_size=200, generations=1000, mutation_rate=0.01,
-        elite_frac=0.5, tournament_k=5, verbose=True
-    )
+    ga_params = dict(mutation_rate=0.01, elite_frac=0.5, tournament_k=5)
+    if args.islands > 1:
+        import islands
+        best_chrom, best_score, _ = islands.run_islands(
+            nrows, ncols, spawns, target, obstacles, unbuildables,
+            islands=args.islands, generations=args.generations,
+            migrate_every=args.migrate_every, migrants=args.migrants,
+            pop_size=args.pop_size, workers=args.workers, seed=args.seed,
+            **ga_params)
+    else:
+        best_chrom, best_score = genetic_algorithm.run_ga(
+            nrows, ncols, spawns, target, obstacles, unbuildables,
+            pop_size=args.pop_size, generations=args.generations,
+            seed=args.seed, verbose=True, **ga_params
+        )
 
     print("\nBest solution found:")
     genetic_algorithm.print_grid(best_chrom, nrows, ncols, spawns, target, obstacles, unbuildables)
-    print(f"Best score (max distance from spawn to target): {best_score}")
\ No newline at end of file
+    print(f"Best score (max distance from spawn to target): {best_score}")
@@ -0,0 +1,163 @@
+"""Per-map on-disk archive of the best distinct wall sets found so far.
+
+An archive keeps the top-k distinct wall sets by maximin. The CLI seeds
+a run from the best one, hands all of them to the LNS path-relinking
+windows (`run_lns(elites=...)`) and adds the run's result back. The file
+is small JSON: each elite is its maximin, a hash and a base64 bitmask
+over the map's buildable cells in row-major order (about 500 characters
+on a 60x60 map), under a hash of the map it belongs to. Saves lock the
+file, re-read it and replace it atomically, so runs sharing an archive
+merge.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:     # not on Windows: saves are then unlocked
+    fcntl = None
+
+from interdiction.checkpoint import map_fingerprint
+
+VERSION = 1
+ARCHIVE_SIZE = 8
+
+
+@dataclass(frozen=True)
+class Elite:
+    maximin: int
+    walls: frozenset
+    digest: str
+
+
+def _order(grid):
+    return sorted(grid.buildable)
+
+
+def pack_walls(grid, walls) -> bytes:
+    """Bitmask of `walls` over the buildable cells in row-major order."""
+    walls = set(walls)
+    order = _order(grid)
+    bits = bytearray((len(order) + 7) // 8)
+    for i, v in enumerate(order):
+        if v in walls:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+
+def unpack_walls(grid, data) -> set:
+    order = _order(grid)
+    if len(data) != (len(order) + 7) // 8:
+        raise ValueError("wall bitmask does not match the map")
+    return {v for i, v in enumerate(order) if data[i >> 3] >> (i & 7) & 1}
+
+
+def wall_hash(grid, walls) -> str:
+    return hashlib.sha1(pack_walls(grid, walls)).hexdigest()[:16]
+
+
+def map_hash(grid) -> str:
+    fp = json.dumps(map_fingerprint(grid), separators=(",", ":"))
+    return hashlib.sha1(fp.encode()).hexdigest()[:16]
+
+
+class EliteArchive:
+    """Top-`size` distinct connected wall sets of one map, best first."""
+
+    def __init__(self, grid, size=ARCHIVE_SIZE):
+        self.grid = grid
+        self.size = size
+        self.elites: list[Elite] = []
+
+    def add(self, walls) -> bool:
+        """Insert a wall set; False if it disconnects a spawn, is already
+        archived or does not make the top `size`."""
+        walls = frozenset(walls)
+        val, _ = self.grid.evaluate(walls)
+        if val is None:
+            return False
+        digest = wall_hash(self.grid, walls)
+        if any(e.digest == digest for e in self.elites):
+            return False
+        self.elites.append(Elite(val, walls, digest))
+        # stable: among equal maximins the earlier elite stays ahead
+        self.elites.sort(key=lambda e: -e.maximin)
+        del self.elites[self.size:]
+        return any(e.digest == digest for e in self.elites)
+
+    def best(self) -> Elite | None:
+        return self.elites[0] if self.elites else None
+
+    def to_json(self) -> dict:
+        return {"version": VERSION, "map": map_hash(self.grid),
+                "elites": [{"maximin": e.maximin, "hash": e.digest,
+                            "walls": base64.b64encode(
+                                pack_walls(self.grid, e.walls)).decode()}
+                           for e in self.elites]}
+
+    def merge_json(self, data) -> None:
+        """Add the elites of a `to_json` dict; ValueError if it is foreign
+        or was written for another map, or is malformed."""
+        if not isinstance(data, dict):
+            raise ValueError("archive is not a JSON object")
+        if data.get("version") != VERSION:
+            raise ValueError(f"unsupported archive version "
+                             f"{data.get('version')!r}")
+        if data.get("map") != map_hash(self.grid):
+            raise ValueError("archive was written for a different map")
+        recs = data.get("elites")
+        if not isinstance(recs, list) or not all(
+                isinstance(rec, dict) and isinstance(rec.get("walls"), str)
+                for rec in recs):
+            raise ValueError("archive elites must be a list of "
+                             "{\"walls\": <base64>} records")
+        for rec in recs:
+            self.add(unpack_walls(self.grid, base64.b64decode(rec["walls"])))
+
+    @classmethod
+    def load(cls, path, grid, size=ARCHIVE_SIZE) -> EliteArchive:
+        """Archive at `path`; empty if the file does not exist yet."""
+        archive = cls(grid, size)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return archive
+        archive.merge_json(data)
+        return archive
+
+    def save(self, path) -> None:
+        """Merge with what is on disk now, then write atomically.
+
+        The read-merge-write holds an exclusive lock on `<path>.lock`
+        (where `fcntl` exists), so concurrent runs sharing the archive
+        cannot drop each other's elites, and each writes through its own
+        temp file. ValueError if the file on disk is malformed or foreign.
+        """
+        path = os.fspath(path)
+        with open(f"{path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(path) as f:
+                    self.merge_json(json.load(f))
+            except FileNotFoundError:
+                pass
+            fd, tmp = tempfile.mkstemp(
+                dir=os.path.dirname(path) or ".",
+                prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.to_json(), f, indent=1)
+                    f.write("\n")
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
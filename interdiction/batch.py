@@ -0,0 +1,163 @@
+"""Batch mode: solve many maps in one process pool, write a results table.
+
+    myenv/bin/python -m interdiction batch maps/ testcase/ --jobs 4 \
+        --time 600 --table results.csv
+
+Each job runs the single-map pipeline (`cli.main`) with the options after
+the batch's own, so one interpreter and one gurobipy import serve many
+maps. Jobs always run the bound as a sequential final phase: a concurrent
+bound is a second process per job, and its prints would bypass the job's
+log. A job's output goes to `<solution>.log`; the table (CSV, or JSONL
+when the path ends in .jsonl) has one row per map in input order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures as cf
+import contextlib
+import csv
+import glob
+import json
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+import traceback
+
+PHASES = ("bounds", "coarse", "exact", "lns", "bound")
+COLUMNS = ("map", "status", "maximin", "bound", "gap", "walls", "seconds",
+           *(f"t_{ph}" for ph in PHASES), "out", "error")
+
+
+def is_map_file(path) -> bool:
+    """Maps in a directory: testcase JSON and text maps, not solutions/seeds."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    if ext == ".json":
+        return True
+    return ext == ".txt" and "_solution" not in stem \
+        and not stem.endswith("_seed")
+
+
+def collect_maps(paths) -> list:
+    """Expand directories and globs into map files, keeping order."""
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = sorted(os.path.join(path, f) for f in os.listdir(path))
+            out += [f for f in found if is_map_file(f)]
+        elif any(ch in path for ch in "*?["):
+            out += sorted(glob.glob(path))
+        else:
+            out.append(path)
+    seen = set()
+    return [p for p in out if not (p in seen or seen.add(p))]
+
+
+def _out_path(map_path, out_dir):
+    out = os.path.splitext(map_path)[0] + "_milp_solution.txt"
+    if out_dir is not None:
+        out = os.path.join(out_dir, os.path.basename(out))
+    return out
+
+
+def solve_one(map_path, argv, out):
+    """Pool job: run the single-map CLI, return its table row."""
+    from interdiction.cli import main
+
+    row = {"map": map_path, "out": out}
+    t0 = time.monotonic()
+    report = {}
+    try:
+        with open(f"{out}.log", "w") as log, \
+                contextlib.redirect_stdout(log), \
+                contextlib.redirect_stderr(log):
+            code = main([map_path, *argv, "--out", out], report=report)
+        row["status"] = "ok" if code == 0 else f"exit {code}"
+    except SystemExit as e:     # argparse errors
+        row.update(status=f"exit {e.code}")
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+        with open(f"{out}.log", "a") as log:
+            traceback.print_exc(file=log)
+    row["seconds"] = time.monotonic() - t0
+    for key in ("maximin", "bound", "gap", "walls"):
+        row[key] = report.get(key)
+    for ph, secs in report.get("phases", {}).items():
+        row[f"t_{ph}"] = secs
+    return row
+
+
+def _fmt(v):
+    if isinstance(v, float):
+        return "inf" if math.isinf(v) else f"{v:.3f}"
+    return "" if v is None else v
+
+
+def write_table(rows, path) -> None:
+    with open(path, "w", newline="") as f:
+        if path.endswith(".jsonl"):
+            for row in rows:
+                f.write(json.dumps({k: (None if isinstance(v, float)
+                                        and math.isinf(v) else v)
+                                    for k, v in row.items()}) + "\n")
+            return
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
+        w.writeheader()
+        for row in rows:
+            w.writerow({k: _fmt(row.get(k)) for k in COLUMNS})
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(
+        prog="interdiction batch",
+        epilog="options not listed here (e.g. --subsolve-time, "
+               "--window-sizes) are passed to every job")
+    p.add_argument("paths", nargs="+",
+                   help="map files, directories or globs (testcase/*.json)")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                   help="maps solved concurrently")
+    p.add_argument("--time", type=float, default=600.0,
+                   help="wall-clock budget per map in seconds")
+    p.add_argument("--bound-mode", choices=("sequential",),
+                   default="sequential",
+                   help="jobs bound sequentially; a concurrent bound would "
+                        "double the processes and print outside the logs")
+    p.add_argument("--table", default="results.csv",
+                   help="results table; JSON lines if it ends in .jsonl")
+    p.add_argument("--out-dir",
+                   help="write solutions and logs here instead of next "
+                        "to each map")
+    args, passthrough = p.parse_known_args(argv)
+
+    maps = collect_maps(args.paths)
+    if not maps:
+        print("error: no maps found", file=sys.stderr)
+        return 2
+    if args.out_dir is not None:
+        os.makedirs(args.out_dir, exist_ok=True)
+    job_argv = ["--time", str(args.time), "--bound-mode", args.bound_mode,
+                *passthrough]
+
+    rows = {}
+    # spawn: never fork a process holding a Gurobi env
+    with cf.ProcessPoolExecutor(max_workers=max(1, args.jobs),
+                                mp_context=mp.get_context("spawn")) as pool:
+        futures = {pool.submit(solve_one, m, job_argv,
+                               _out_path(m, args.out_dir)): m for m in maps}
+        for fut in cf.as_completed(futures):
+            m = futures[fut]
+            try:
+                row = fut.result()
+            except Exception as e:     # worker died (e.g. killed by OOM)
+                row = {"map": m, "status": "error",
+                       "error": f"{type(e).__name__}: {e}"}
+            rows[m] = row
+            print(f"[batch] {m}: {row['status']} "
+                  f"maximin={_fmt(row.get('maximin'))} "
+                  f"gap={_fmt(row.get('gap'))} "
+                  f"({len(rows)}/{len(maps)})", flush=True)
+    write_table([rows[m] for m in maps], args.table)
+    print(f"results written to {args.table}")
+    return 0 if all(r["status"] == "ok" for r in rows.values()) else 1
@@ -1,12 +1,218 @@
-"""Full-map master run: valid global upper bound (and sometimes a better incumbent)."""
+"""Valid global upper bounds on the maximin, cheap and expensive.
+
+Cheap bounds (`--bound-method`) need no search: any shortest spawn->target
+path under any walls is a simple path of the walkable grid, so
+- `colour`: on the bipartite grid a simple path alternates colour classes,
+  which caps its length by the colour counts of the spawn's component;
+- `blockcut`: a simple path runs through the fixed chain of biconnected
+  blocks between spawn and target in the block-cut tree, entering and
+  leaving each block at known cells, so the colour cap applies per block
+  and the dead-end blocks drop out;
+- `reduced`: the best bound (ObjBound) of a time-limited master MIP
+  solve on the reduced map (dead-end blocks removed, objective capped by
+  the combinatorial bounds). The master's lazy path cuts only exist in
+  its callback, so an LP relaxation would have no cuts and bound nothing.
+
+`run_bound` is the full-map master run, which may also improve the
+incumbent; it is the sequential final phase. `ConcurrentBound` runs the same
+solve in a background process for the whole budget instead, trading
+incumbents with the LNS in both directions and streaming
+`[bound] t=... bound=... incumbent=... gap=...` lines as it goes.
+"""
 
 from __future__ import annotations
 
 import math
+import multiprocessing as mp
+import queue
+import random
+import sys
+import time
+from collections import deque
+
+from interdiction.grid import GridMap
+
+PROGRESS_EVERY = 5.0    # seconds between streamed [bound] lines
+FINISH_TIMEOUT = 60.0   # grace for the worker to report after a stop
+BOUND_METHODS = ("colour", "blockcut", "reduced")
+REDUCED_TIME = 30.0     # Gurobi seconds for the reduced-map bound
+
+
+def _colour(v):
+    return (v[0] + v[1]) % 2
+
+
+def _colour_cap(a, b, cells):
+    """Longest possible simple a->b path inside `cells` by colour counts."""
+    same = sum(1 for v in cells if _colour(v) == _colour(a))
+    other = len(cells) - same
+    if _colour(a) == _colour(b):
+        # L/2 + 1 cells of a's colour, L/2 of the other
+        return 2 * min(same - 1, other)
+    return 2 * min(same, other) - 1
+
+
+def _component(grid, src):
+    seen = {src}
+    q = deque([src])
+    while q:
+        u = q.popleft()
+        for v in grid.neighbors(u):
+            if v not in seen:
+                seen.add(v)
+                q.append(v)
+    return seen
+
+
+def colour_bound(grid) -> int:
+    """Min over spawns of the colour-class cap of its component."""
+    comp = _component(grid, grid.target)
+    return min(_colour_cap(s, grid.target, comp) for s in grid.spawns)
+
+
+def _blocks(grid):
+    """Biconnected components (cell sets) of the walkable grid."""
+    index, low, blocks = {}, {}, []
+    counter = 0
+    for root in sorted(grid.walkable):
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack = [(root, None, iter(list(grid.neighbors(root))))]
+        edges = []
+        while stack:
+            v, parent, it = stack[-1]
+            for w in it:
+                if w == parent:
+                    continue
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    edges.append((v, w))
+                    stack.append((w, v, iter(list(grid.neighbors(w)))))
+                    break
+                if index[w] < index[v]:
+                    edges.append((v, w))
+                    low[v] = min(low[v], index[w])
+            else:
+                stack.pop()
+                if not stack:
+                    continue
+                u = stack[-1][0]
+                low[u] = min(low[u], low[v])
+                if low[v] >= index[u]:
+                    block = set()
+                    while True:
+                        e = edges.pop()
+                        block.update(e)
+                        if e == (u, v):
+                            break
+                    blocks.append(block)
+    return blocks
+
+
+def _block_chain(grid, blocks, src):
+    """[(entry, exit, block), ...] along the block-cut tree, src -> target."""
+    member = {}
+    for i, block in enumerate(blocks):
+        for v in block:
+            member.setdefault(v, []).append(i)
+    # BFS over the bipartite cell/block tree
+    prev = {("c", src): None}
+    q = deque([("c", src)])
+    goal = ("c", grid.target)
+    while q and goal not in prev:
+        node = q.popleft()
+        kind, x = node
+        nbrs = ([("b", i) for i in member.get(x, ())] if kind == "c"
+                else [("c", v) for v in blocks[x] if len(member[v]) > 1
+                      or v == grid.target])
+        for n in nbrs:
+            if n not in prev:
+                prev[n] = node
+                q.append(n)
+    if goal not in prev:
+        return None
+    nodes = []
+    node = goal
+    while node is not None:
+        nodes.append(node)
+        node = prev[node]
+    nodes.reverse()     # c, b, c, b, ..., c
+    return [(nodes[i][1], nodes[i + 2][1], blocks[nodes[i + 1][1]])
+            for i in range(0, len(nodes) - 2, 2)]
+
+
+def blockcut_bound(grid) -> int:
+    """Min over spawns of the summed per-block colour caps."""
+    blocks = _blocks(grid)
+    best = math.inf
+    for s in grid.spawns:
+        chain = _block_chain(grid, blocks, s)
+        best = min(best, sum(_colour_cap(a, b, block)
+                             for a, b, block in chain))
+    return best
+
+
+def reduced_grid(grid) -> GridMap:
+    """The map with every cell off all spawn->target block chains removed.
+
+    Such cells lie on no simple spawn->target path, so walling them never
+    changes a distance: the reduced map has the same optimum.
+    """
+    blocks = _blocks(grid)
+    keep = set()
+    for s in grid.spawns:
+        for _a, _b, block in _block_chain(grid, blocks, s):
+            keep |= block
+    drop = grid.walkable - keep
+    return GridMap(grid.rows, grid.cols, grid.spawns, grid.target,
+                   grid.obstacles | drop, grid.unbuildables - drop,
+                   grid.preset_walls - drop)
+
+
+def reduced_bound(grid, *, time_limit=REDUCED_TIME, maximin_ub=None,
+                  blocks2=False, seed=0) -> float:
+    """Master MIP ObjBound on the reduced map after `time_limit` seconds.
+
+    In blocks2 mode the map is not reduced: dropping a cell would also
+    forbid the 2x2 blocks straddling it, which could lower the optimum.
+    """
+    from interdiction.master import MasterSolver
+
+    small = grid if blocks2 else reduced_grid(grid)
+    master = MasterSolver(small, rng=random.Random(seed), gurobi_seed=seed,
+                          blocks2=blocks2)
+    res = master.solve(time_limit=time_limit, maximin_ub=maximin_ub)
+    return res.bound
+
+
+def cheap_bounds(grid, methods, *, blocks2=False,
+                 reduced_time=REDUCED_TIME, seed=0) -> list:
+    """[(method, bound, seconds), ...] for the requested methods, in order.
+
+    Earlier bounds cap the objective of the `reduced` solve.
+    """
+    out = []
+    for method in methods:
+        t0 = time.monotonic()
+        if method == "colour":
+            val = colour_bound(grid)
+        elif method == "blockcut":
+            val = blockcut_bound(grid)
+        elif method == "reduced":
+            ub = min((b for _m, b, _t in out), default=None)
+            val = reduced_bound(grid, time_limit=reduced_time,
+                                maximin_ub=ub, blocks2=blocks2, seed=seed)
+        else:
+            raise ValueError(f"unknown bound method {method!r}")
+        out.append((method, val, time.monotonic() - t0))
+    return out
 
 
 def run_bound(grid, master, incumbent_walls, time_limit,
-              incumbent_anchors=None):
+              incumbent_anchors=None, progress=None, maximin_ub=None):
     """Solve the full map with the incumbent as MIP start.
 
     The returned result's `bound` (Gurobi ObjBound of the master, which is a
@@ -16,11 +222,167 @@ def run_bound(grid, master, incumbent_walls, time_limit,
     """
     warm = set(incumbent_walls) if incumbent_walls else None
     return master.solve(time_limit=time_limit, warm_start=warm,
-                        warm_anchors=incumbent_anchors)
+                        warm_anchors=incumbent_anchors, progress=progress,
+                        maximin_ub=maximin_ub)
 
 
-def gap(incumbent, bound):
-    """Relative optimality gap; inf when there is no meaningful incumbent."""
-    if not incumbent or incumbent <= 0:
+def gap(incumbent, *bounds):
+    """Relative optimality gap against the tightest of `bounds`.
+
+    None bounds are ignored; inf when there is no meaningful incumbent or
+    no bound.
+    """
+    bounds = [b for b in bounds if b is not None]
+    if not incumbent or incumbent <= 0 or not bounds:
         return math.inf
-    return (bound - incumbent) / incumbent
+    return (min(bounds) - incumbent) / incumbent
+
+
+def _bound_worker(grid, walls, anchors, time_limit, blocks2, seed, pool,
+                  gap_target, pool_every, maximin_ub, inbox, outbox, stop):
+    from interdiction.master import MasterSolver
+
+    master = MasterSolver(grid, rng=random.Random(seed), gurobi_seed=seed,
+                          blocks2=blocks2)
+    master.cut_pool |= pool
+    best = [grid.evaluate(walls)[0]]
+    t0 = time.monotonic()
+    last_print = [-math.inf]
+    last_pool = [time.monotonic()]
+
+    def inject():
+        got = None
+        while True:
+            try:
+                w, a, val = inbox.get_nowait()
+            except queue.Empty:
+                return got
+            if val > best[0]:
+                best[0] = val
+                got = (w, a)
+
+    def on_incumbent(w, a, val):
+        if val > best[0]:
+            best[0] = val
+            outbox.put(("incumbent", w, a, val))
+
+    def progress(_runtime, _incumbent, bound):
+        now = time.monotonic()
+        g = gap(best[0], bound)
+        if now - last_print[0] >= PROGRESS_EVERY:
+            print(f"[bound] t={now - t0:7.1f}s bound={bound:.1f} "
+                  f"incumbent={best[0]} gap={g:.3f}", flush=True)
+            outbox.put(("progress", bound, best[0], len(master.cut_pool)))
+            last_print[0] = now
+        if pool_every is not None and now - last_pool[0] >= pool_every:
+            outbox.put(("pool", set(master.cut_pool)))
+            last_pool[0] = now
+        return stop.is_set() or g <= gap_target
+
+    res = master.solve(time_limit=time_limit, warm_start=walls or None,
+                       warm_anchors=anchors, progress=progress,
+                       inject=inject, on_incumbent=on_incumbent,
+                       maximin_ub=maximin_ub)
+    outbox.put(("done", res.bound, res.walls, res.anchors, res.maximin,
+                set(master.cut_pool)))
+
+
+class ConcurrentBound:
+    """Full-map bound solve in a background process, concurrent with LNS.
+
+    Doubles as the LNS `exchange`: `offer()` sends LNS incumbents to the
+    bound solve as heuristic MIP solutions, `poll()` returns bound-side
+    incumbents better than anything seen, and `done()` turns true once
+    the bound solve has finished (optimal, out of time, or within
+    `gap_target` of the best known incumbent) so the LNS can stop early.
+    `on_progress(bound, incumbent, pool_size)` sees the worker's periodic
+    progress reports as they are polled; `pool_size` keeps the last
+    reported cut pool size.
+    """
+
+    def __init__(self, grid, walls, anchors=None, *, time_limit,
+                 blocks2=False, seed=0, pool=frozenset(), gap_target=0.0,
+                 pool_every=None, maximin_ub=None, on_progress=None):
+        ctx = mp.get_context("spawn")   # never fork a live Gurobi env
+        self.inbox = ctx.Queue()
+        self.outbox = ctx.Queue()
+        self.stop = ctx.Event()
+        self.best = grid.evaluate(walls)[0]
+        self.pool = set(pool)
+        self.pool_size = len(self.pool)
+        self.bound = math.inf
+        self.result = None      # (bound, walls, anchors, maximin) when done
+        self._fresh = None
+        self.on_progress = on_progress
+        self.proc = ctx.Process(
+            target=_bound_worker, daemon=True,
+            args=(grid, set(walls), anchors, time_limit, blocks2, seed,
+                  self.pool, gap_target, pool_every, maximin_ub, self.inbox,
+                  self.outbox, self.stop))
+
+    def start(self):
+        self.proc.start()
+        return self
+
+    def offer(self, walls, anchors, maximin):
+        if maximin > self.best:
+            self.best = maximin
+            self.inbox.put((set(walls), anchors, maximin))
+
+    def _handle(self, msg):
+        kind = msg[0]
+        if kind == "incumbent":
+            _kind, walls, anchors, val = msg
+            if val > self.best:
+                self.best = val
+                self._fresh = (walls, anchors, val)
+        elif kind == "pool":
+            self.pool = msg[1]
+            self.pool_size = len(self.pool)
+        elif kind == "progress":
+            self.pool_size = msg[3]
+            if self.on_progress is not None:
+                self.on_progress(*msg[1:])
+        else:
+            _kind, bound, walls, anchors, val, pool = msg
+            self.bound, self.pool = bound, pool
+            self.pool_size = len(pool)
+            self.result = (bound, walls, anchors, val)
+
+    def poll(self):
+        """(walls, anchors, maximin) of a new better bound-side incumbent."""
+        while True:
+            try:
+                self._handle(self.outbox.get_nowait())
+            except queue.Empty:
+                break
+        fresh, self._fresh = self._fresh, None
+        return fresh
+
+    def done(self):
+        return self.result is not None
+
+    def finish(self, timeout=FINISH_TIMEOUT):
+        """Stop the worker and return (bound, walls, anchors, maximin).
+
+        Bound is +inf (and walls None) if the worker never reported.
+        """
+        self.stop.set()
+        deadline = time.monotonic() + timeout
+        while self.result is None and time.monotonic() < deadline:
+            try:
+                self._handle(self.outbox.get(timeout=0.5))
+            except queue.Empty:
+                if not self.proc.is_alive() and self.outbox.empty():
+                    break
+        self.close()
+        if self.result is None:
+            print("warning: bound process did not report a bound",
+                  file=sys.stderr)
+            return math.inf, None, None, None
+        return self.result
+
+    def close(self):
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.proc.join(timeout=5)
@@ -0,0 +1,90 @@
+"""On-disk checkpoints of a long solver run.
+
+A checkpoint is gzip-compressed JSON holding the incumbent walls (and
+blocks2 anchors), the master's cut pool, the RNG state, the LNS trajectory
+and operator statistics, and the time already spent per phase. Cut-pool
+paths are stored as a start cell plus a U/D/L/R move string, which keeps a
+full 5,000-path pool on a 60x60 map to a few MB. Writes are atomic, so a
+crash mid-write leaves the previous checkpoint intact.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+
+VERSION = 1
+
+_MOVES = {(-1, 0): "U", (1, 0): "D", (0, -1): "L", (0, 1): "R"}
+_STEPS = {m: d for d, m in _MOVES.items()}
+
+
+def encode_path(path) -> list:
+    """[r, c, moves] for a 4-connected cell path."""
+    moves = "".join(_MOVES[(b[0] - a[0], b[1] - a[1])]
+                    for a, b in zip(path, path[1:]))
+    return [path[0][0], path[0][1], moves]
+
+
+def decode_path(enc) -> tuple:
+    r, c, moves = enc
+    path = [(r, c)]
+    for m in moves:
+        dr, dc = _STEPS[m]
+        r, c = r + dr, c + dc
+        path.append((r, c))
+    return tuple(path)
+
+
+def encode_pool(pool) -> list:
+    return [[k] + encode_path(p) for k, p in sorted(pool)]
+
+
+def decode_pool(data) -> set:
+    return {(k, decode_path(enc)) for k, *enc in data}
+
+
+def cells(data) -> set:
+    return {(r, c) for r, c in data}
+
+
+def encode_cells(cs) -> list:
+    return [list(v) for v in sorted(cs)]
+
+
+def encode_rng(rng) -> list:
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
+
+def restore_rng(rng, data) -> None:
+    version, internal, gauss = data
+    rng.setstate((version, tuple(internal), gauss))
+
+
+def map_fingerprint(grid) -> list:
+    """Identity of the map a checkpoint belongs to."""
+    return [grid.rows, grid.cols, encode_cells(grid.spawns),
+            list(grid.target), encode_cells(grid.obstacles),
+            encode_cells(grid.unbuildables)]
+
+
+def save_checkpoint(path, state) -> None:
+    state = dict(state, version=VERSION)
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, grid=None) -> dict:
+    """Read a checkpoint; ValueError if it is foreign or for another map."""
+    with gzip.open(path, "rt") as f:
+        state = json.load(f)
+    if state.get("version") != VERSION:
+        raise ValueError(f"unsupported checkpoint version "
+                         f"{state.get('version')!r}")
+    if grid is not None and state.get("map") != map_fingerprint(grid):
+        raise ValueError("checkpoint was written for a different map")
+    return state
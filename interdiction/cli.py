@@ -10,35 +10,128 @@ import argparse
 import os
 import random
 import sys
+import time
 
-from interdiction.bound import gap, run_bound
-from interdiction.grid import (parse_map, parse_solution, tile2_decompose,
+from interdiction import profiling
+from interdiction.archive import ARCHIVE_SIZE, EliteArchive
+from interdiction.bound import (BOUND_METHODS, PROGRESS_EVERY,
+                                ConcurrentBound, cheap_bounds, gap, run_bound)
+from interdiction.checkpoint import (cells, decode_pool, encode_cells,
+                                     encode_pool, encode_rng, load_checkpoint,
+                                     map_fingerprint, restore_rng,
+                                     save_checkpoint)
+from interdiction.grid import (load_map, parse_solution, tile2_decompose,
                                write_solution)
-from interdiction.lns import run_lns
-from interdiction.master import MasterSolver
+from interdiction.lns import REPAIR_RATIO, run_lns
+from interdiction.multilevel import multilevel_seed
+from interdiction.seedgen import STYLES, generate
+from interdiction.telemetry import Telemetry
 
 
-def _summary(grid, walls, bound_val=None):
+def _summary(grid, walls, bound_val=None, cheap=()):
+    """Solution report; the bound/gap lines use the tightest bound."""
     val, per = grid.evaluate(walls)
     lines = [f"walls: {len(walls)}"]
     for s, d in zip(grid.spawns, per):
         lines.append(f"spawn {s}: distance {d}")
     lines.append(f"maximin: {val}")
-    if bound_val is not None:
-        lines.append(f"bound: {bound_val:.1f}")
-        lines.append(f"gap: {gap(val, bound_val):.3f}")
+    bounds = [("mip", bound_val)] if bound_val is not None else []
+    bounds += [(method, b) for method, b, _t in cheap]
+    if bounds:
+        for method, b in bounds:
+            lines.append(f"bound ({method}): {b:.1f}")
+        lines.append(f"bound: {min(b for _m, b in bounds):.1f}")
+        lines.append(f"gap: {gap(val, *(b for _m, b in bounds)):.3f}")
     return "\n".join(lines)
 
 
-def main(argv=None) -> int:
+def _print_lns(lns):
+    for elapsed, it, v in lns.trajectory:
+        print(f"[lns] t={elapsed:7.1f}s iter={it:4d} maximin={v}")
+    if lns.memo_lookups:
+        print(f"[lns] memo: skipped {lns.memo_skips}/"
+              f"{lns.memo_lookups} windows "
+              f"({lns.memo_skips / lns.memo_lookups:.1%}), "
+              f"resumed {lns.memo_resumes}")
+        screened = lns.memo_lookups - lns.memo_skips
+        if screened:
+            print(f"[lns] screen: rejected {lns.screen_rejects}/"
+                  f"{screened} windows "
+                  f"({lns.screen_rejects / screened:.1%}) without a MIP")
+    for size, n, proved, median, limit in lns.time_profile:
+        print(f"[time] size={size} solves={n} proved={proved:.0%} "
+              f"median={median:.2f}s limit={limit:.2f}s")
+    for arm, st in lns.arm_stats:
+        print(f"[arm] {arm}: pulls={st.pulls} wins={st.wins} "
+              f"gain={st.gain} time={st.seconds:.1f}s "
+              f"rate={st.rate():.3f}/s")
+    st = lns.repair_stats
+    if st is not None and st.pulls:
+        print(f"[repair] pulls={st.pulls} wins={st.wins} gain={st.gain} "
+              f"time={st.seconds:.1f}s rate={st.rate():.3f}/s")
+
+
+def main(argv=None, report=None) -> int:
+    """Solve one map. `report`, if a dict, receives the run's results.
+
+    Keys: maximin, bound (tightest, or None), gap, walls (count), out and
+    phases (seconds per phase: bounds, coarse, exact, lns, bound).
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        from interdiction.batch import main as batch_main
+        return batch_main(argv[1:])
     p = argparse.ArgumentParser(prog="interdiction")
-    p.add_argument("map")
-    p.add_argument("--seed", help="solution file to seed initial walls from")
+    p.add_argument("map", help="text map, or a testcase JSON "
+                               "(grid_size, nucleus, spawns, obstacles)")
+    seeds = p.add_mutually_exclusive_group()
+    seeds.add_argument("--seed",
+                       help="solution file to seed initial walls from")
+    seeds.add_argument("--seed-gen", choices=STYLES,
+                       help="seed initial walls with a constructive maze "
+                            "pattern (interdiction.seedgen); only helps on "
+                            "separable maps like bridge.txt, elsewhere it "
+                            "falls back to the archive or the empty seed")
+    seeds.add_argument("--multilevel", type=int, metavar="K",
+                       help="seed initial walls from a coarse-to-fine "
+                            "solve on KxK supercells "
+                            "(interdiction.multilevel)")
+    p.add_argument("--levels", type=int, default=2,
+                   help="--multilevel: rounds of coarsening")
+    p.add_argument("--coarse-frac", type=float, default=0.25,
+                   help="--multilevel: fraction of --time spent on the "
+                        "coarse levels")
+    p.add_argument("--archive", nargs="?", const="", metavar="FILE",
+                   help="elite archive (default FILE: <map>.elites): seed "
+                        "from its best elite unless --seed/--seed-gen is "
+                        "given, path-relink LNS windows between its "
+                        "elites, and add the result to it")
+    p.add_argument("--archive-size", type=int, default=ARCHIVE_SIZE,
+                   help="distinct elites kept in the archive")
     p.add_argument("--time", type=float, default=3600.0,
                    help="total wall-clock budget in seconds")
+    p.add_argument("--bound-mode", choices=("concurrent", "sequential"),
+                   default="concurrent",
+                   help="run the full-map bound in a background process "
+                        "alongside LNS, or as a final phase after it")
     p.add_argument("--bound-frac", type=float, default=0.25,
-                   help="fraction of budget for the final full-map bound run")
-    p.add_argument("--subsolve-time", type=float, default=15.0)
+                   help="sequential mode: fraction of budget for the final "
+                        "full-map bound run")
+    p.add_argument("--bound-method", default="colour,blockcut",
+                   help="comma-separated cheap upper bounds to report "
+                        f"alongside the MIP bound ({', '.join(BOUND_METHODS)}"
+                        "; 'none' for none); the tightest caps the master "
+                        "objective")
+    p.add_argument("--gap-target", type=float, default=0.0,
+                   help="concurrent mode: stop once the relative gap "
+                        "between bound and incumbent reaches this")
+    p.add_argument("--subsolve-time", type=float, default=15.0,
+                   help="base per-window time limit; adapted per window "
+                        "size from observed solve times")
+    p.add_argument("--subsolve-cap", type=float,
+                   help="hard per-window cap for windows still finding "
+                        "incumbents (default 4x --subsolve-time)")
     p.add_argument("--no-corridor-hint", action="store_true",
                    help="disable corridor-structure constraints in LNS windows")
     p.add_argument("--blocks2", action="store_true",
@@ -46,18 +139,112 @@ def main(argv=None) -> int:
                         "blocks (disables corridor hints)")
     p.add_argument("--window-sizes", default="12,16,20",
                    help="comma-separated LNS window sizes")
+    p.add_argument("--repair-ratio", type=float, default=REPAIR_RATIO,
+                   help="share of LNS windows rebuilt by MIP-free "
+                        "annealing instead of an exact Gurobi solve")
     p.add_argument("--rng-seed", type=int, default=0)
     p.add_argument("--out", help="solution output path")
     p.add_argument("--exact", action="store_true",
                    help="single full-map exact solve, no LNS")
     p.add_argument("--eval-only", action="store_true",
                    help="evaluate seed/preset walls and exit")
+    p.add_argument("--checkpoint",
+                   help="periodically write resumable solver state here "
+                        "(default with --resume: the resumed file)")
+    p.add_argument("--checkpoint-every", type=float, default=300.0,
+                   help="seconds between checkpoints")
+    p.add_argument("--resume",
+                   help="continue the LNS/bound run saved in a checkpoint")
+    p.add_argument("--telemetry",
+                   help="append live JSON-lines records (one per LNS window, "
+                        "bound progress, phase times) to this file; "
+                        "summarize with python -m interdiction.telemetry")
+    p.add_argument("--profile", action="store_true",
+                   help="print a per-phase timer/counter table at exit "
+                        "(this process only, not the concurrent bound)")
+    p.add_argument("--profile-dump", metavar="DIR",
+                   help="with --profile: write a cProfile dump per phase")
+    p.add_argument("--profile-memory", action="store_true",
+                   help="with --profile-dump: also write tracemalloc "
+                        "snapshots per phase")
     args = p.parse_args(argv)
+    if args.profile:
+        profiling.reset()
+        profiling.enable(args.profile_dump, memory=args.profile_memory)
+    methods = [m for m in args.bound_method.split(",") if m and m != "none"]
+    unknown = set(methods) - set(BOUND_METHODS)
+    if unknown:
+        p.error(f"unknown --bound-method {', '.join(sorted(unknown))}")
 
-    grid = parse_map(args.map)
-    walls = set(grid.preset_walls)
-    if args.seed:
-        walls |= parse_solution(grid, args.seed)
+    grid = load_map(args.map)
+    phases = {}
+    archive = archive_path = None
+    if args.archive is not None:
+        archive_path = args.archive or \
+            os.path.splitext(args.map)[0] + ".elites"
+        try:
+            archive = EliteArchive.load(archive_path, grid,
+                                        args.archive_size)
+        except (OSError, ValueError) as e:
+            print(f"error: cannot read archive {archive_path}: {e}",
+                  file=sys.stderr)
+            return 2
+    state = None
+    if args.resume:
+        try:
+            state = load_checkpoint(args.resume, grid)
+        except (OSError, ValueError) as e:
+            print(f"error: cannot resume from {args.resume}: {e}",
+                  file=sys.stderr)
+            return 2
+        walls = cells(state["walls"])
+    else:
+        walls = set(grid.preset_walls)
+        if args.seed:
+            walls |= parse_solution(grid, args.seed)
+        elif args.seed_gen:
+            t0 = time.perf_counter()
+            base = walls
+            walls, gen_val, n = generate(grid, args.seed_gen,
+                                         blocks2=args.blocks2, base=base)
+            print(f"[seed-gen] {args.seed_gen}: maximin={gen_val} "
+                  f"walls={len(walls)} ({n} variants, "
+                  f"{1000 * (time.perf_counter() - t0):.0f}ms)")
+            # the patterns only pay off on separable maps: never start
+            # below the archive or the empty seed
+            if archive is not None and archive.elites and \
+                    archive.best().maximin > (gen_val or 0):
+                walls = base | archive.best().walls
+                print(f"[seed-gen] worse than the archive; seeding from "
+                      f"its best (maximin {archive.best().maximin})")
+            elif walls == base:
+                print("[seed-gen] no pattern beats the empty seed; "
+                      "keeping it")
+        elif args.multilevel:
+            t_phase = time.monotonic()
+            walls, history = multilevel_seed(
+                grid, factor=args.multilevel, levels=args.levels,
+                total_time=args.time * args.coarse_frac,
+                rng=random.Random(args.rng_seed), blocks2=args.blocks2,
+                base=walls, subsolve_time=args.subsolve_time,
+                corridor_hint=not args.no_corridor_hint,
+                window_sizes=tuple(int(x)
+                                   for x in args.window_sizes.split(",")),
+                subsolve_cap=args.subsolve_cap,
+                repair_ratio=args.repair_ratio)
+            phases["coarse"] = time.monotonic() - t_phase
+            # the coarse levels spend part of the overall budget
+            args.time = max(args.time - phases["coarse"], 1.0)
+            for rows, cols, start, end, secs in history:
+                print(f"[multilevel] {rows}x{cols}: maximin {start} -> "
+                      f"{end} ({secs:.1f}s)")
+            print(f"[multilevel] projected: maximin "
+                  f"{grid.evaluate(walls)[0]} walls={len(walls)}")
+        elif archive is not None and archive.elites:
+            walls |= archive.best().walls
+            print(f"[archive] seeding from the best of "
+                  f"{len(archive.elites)} elites "
+                  f"(maximin {archive.best().maximin})")
     val, _ = grid.evaluate(walls)
 
     if args.eval_only:
@@ -67,6 +254,14 @@ def main(argv=None) -> int:
         print(_summary(grid, walls))
         return 0
 
+    # bounds only serve the solve; `reduced` would load gurobipy
+    cheap = cheap_bounds(grid, methods, blocks2=args.blocks2,
+                         seed=args.rng_seed)
+    phases["bounds"] = sum(secs for _m, _b, secs in cheap)
+    for method, b, secs in cheap:
+        print(f"[bound] {method}: {b:.1f} ({secs:.2f}s)")
+    cheap_ub = min((b for _m, b, _t in cheap), default=None)
+
     if val is None:
         # preset/seed walls are only warm-start hints — recover, don't abort
         print("warning: initial walls disconnect a spawn — "
@@ -83,42 +278,175 @@ def main(argv=None) -> int:
             walls = set()
 
     rng = random.Random(args.rng_seed)
+    # gurobipy loads only past --eval-only
+    from interdiction.master import MasterSolver
+
     master = MasterSolver(grid, rng=rng, gurobi_seed=args.rng_seed,
                           output=args.exact, blocks2=args.blocks2)
+    if state is not None:
+        restore_rng(rng, state["rng"])
+        master.cut_pool = decode_pool(state["cut_pool"])
     out = args.out or os.path.splitext(args.map)[0] + "_milp_solution.txt"
+    ckpt_path = args.checkpoint or args.resume
+    resume_phase = state["phase"] if state is not None else "lns"
+    lns_snap = state["lns"] if state is not None else None
+    bound_spent = state["bound_elapsed"] if state is not None else 0.0
+
+    def checkpoint(phase, bound_elapsed=0.0, bound=None, walls=None):
+        if ckpt_path is None:
+            return
+        save_checkpoint(ckpt_path, {
+            "map": map_fingerprint(grid), "phase": phase,
+            "walls": (lns_snap["walls"] if walls is None
+                      else encode_cells(walls)),
+            "lns": lns_snap,
+            "bound_elapsed": bound_elapsed, "bound": bound,
+            "cut_pool": encode_pool(master.cut_pool),
+            "rng": encode_rng(rng)})
+
+    exchange = None
+
+    def on_lns_checkpoint(snap):
+        nonlocal lns_snap
+        lns_snap = snap
+        if exchange is not None:
+            master.cut_pool |= exchange.pool
+        checkpoint("lns")
+
+    tel = Telemetry(args.telemetry) if args.telemetry else None
+
+    def bound_progress(bound, incumbent, pool):
+        if tel is not None:
+            tel.emit("bound", bound=bound, incumbent=incumbent,
+                     gap=gap(incumbent, bound, cheap_ub), pool=pool)
 
     best, bound_val = walls, None
+    if resume_phase == "done":
+        bound_val = state["bound"]
     try:
         if args.exact:
-            res = master.solve(time_limit=args.time,
-                               warm_start=walls or None,
-                               warm_anchors=seed_anchors)
+            t_phase = time.monotonic()
+            with profiling.phase("exact"):
+                res = master.solve(time_limit=args.time,
+                                   warm_start=walls or None,
+                                   warm_anchors=seed_anchors,
+                                   maximin_ub=cheap_ub)
             if res.walls is not None:
                 best = res.walls
             bound_val = res.bound
-        else:
-            window_sizes = tuple(
-                int(x) for x in args.window_sizes.split(","))
-            lns = run_lns(grid, walls,
-                          total_time=args.time * (1 - args.bound_frac),
-                          subsolve_time=args.subsolve_time, rng=rng,
-                          corridor_hint=not args.no_corridor_hint,
-                          window_sizes=window_sizes, blocks2=args.blocks2)
-            best = lns.walls
-            for elapsed, it, v in lns.trajectory:
-                print(f"[lns] t={elapsed:7.1f}s iter={it:4d} maximin={v}")
-            if not lns.interrupted:
-                bres = run_bound(grid, master, best,
-                                 time_limit=args.time * args.bound_frac,
-                                 incumbent_anchors=lns.anchors)
+            phases["exact"] = time.monotonic() - t_phase
+        elif resume_phase != "done":
+            window_sizes = tuple(int(x) for x in args.window_sizes.split(","))
+            concurrent = (args.bound_mode == "concurrent"
+                          and resume_phase == "lns")
+            lns_time = args.time if concurrent else \
+                args.time * (1 - args.bound_frac)
+            if concurrent:
+                spent = lns_snap["elapsed"] if lns_snap is not None else 0.0
+                exchange = ConcurrentBound(
+                    grid, walls, seed_anchors,
+                    time_limit=max(args.time - spent, 1.0),
+                    blocks2=args.blocks2, seed=args.rng_seed,
+                    pool=master.cut_pool, gap_target=args.gap_target,
+                    maximin_ub=cheap_ub, on_progress=bound_progress,
+                    pool_every=(args.checkpoint_every if ckpt_path
+                                else None)).start()
+            try:
+                if resume_phase == "lns":
+                    t_phase = time.monotonic()
+                    with profiling.phase("lns"):
+                        lns = run_lns(grid, walls, total_time=lns_time,
+                                      subsolve_time=args.subsolve_time,
+                                      rng=rng,
+                                      corridor_hint=not args.no_corridor_hint,
+                                      window_sizes=window_sizes,
+                                      blocks2=args.blocks2,
+                                      subsolve_cap=args.subsolve_cap,
+                                      resume=lns_snap,
+                                      on_checkpoint=on_lns_checkpoint,
+                                      checkpoint_every=args.checkpoint_every,
+                                      repair_ratio=args.repair_ratio,
+                                      exchange=exchange, telemetry=tel,
+                                      elites=[e.walls for e in
+                                              archive.elites]
+                                      if archive is not None else ())
+                    best = lns.walls
+                    phases["lns"] = time.monotonic() - t_phase
+                    _print_lns(lns)
+                    interrupted = lns.interrupted
+                else:
+                    interrupted = False
+                if concurrent and not interrupted:
+                    t_phase = time.monotonic()
+                    bound_val, bwalls, _anchors, bval = exchange.finish()
+                    # overlaps the LNS; only the wait after it is extra
+                    phases["bound"] = time.monotonic() - t_phase
+                    master.cut_pool |= exchange.pool
+                    if bval is not None and bval > grid.evaluate(best)[0]:
+                        best = bwalls
+                    checkpoint("done", bound=bound_val, walls=best)
+            finally:
+                if exchange is not None:
+                    exchange.close()
+            if not interrupted and not concurrent:
+                anchors = (cells(lns_snap["anchors"])
+                           if args.blocks2 else None)
+                last = last_tel = t_phase = time.monotonic()
+
+                def progress(runtime, incumbent, bound):
+                    nonlocal last, last_tel
+                    if time.monotonic() - last >= args.checkpoint_every:
+                        checkpoint("bound", bound_spent + runtime)
+                        last = time.monotonic()
+                    if time.monotonic() - last_tel >= PROGRESS_EVERY:
+                        bound_progress(bound, incumbent,
+                                       len(master.cut_pool))
+                        last_tel = time.monotonic()
+
+                with profiling.phase("bound"):
+                    bres = run_bound(grid, master, best,
+                                     time_limit=(args.time * args.bound_frac
+                                                 - bound_spent),
+                                     incumbent_anchors=anchors,
+                                     progress=progress, maximin_ub=cheap_ub)
                 bound_val = bres.bound
+                phases["bound"] = time.monotonic() - t_phase
                 if bres.maximin is not None and \
                         bres.maximin > grid.evaluate(best)[0]:
                     best = bres.walls
+                checkpoint("done", bound_spent + bres.runtime, bound_val,
+                           walls=best)
     except KeyboardInterrupt:
         print("\ninterrupted — writing best solution so far", file=sys.stderr)
 
+    if tel is not None:
+        for phase, secs in phases.items():
+            tel.emit("phase", phase=phase, seconds=secs)
+        tel.close()
     write_solution(grid, best, out)
-    print(_summary(grid, best, bound_val))
+    print(_summary(grid, best, bound_val, cheap))
     print(f"solution written to {out}")
+    if archive is not None:
+        added = archive.add(best)
+        try:
+            archive.save(archive_path)
+        except (OSError, ValueError) as e:
+            # the solution is already written; a bad archive costs no run
+            print(f"warning: cannot save archive {archive_path}: {e}",
+                  file=sys.stderr)
+        else:
+            print(f"[archive] {'added to' if added else 'kept'} "
+                  f"{archive_path}: {len(archive.elites)} elites, best "
+                  f"{archive.best().maximin}")
+    if args.profile:
+        print(profiling.format_report())
+        profiling.disable()
+    if report is not None:
+        val = grid.evaluate(best)[0]
+        bounds = [b for _m, b, _t in cheap]
+        if bound_val is not None:
+            bounds.append(bound_val)
+        report.update(maximin=val, bound=min(bounds, default=None),
+                      gap=gap(val, *bounds), walls=len(best), out=out,
+                      phases=phases)
     return 0
@@ -1,4 +1,4 @@
-"""Exact portal contraction of a rectangular window against a fixed outside.
+"""Exact portal contraction of a window against a fixed outside.
 
 Any spawn->target path alternates outside segments (through the fixed part
 of the map) and inside segments (through the window). Outside segments are
@@ -7,6 +7,12 @@ adjacent to the window), spawns outside the window, and the target if
 outside. Window cells stay explicit. Shortest distances in the contracted
 graph therefore equal full-grid BFS distances for every assignment of walls
 to window cells.
+
+The window is any cell set: a rectangle, a band along a path, or several
+disjoint regions freed together. With several regions the portals of every
+region are terminals, so region-to-region stretches of the outside become
+shared weighted edges and the subproblem stays small however far apart
+the regions are.
 """
 
 from __future__ import annotations
@@ -15,6 +21,8 @@ import heapq
 from collections import deque
 from dataclasses import dataclass, field
 
+from interdiction import profiling
+
 Cell = tuple[int, int]
 
 
@@ -32,32 +40,114 @@ class ContractedWindow:
         cells can be walls — outside walls are already baked into the graph.
         """
         blocked = set(window_walls)
+        # one search from the target serves every spawn: the graph is
+        # undirected and prev pointers lead each spawn back to the target
+        t = self.grid.target
+        dist, prev = self._from(t, blocked, stop=set(self.grid.spawns))
         out = []
         for s in self.grid.spawns:
-            dist, prev = self._from(s, blocked)
-            d = dist.get(self.grid.target)
+            d = dist.get(s)
             if d is None:
                 out.append((None, None))
                 continue
             cells = []
-            cur = self.grid.target
-            while cur != s:
+            cur = s
+            while cur != t:
                 if cur in self.window:
                     cells.append(cur)
                 cur = prev[cur]
-            if s in self.window:
-                cells.append(s)
+            if t in self.window:
+                cells.append(t)
             out.append((d, cells))
         return out
 
-    def _from(self, src, blocked):
+    def maximin_upper_bound(self) -> float:
+        """Cheap valid upper bound on the window's best achievable maximin.
+
+        Walls only lengthen paths, so a spawn still connected to the target
+        with every free cell walled is capped at that distance. Otherwise
+        every path crosses free cells; splitting the walled graph into
+        components, a shortest path spends at most ecc(s) in the spawn's
+        component, at most one gate-to-gate diameter in every other
+        component (between its first entry and last exit), at most
+        ecc(t) in the target's, plus one step per free cell and per
+        component entry. The result is rounded down to the spawn's parity;
+        -inf means no wall assignment connects every spawn.
+        """
+        free = self.free
+        comp = {}
+        for u in self.adj:
+            if u in free or u in comp:
+                continue
+            comp[u] = u
+            stack = [u]
+            while stack:
+                a = stack.pop()
+                for b, _w in self.adj[a]:
+                    if b not in free and b not in comp:
+                        comp[b] = u
+                        stack.append(b)
+        gates: dict = {}            # component -> nodes adjacent to free cells
+        for v in free:
+            for u, _w in self.adj.get(v, ()):
+                if u not in free:
+                    gates.setdefault(comp[u], set()).add(u)
+
+        g = self.grid
+        t = g.target
+        from_t = self._from(t, free)[0]
+        spread = {}                 # component -> gate-to-gate diameter bound
+        best = float("inf")
+        for s in g.spawns:
+            from_s = self._from(s, free)[0]
+            if t in from_s:
+                ub = from_s[t]
+            else:
+                cs, ct = comp.get(s, s), comp.get(t, t)
+                if cs not in gates or ct not in gates:
+                    return float("-inf")
+                ub = (max(from_s[u] for u in gates[cs])
+                      + max(from_t[u] for u in gates[ct]) + 1
+                      + sum(1 for v in free if v in self.adj))
+                for c, gs in gates.items():
+                    if c in (cs, ct):
+                        continue
+                    if c not in spread:
+                        g0 = next(iter(gs))
+                        d0 = self._from(g0, free)[0]
+                        spread[c] = 2 * max(d0[u] for u in gs)
+                    ub += spread[c] + 1
+            ub -= (ub - g.manhattan_parity(s)) % 2
+            best = min(best, ub)
+        return best
+
+    def signature(self) -> frozenset:
+        """The contracted graph's edges — equal for identical subproblems.
+
+        Outside walls only enter the window model through the terminal
+        edges, so two outside configurations with the same signature give
+        the same window optimum. The edge set itself, not its hash, so a
+        hash collision cannot pass for a solved subproblem.
+        """
+        return frozenset((u, v, w)
+                         for u, nbrs in self.adj.items()
+                         for v, w in nbrs)
+
+    def _from(self, src, blocked, stop=None):
+        """Dijkstra from src around `blocked`; with `stop`, ends once every
+        node of `stop` reachable from src is settled."""
         dist = {src: 0}
         prev = {}
         pq = [(0, src)]
+        pending = set(stop) if stop is not None else None
         while pq:
             d, u = heapq.heappop(pq)
             if d > dist.get(u, float("inf")):
                 continue
+            if pending is not None:
+                pending.discard(u)
+                if not pending:
+                    break
             for v, w in self.adj.get(u, ()):
                 if v in blocked:
                     continue
@@ -69,8 +159,11 @@ class ContractedWindow:
         return dist, prev
 
 
-def _bfs(grid, src, allowed):
+def _bfs(grid, src, allowed, stop=None):
+    """BFS distances from src within `allowed`; with `stop`, ends as soon
+    as every cell of `stop` has been reached."""
     dist = {src: 0}
+    pending = set(stop) - {src} if stop is not None else None
     q = deque([src])
     while q:
         u = q.popleft()
@@ -78,10 +171,19 @@ def _bfs(grid, src, allowed):
             if v in allowed and v not in dist:
                 dist[v] = dist[u] + 1
                 q.append(v)
+                if pending is not None:
+                    pending.discard(v)
+                    if not pending:
+                        return dist
     return dist
 
 
 def contract(grid, window_cells, outside_walls) -> ContractedWindow:
+    with profiling.timer("contract"):
+        return _contract(grid, window_cells, outside_walls)
+
+
+def _contract(grid, window_cells, outside_walls):
     window = frozenset(window_cells)
     inside = window & grid.walkable
     free = window & grid.buildable
@@ -96,7 +198,14 @@ def contract(grid, window_cells, outside_walls) -> ContractedWindow:
     if grid.target not in window:
         terminals.add(grid.target)
 
-    dout = {t: _bfs(grid, t, out_open) for t in terminals}
+    # full searches only from the few spawns/target; portal searches stop
+    # once every other portal is reached (distances are symmetric, so a
+    # portal's distance to a spawn/target is read off that side's search)
+    profiling.count("contract.portals", len(portals))
+    with profiling.timer("contract.bfs"):
+        dout = {t: _bfs(grid, t, out_open) for t in terminals - portals}
+        for p in portals:
+            dout[p] = _bfs(grid, p, out_open, stop=portals)
 
     adj: dict = {}
 
@@ -115,9 +224,14 @@ def contract(grid, window_cells, outside_walls) -> ContractedWindow:
     terms = sorted(terminals)
     for i, a in enumerate(terms):
         for b in terms[i + 1:]:
-            if a in spawn_out and b in spawn_out:
-                continue            # a path never runs spawn -> spawn
+            if a in spawn_out and b in spawn_out and \
+                    a not in portals and b not in portals:
+                # a path through another spawn's cell is covered by the
+                # direct edge past it — unless that spawn is the portal
+                continue
             d = dout[a].get(b)
+            if d is None:
+                d = dout[b].get(a)
             if d:
                 add(a, b, d)
 
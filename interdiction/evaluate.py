@@ -0,0 +1,109 @@
+"""Solver-free batch evaluation of solution files against one map.
+
+    myenv/bin/python -m interdiction.evaluate maps/endless.txt \
+        maps/endless_*_solution.txt
+    cat sol.txt | myenv/bin/python -m interdiction.evaluate maps/endless.txt -
+
+Never imports gurobipy: the map is parsed once and every solution is one
+BFS. Prints one line per solution (tab-separated, or JSON lines with
+`--json`): name, maximin (or "disconnected"), wall count and per-spawn
+distances. With `-` several solutions may be piped in, separated by blank
+lines. `--timing` reports startup, parse and per-solution times on stderr;
+startup is the wall-clock time from process start to main() (interpreter
+and imports), read from /proc where available.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from interdiction.grid import load_map, parse_solution, parse_solution_text
+
+
+def split_stdin(text) -> list:
+    """Solution texts in `text`, separated by one or more blank lines."""
+    blocks, cur = [], []
+    for line in text.splitlines():
+        if line.strip():
+            cur.append(line)
+        elif cur:
+            blocks.append("\n".join(cur))
+            cur = []
+    if cur:
+        blocks.append("\n".join(cur))
+    return blocks
+
+
+def evaluate_all(grid, sources):
+    """Yield (name, walls, maximin, per_spawn) for (name, walls) sources."""
+    for name, walls in sources:
+        val, per = grid.evaluate(walls)
+        yield name, walls, val, per
+
+
+def process_age():
+    """Wall-clock seconds since this process started; None without /proc."""
+    try:
+        with open("/proc/self/stat") as f:
+            # fields after the parenthesised command; starttime is field 22
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _sources(grid, paths, stdin):
+    for path in paths:
+        if path == "-":
+            for i, text in enumerate(split_stdin(stdin.read())):
+                yield f"<stdin:{i}>", parse_solution_text(grid, text)
+        else:
+            yield path, parse_solution(grid, path)
+
+
+def main(argv=None) -> int:
+    startup = process_age()
+    p = argparse.ArgumentParser(prog="interdiction.evaluate")
+    p.add_argument("map", help="text map or testcase JSON")
+    p.add_argument("solutions", nargs="*", default=["-"],
+                   help="solution files; '-' (default) reads solutions "
+                        "from stdin")
+    p.add_argument("--json", action="store_true",
+                   help="JSON lines instead of tab-separated output")
+    p.add_argument("--timing", action="store_true",
+                   help="report startup/parse/evaluation times on stderr")
+    args = p.parse_args(argv)
+
+    t_parse = time.perf_counter()
+    grid = load_map(args.map)
+    t_eval = time.perf_counter()
+    n = bad = 0
+    sources = _sources(grid, args.solutions, sys.stdin)
+    for name, walls, val, per in evaluate_all(grid, sources):
+        n += 1
+        bad += val is None
+        if args.json:
+            print(json.dumps({"name": name, "maximin": val,
+                              "walls": len(walls), "per_spawn": list(per)}))
+        else:
+            print(f"{name}\t{'disconnected' if val is None else val}\t"
+                  f"{len(walls)}\t{','.join(str(d) for d in per)}")
+    t_end = time.perf_counter()
+    if args.timing:
+        startup = "n/a" if startup is None else f"{1000 * startup:.1f}ms"
+        print(f"[timing] startup={startup} "
+              f"parse={1000 * (t_eval - t_parse):.1f}ms "
+              f"evaluate={1000 * (t_end - t_eval):.1f}ms "
+              f"({1000 * (t_end - t_eval) / max(n, 1):.2f}ms/solution, "
+              f"{n} solutions)", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
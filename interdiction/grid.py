@@ -5,9 +5,12 @@ No solver dependencies — shared by the MILP master, the LNS driver and tests.
 
 from __future__ import annotations
 
+import json
 from collections import deque
 from dataclasses import dataclass
 
+from interdiction import profiling
+
 Cell = tuple[int, int]
 
 _DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
@@ -65,16 +68,17 @@ class GridMap:
 
     def dist_field(self, walls) -> dict[Cell, int]:
         """BFS distances to target over walkable cells, excluding walls."""
-        walls = set(walls)
-        dist = {self.target: 0}
-        q = deque([self.target])
-        while q:
-            u = q.popleft()
-            for v in self.neighbors(u):
-                if v not in dist and v not in walls:
-                    dist[v] = dist[u] + 1
-                    q.append(v)
-        return dist
+        with profiling.timer("dist_field"):
+            walls = set(walls)
+            dist = {self.target: 0}
+            q = deque([self.target])
+            while q:
+                u = q.popleft()
+                for v in self.neighbors(u):
+                    if v not in dist and v not in walls:
+                        dist[v] = dist[u] + 1
+                        q.append(v)
+            return dist
 
     def evaluate(self, walls):
         """(maximin, per-spawn distances); maximin None if any spawn cut off."""
@@ -112,7 +116,12 @@ class GridMap:
 
 def parse_map(path: str) -> GridMap:
     with open(path) as f:
-        lines = [ln.rstrip("\n") for ln in f if ln.strip()]
+        return parse_map_text(f.read())
+
+
+def parse_map_text(text: str) -> GridMap:
+    """`parse_map` for map text already in memory."""
+    lines = [ln for ln in text.splitlines() if ln.strip()]
     if not lines:
         raise ValueError("empty map file")
     rows, cols = len(lines), len(lines[0])
@@ -143,9 +152,12 @@ def parse_map(path: str) -> GridMap:
     if target is None:
         raise ValueError("no target (T) in map")
 
-    g = GridMap(rows, cols, tuple(spawns), target,
-                frozenset(obstacles), frozenset(unbuildables), frozenset(preset))
+    return _checked(GridMap(rows, cols, tuple(spawns), target,
+                            frozenset(obstacles), frozenset(unbuildables),
+                            frozenset(preset)))
 
+
+def _checked(g: GridMap) -> GridMap:
     maximin, per = g.evaluate(set())
     if maximin is None:
         bad = [s for s, d in zip(g.spawns, per) if d is None]
@@ -153,6 +165,39 @@ def parse_map(path: str) -> GridMap:
     return g
 
 
+def parse_testcase(path: str) -> GridMap:
+    """Read a testcase/*.json map: grid_size, nucleus, spawns, obstacles.
+
+    Coordinates are [row, col]; the nucleus is the target. Other keys
+    (expected lengths, descriptions) are ignored.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    try:
+        rows, cols = data["grid_size"]
+        target = tuple(data["nucleus"])
+        spawns = tuple(tuple(s) for s in data["spawns"])
+        obstacles = frozenset(tuple(o) for o in data.get("obstacles", ()))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"malformed testcase: {e}") from None
+    if not spawns:
+        raise ValueError("no spawns in testcase")
+    cells = set(spawns) | {target} | obstacles
+    if any(not (0 <= r < rows and 0 <= c < cols) for r, c in cells):
+        raise ValueError("testcase cell outside grid_size")
+    if (set(spawns) | {target}) & obstacles:
+        raise ValueError("spawn or nucleus on an obstacle")
+    return _checked(GridMap(rows, cols, spawns, target, obstacles,
+                            frozenset(), frozenset()))
+
+
+def load_map(path: str) -> GridMap:
+    """Map from either format: testcase JSON by extension, else a text map."""
+    if path.endswith(".json"):
+        return parse_testcase(path)
+    return parse_map(path)
+
+
 def parse_solution(grid: GridMap, path: str) -> set[Cell]:
     """Read placed walls from a solution map file.
 
@@ -161,7 +206,12 @@ def parse_solution(grid: GridMap, path: str) -> set[Cell]:
     buildable in the base map count — base obstacles stay obstacles.
     """
     with open(path) as f:
-        lines = [ln.rstrip("\n") for ln in f if ln.strip()]
+        return parse_solution_text(grid, f.read())
+
+
+def parse_solution_text(grid: GridMap, text: str) -> set[Cell]:
+    """`parse_solution` for a solution map already in memory."""
+    lines = [ln for ln in text.splitlines() if ln.strip()]
     return {(r, c)
             for r, row in enumerate(lines)
             for c, ch in enumerate(row)
@@ -0,0 +1,107 @@
+"""Distance-to-target field kept up to date under single-wall edits.
+
+`GridMap.dist_field` recomputes a full BFS per wall set. `DistField` holds
+one field and repairs it locally: removing a wall can only shorten
+distances, so a BFS relaxation from the freed cell suffices; adding a wall
+can only lengthen them, and only for cells that lose every shortest-path
+parent — those are found level by level and re-settled from their
+unaffected neighbors. Results always equal `grid.dist_field(walls)`.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import deque
+
+
+class DistField:
+    def __init__(self, grid, walls=()):
+        self.grid = grid
+        self.walls = set(walls)
+        self.dist = grid.dist_field(self.walls)
+
+    def evaluate(self):
+        """Same as `grid.evaluate(self.walls)`, from the held field."""
+        per = tuple(self.dist.get(s) for s in self.grid.spawns)
+        if any(d is None for d in per):
+            return None, per
+        return min(per), per
+
+    def shortest_path(self, spawn, rng=None):
+        return self.grid.shortest_path(self.walls, spawn, dist=self.dist,
+                                       rng=rng)
+
+    def add_wall(self, v) -> None:
+        if v in self.walls:
+            return
+        if v not in self.grid.buildable:
+            raise ValueError(f"cell {v} is not buildable")
+        self.walls.add(v)
+        dist = self.dist
+        dv = dist.pop(v, None)
+        if dv is None:
+            return      # was already cut off: nothing depended on it
+
+        # cells whose every parent (neighbor one step closer) is affected
+        affected = set()
+        level = [u for u in self.grid.neighbors(v) if dist.get(u) == dv + 1]
+        while level:
+            nxt = []
+            for u in level:
+                if u in affected:
+                    continue
+                du = dist[u]
+                if any(dist.get(w) == du - 1 and w not in affected
+                       for w in self.grid.neighbors(u)):
+                    continue
+                affected.add(u)
+                nxt += [w for w in self.grid.neighbors(u)
+                        if dist.get(w) == du + 1]
+            level = nxt
+        if not affected:
+            return
+
+        # re-settle the affected cells from their unaffected boundary
+        for u in affected:
+            del dist[u]
+        heap = []
+        for u in affected:
+            best = min((dist[w] + 1 for w in self.grid.neighbors(u)
+                        if w in dist), default=None)
+            if best is not None:
+                heap.append((best, u))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in dist:
+                continue
+            dist[u] = d
+            for w in self.grid.neighbors(u):
+                if w in affected and w not in dist:
+                    heapq.heappush(heap, (d + 1, w))
+
+    def remove_wall(self, v) -> None:
+        if v not in self.walls:
+            return
+        self.walls.discard(v)
+        dist = self.dist
+        best = min((dist[w] + 1 for w in self.grid.neighbors(v)
+                    if w in dist), default=None)
+        if best is None:
+            return      # freed into a cut-off pocket
+        dist[v] = best
+        q = deque([v])
+        while q:
+            u = q.popleft()
+            for w in self.grid.neighbors(u):
+                if w in self.walls:
+                    continue
+                if dist.get(w, float("inf")) > dist[u] + 1:
+                    dist[w] = dist[u] + 1
+                    q.append(w)
+
+    def apply(self, add=(), remove=()) -> None:
+        for v in remove:
+            self.remove_wall(v)
+        for v in add:
+            self.add_wall(v)
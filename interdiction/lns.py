@@ -1,17 +1,47 @@
-"""Large-neighborhood search: exact contracted-window re-optimization."""
+"""Large-neighborhood search: exact contracted-window re-optimization.
+
+Which window to free next is an adaptive choice: every (size, center
+strategy, corridor hint, shape) combination is an arm of a discounted UCB
+bandit rewarded by maximin gain per second spent, so operators that keep
+paying off on a given map get the budget and dead ones fade out. A memo
+of every window solve skips subproblems already proven unable to beat the
+incumbent, a millisecond combinatorial bound screens out windows that
+cannot improve before any model is built, and per-size solve-time
+profiles set each window's time limit. A `repair_ratio` share of windows
+skips Gurobi entirely and is rebuilt by a short annealing run
+(interdiction.repair). Given archived elites (interdiction.archive),
+path-relinking windows free only the cells where two of them differ, so
+structure found by earlier runs is recombined by exact subsolves.
+"""
 
 from __future__ import annotations
 
+import math
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import astuple, dataclass, field, fields
 
+from interdiction import profiling
+from interdiction.checkpoint import cells, encode_cells
 from interdiction.contract import contract
 from interdiction.grid import square2, tile2_decompose
-from interdiction.window_master import solve_window
+from interdiction.repair import repair_window
 
 WINDOW_SIZES = (12, 16, 20)
-STALL_LIMIT = 20
-RANDOM_CENTER_PROB = 0.2
+CENTER_STRATEGIES = ("path", "random")
+PATH_SHAPES = ("band", "bands", "pair")
+BAND_RADIUS = 2         # band half-width (Chebyshev) around path cells
+ARM_DISCOUNT = 0.98     # per-pull decay of arm history (non-stationary rewards)
+UCB_EXPLORE = 0.5       # exploration weight; rewards are normalized to [0, 1]
+MEMO_RESUME_FACTOR = 2  # a timed-out window seen again gets this much more time
+SUBSOLVE_CAP_FACTOR = 4     # default hard cap = this multiple of subsolve_time
+PROFILE_HISTORY = 40        # solves remembered per window size
+PROFILE_MIN_SAMPLES = 3     # below this a size just gets subsolve_time
+PROVED_FRAC = 0.8           # sizes that prove this often get a tighter limit
+PROVED_SLACK = 2.0          # ... of this multiple of their 90th percentile
+MIN_SUBSOLVE = 0.5
+CHECKPOINT_EVERY = 300.0    # seconds between on_checkpoint snapshots
+REPAIR_RATIO = 0.0          # share of windows rebuilt MIP-free (opt-in)
 
 
 @dataclass
@@ -22,6 +52,215 @@ class LNSResult:
     trajectory: list = field(default_factory=list)  # (elapsed, iter, maximin)
     interrupted: bool = False
     anchors: set | None = None  # blocks2: top-left corners of placed blocks
+    arm_stats: list = field(default_factory=list)   # (Arm, ArmStats)
+    memo_lookups: int = 0
+    memo_skips: int = 0
+    memo_resumes: int = 0
+    screen_rejects: int = 0     # windows whose contracted bound <= incumbent
+    time_profile: list = field(default_factory=list)  # TimeScheduler.summary
+    repair_stats: ArmStats | None = None    # MIP-free repair windows
+
+
+@dataclass(frozen=True)
+class Arm:
+    size: int
+    # 'path': cell of a binding shortest path | 'random' | 'diff': cell
+    # where the two relinked solutions differ
+    center: str
+    hint: bool      # corridor hints on the window model
+    # 'square': size x size around the center; 'band': ~size^2 cells along
+    # the binding path through the center; 'bands': that budget split over
+    # bands along every spawn's path; 'pair': two disjoint squares of
+    # ~size^2/2 cells each on the same binding path, solved as one window;
+    # 'relink': the cells of a size x size square where two elites differ
+    shape: str = "square"
+
+    def __str__(self):
+        return (f"size={self.size} shape={self.shape} center={self.center} "
+                f"hint={'on' if self.hint else 'off'}")
+
+
+@dataclass
+class ArmStats:
+    pulls: int = 0
+    wins: int = 0
+    gain: int = 0
+    seconds: float = 0.0
+    # discounted history the selector decides on
+    d_pulls: float = 0.0
+    d_gain: float = 0.0
+    d_seconds: float = 0.0
+
+    def rate(self):
+        """Discounted maximin gain per second."""
+        return self.d_gain / self.d_seconds if self.d_seconds > 0 else 0.0
+
+    def add(self, gain, seconds):
+        self.pulls += 1
+        self.wins += gain > 0
+        self.gain += gain
+        self.seconds += seconds
+        self.d_pulls += 1
+        self.d_gain += gain
+        self.d_seconds += seconds
+
+
+class ArmSelector:
+    """Discounted UCB1 over LNS arms, rewarded by improvement per second.
+
+    Every arm is pulled once first; afterwards the arm maximizing
+    rate / best_rate + UCB_EXPLORE * sqrt(ln N / n) wins (ties broken at
+    random). Discounting all history by ARM_DISCOUNT on each pull lets the
+    choice follow the search as the easy moves of an arm get used up.
+    """
+
+    def __init__(self, arms, discount=ARM_DISCOUNT, explore=UCB_EXPLORE):
+        self.stats = {a: ArmStats() for a in arms}
+        self.discount = discount
+        self.explore = explore
+
+    def pick(self, rng) -> Arm:
+        fresh = [a for a, st in self.stats.items() if st.pulls == 0]
+        if fresh:
+            return rng.choice(fresh)
+        best_rate = max(st.rate() for st in self.stats.values())
+        total = sum(st.d_pulls for st in self.stats.values())
+        scores = {}
+        for a, st in self.stats.items():
+            exploit = st.rate() / best_rate if best_rate > 0 else 0.0
+            bonus = self.explore * math.sqrt(
+                math.log(max(total, 1.0)) / max(st.d_pulls, 1e-9))
+            scores[a] = exploit + bonus
+        top = max(scores.values())
+        return rng.choice([a for a, v in scores.items() if v == top])
+
+    def update(self, arm, gain, seconds):
+        for st in self.stats.values():
+            st.d_pulls *= self.discount
+            st.d_gain *= self.discount
+            st.d_seconds *= self.discount
+        self.stats[arm].add(gain, seconds)
+
+    def summary(self):
+        return list(self.stats.items())
+
+    def state(self):
+        return [list(astuple(a)) + list(astuple(st))
+                for a, st in self.stats.items()]
+
+    def load_state(self, data):
+        n = len(fields(Arm))
+        for row in data:
+            arm = Arm(*row[:n])
+            if arm in self.stats:
+                self.stats[arm] = ArmStats(*row[n:])
+
+
+@dataclass
+class MemoEntry:
+    status: str
+    maximin: int | None     # best window value found
+    bound: float            # proven upper bound on the window's maximin
+    seconds: float          # how long the last solve ran
+
+    def proves_no_gain(self, incumbent):
+        # maximin is integral, so a bound below incumbent + 1 proves it
+        return self.bound < incumbent + 1 - 1e-6
+
+
+class WindowMemo:
+    """Outcome of every window solve, keyed by the contracted subproblem.
+
+    The key is (window cells, contracted-graph signature, hint, blocks2):
+    cells inside the window are free in the model, so the incumbent's
+    inside walls do not change the subproblem and need not be keyed.
+    """
+
+    def __init__(self):
+        self.entries: dict = {}
+
+    @staticmethod
+    def key(cw, hint, blocks2):
+        return (cw.window, cw.signature(), hint, blocks2)
+
+    def get(self, key) -> MemoEntry | None:
+        return self.entries.get(key)
+
+    def record(self, key, res):
+        bound = res.bound
+        if res.status == "OPTIMAL":
+            # integer objective: within MIPGap of ObjVal means exactly ObjVal
+            bound = res.maximin if res.maximin is not None else bound
+        self.entries[key] = MemoEntry(res.status, res.maximin, bound,
+                                      res.runtime)
+
+
+class TimeScheduler:
+    """Per-window-size time limits learned from observed solve profiles.
+
+    Sizes whose recent solves mostly finish with a proof get a limit of
+    PROVED_SLACK x their 90th-percentile proof time instead of the flat
+    `base`. Every solve may run past its soft limit while incumbents keep
+    arriving, up to `cap` (see solve_window's `extend_to`).
+    """
+
+    def __init__(self, base, cap):
+        self.base = base
+        self.cap = max(cap, base)
+        self.history: dict = {}     # size -> deque of (runtime, proved)
+
+    def limit(self, size):
+        hist = self.history.get(size, ())
+        if len(hist) < PROFILE_MIN_SAMPLES:
+            return self.base
+        proved = sorted(rt for rt, ok in hist if ok)
+        if len(proved) < PROVED_FRAC * len(hist):
+            return self.base
+        p90 = proved[min(len(proved) - 1, int(0.9 * len(proved)))]
+        return min(max(p90 * PROVED_SLACK, MIN_SUBSOLVE), self.base)
+
+    def record(self, size, res):
+        proved = res.status in ("OPTIMAL", "BOUND_STOP") or \
+            res.bound == float("-inf")
+        self.history.setdefault(size, deque(maxlen=PROFILE_HISTORY)) \
+            .append((res.runtime, proved))
+
+    def state(self):
+        return [[size, [list(h) for h in hist]]
+                for size, hist in sorted(self.history.items())]
+
+    def load_state(self, data):
+        for size, hist in data:
+            self.history[size] = deque(
+                (tuple(h) for h in hist), maxlen=PROFILE_HISTORY)
+
+    def summary(self):
+        """(size, solves, proved fraction, median runtime, current limit)."""
+        out = []
+        for size in sorted(self.history):
+            hist = self.history[size]
+            times = sorted(rt for rt, _ok in hist)
+            proved = sum(ok for _rt, ok in hist) / len(hist)
+            out.append((size, len(hist), proved, times[len(times) // 2],
+                        self.limit(size)))
+        return out
+
+
+def lns_arms(window_sizes, corridor_hint, relink=False):
+    hints = (True, False) if corridor_hint else (False,)
+    arms = [Arm(size, center, hint)
+            for size in window_sizes
+            for center in CENTER_STRATEGIES
+            for hint in hints]
+    arms += [Arm(size, "path", hint, shape)
+             for size in window_sizes
+             for shape in PATH_SHAPES
+             for hint in hints]
+    if relink:
+        arms += [Arm(size, "diff", hint, "relink")
+                 for size in window_sizes
+                 for hint in hints]
+    return arms
 
 
 def _window_cells(grid, center, size):
@@ -32,9 +271,100 @@ def _window_cells(grid, center, size):
             for c in range(max(c0, 0), min(c0 + size, grid.cols))}
 
 
-def _pick_center(grid, walls, per_spawn, rng):
-    """Random cell of a binding spawn's shortest path, sometimes fully random."""
-    if rng.random() >= RANDOM_CENTER_PROB:
+def _band_cells(grid, path, start, budget, radius=BAND_RADIUS):
+    """Cells within `radius` of a contiguous stretch of `path` around
+    `start`, grown one path cell at a time on alternating ends until the
+    band holds at least `budget` cells (or covers the whole path)."""
+    def around(v):
+        return {(r, c)
+                for r in range(max(v[0] - radius, 0),
+                               min(v[0] + radius + 1, grid.rows))
+                for c in range(max(v[1] - radius, 0),
+                               min(v[1] + radius + 1, grid.cols))}
+
+    band = around(path[start])
+    lo = hi = start
+    while len(band) < budget and (lo > 0 or hi < len(path) - 1):
+        if hi < len(path) - 1 and (lo == 0 or hi - start <= start - lo):
+            hi += 1
+            band |= around(path[hi])
+        else:
+            lo -= 1
+            band |= around(path[lo])
+    return band
+
+
+PAIR_TRIES = 10
+
+
+def _pair_squares(grid, path, rng, size):
+    """Two squares of side ~size/sqrt(2) centered on cells of `path`.
+
+    The second center is drawn until the squares are disjoint (the path
+    may fold back on itself); after PAIR_TRIES misses the overlapping
+    squares are used as is — still a valid, just larger, window.
+    """
+    side = max(2, round(size / math.sqrt(2)))
+    a = rng.choice(path)
+    for _ in range(PAIR_TRIES):
+        b = rng.choice(path)
+        if max(abs(a[0] - b[0]), abs(a[1] - b[1])) >= side:
+            break
+    return _window_cells(grid, a, side), _window_cells(grid, b, side)
+
+
+def _pair_cells(grid, path, rng, size):
+    first, second = _pair_squares(grid, path, rng, size)
+    return first | second
+
+
+def _path_neighborhood(grid, walls, per_spawn, rng, size, shape):
+    """Window of ~size^2 cells following shortest paths."""
+    budget = size * size
+    dist = grid.dist_field(walls)
+    if shape in ("band", "pair"):
+        maximin = min(per_spawn)
+        binding = [s for s, d in zip(grid.spawns, per_spawn) if d == maximin]
+        path = grid.shortest_path(walls, rng.choice(binding), dist=dist,
+                                  rng=rng)
+        if shape == "pair":
+            return _pair_cells(grid, path, rng, size)
+        return _band_cells(grid, path, rng.randrange(len(path)), budget)
+    cells = set()
+    share = budget // len(grid.spawns)
+    for s in grid.spawns:
+        path = grid.shortest_path(walls, s, dist=dist, rng=rng)
+        cells |= _band_cells(grid, path, rng.randrange(len(path)), share)
+    return cells
+
+
+def _relink_pair(incumbent, elites, rng):
+    """Two distinct solutions among the incumbent and the elites, each a
+    (maximin, walls, anchors) triple, as (base, guide) with the better one
+    as base; None while every elite equals the incumbent."""
+    pool = [incumbent] + [e for e in elites if e[1] != incumbent[1]]
+    if len(pool) < 2:
+        return None
+    a, b = rng.sample(pool, 2)
+    return (a, b) if a[0] >= b[0] else (b, a)
+
+
+def _relink_cells(grid, base, guide, rng, size, guide_anchors=None):
+    """Cells where `base` and `guide` differ within a size x size square
+    around one of them. With blocks2 the guide's blocks touching those
+    cells join whole, so the window can rebuild them."""
+    diff = base ^ guide
+    window = diff & _window_cells(grid, rng.choice(sorted(diff)), size)
+    if guide_anchors is not None:
+        for a in guide_anchors:
+            if not window.isdisjoint(square2(a)):
+                window |= set(square2(a))
+    return window
+
+
+def _pick_center(grid, walls, per_spawn, rng, strategy="path"):
+    """Random cell of a binding spawn's shortest path, or of the whole map."""
+    if strategy == "path":
         maximin = min(per_spawn)
         binding = [s for s, d in zip(grid.spawns, per_spawn) if d == maximin]
         spawn = rng.choice(binding)
@@ -44,7 +374,37 @@ def _pick_center(grid, walls, per_spawn, rng):
 
 
 def run_lns(grid, seed_walls, *, total_time, subsolve_time=15.0, rng,
-            corridor_hint=True, window_sizes=WINDOW_SIZES, blocks2=False):
+            corridor_hint=True, window_sizes=WINDOW_SIZES, blocks2=False,
+            subsolve_cap=None, resume=None, on_checkpoint=None,
+            checkpoint_every=CHECKPOINT_EVERY, repair_ratio=REPAIR_RATIO,
+            exchange=None, telemetry=None, elites=()):
+    """Improve `seed_walls` by exact window rewrites for `total_time` s.
+
+    `resume` is a snapshot previously passed to `on_checkpoint` (called
+    every `checkpoint_every` seconds and once on exit); the run then
+    continues its clock, trajectory and operator statistics. The snapshot
+    is JSON-ready; the caller owns the RNG state and the incumbent walls,
+    which must be passed back as `seed_walls`.
+
+    `exchange` (e.g. `bound.ConcurrentBound`) shares incumbents with a
+    concurrent solve: every improvement is `offer`ed to it, better
+    incumbents from `poll()` are adopted between windows, and the run ends
+    early once `done()` is true.
+
+    `telemetry` (interdiction.telemetry.Telemetry) gets one `window`
+    record per iteration, with the exchange's `pool_size` (the concurrent
+    bound's cut pool; None without an exchange).
+
+    `elites` are wall sets from earlier runs (disconnected ones, and with
+    blocks2 untileable ones, are dropped). They add 'relink' arms: each
+    picks two distinct solutions among the elites and the incumbent,
+    keeps the better one's walls and frees only the cells of one window
+    where the two differ. A candidate is accepted if it beats the
+    incumbent, whichever solution it was built on.
+    """
+    # gurobipy loads on first use, not with the module
+    from interdiction.window_master import solve_window
+
     best = set(seed_walls)
     anchors: set = set()
     if blocks2:
@@ -57,46 +417,191 @@ def run_lns(grid, seed_walls, *, total_time, subsolve_time=15.0, rng,
     result = LNSResult(best, best_val, best_per,
                        trajectory=[(0.0, 0, best_val)],
                        anchors=anchors if blocks2 else None)
-    stall = 0
+    pool = []
+    for walls in elites:
+        walls = set(walls)
+        val, _ = grid.evaluate(walls)
+        if val is None:
+            continue
+        try:
+            pool.append((val, walls,
+                         tile2_decompose(walls) if blocks2 else set()))
+        except ValueError:
+            continue
+    arms = lns_arms(window_sizes, corridor_hint, relink=bool(pool))
+    selector = ArmSelector(arms)
+    repair = ArmStats()
+    result.repair_stats = repair
+    memo = WindowMemo()
+    if subsolve_cap is None:
+        subsolve_cap = subsolve_time * SUBSOLVE_CAP_FACTOR
+    sched = TimeScheduler(subsolve_time, subsolve_cap)
     it = 0
+    if resume is not None:
+        if blocks2 and resume.get("anchors") is not None:
+            assert cells(resume["anchors"]) == anchors, \
+                "checkpoint anchors disagree with the resumed walls"
+        t0 -= resume["elapsed"]
+        it = resume["iterations"]
+        result.trajectory = [tuple(t) for t in resume["trajectory"]]
+        (result.memo_lookups, result.memo_skips, result.memo_resumes,
+         result.screen_rejects) = resume["counters"]
+        selector.load_state(resume["arms"])
+        sched.load_state(resume["time_profile"])
+        repair = result.repair_stats = ArmStats(*resume["repair"])
+
+    def snapshot():
+        return {"walls": encode_cells(result.walls),
+                "anchors": encode_cells(anchors) if blocks2 else None,
+                "elapsed": time.monotonic() - t0,
+                "iterations": it,
+                "trajectory": [list(t) for t in result.trajectory],
+                "counters": [result.memo_lookups, result.memo_skips,
+                             result.memo_resumes, result.screen_rejects],
+                "arms": selector.state(),
+                "repair": list(astuple(repair)),
+                "time_profile": sched.state()}
+
+    last_checkpoint = time.monotonic()
     while True:
         remaining = total_time - (time.monotonic() - t0)
         if remaining < 1.0:
             break
+        if exchange is not None:
+            ext = exchange.poll()
+            if ext is not None and ext[2] > result.maximin:
+                ext_walls, ext_anchors, _ = ext
+                if blocks2:
+                    anchors = ext_anchors or tile2_decompose(ext_walls)
+                    result.anchors = anchors
+                result.walls = set(ext_walls)
+                result.maximin, result.per_spawn = grid.evaluate(ext_walls)
+                result.trajectory.append(
+                    (time.monotonic() - t0, it, result.maximin))
+            if exchange.done():
+                break
+        if on_checkpoint is not None and \
+                time.monotonic() - last_checkpoint >= checkpoint_every:
+            on_checkpoint(snapshot())
+            last_checkpoint = time.monotonic()
         it += 1
-        if stall >= STALL_LIMIT:
-            size = window_sizes[-1]
-        else:
-            size = window_sizes[(it - 1) % len(window_sizes)]
-        center = _pick_center(grid, result.walls, result.per_spawn, rng)
-        window = _window_cells(grid, center, size)
+        profiling.count("lns.iterations")
+        t_pull = time.monotonic()
+        # MIP-free windows take a random arm's shape; the bandit only
+        # learns from (and is credited for) the exact MIP windows
+        cheap = rng.random() < repair_ratio
+        arm = rng.choice(arms) if cheap else selector.pick(rng)
+        before = result.maximin
+        rec = {}
+
+        def credit(gain, outcome):
+            seconds = time.monotonic() - t_pull
+            if cheap:
+                repair.add(gain, seconds)
+            else:
+                selector.update(arm, gain, seconds)
+            if telemetry is not None:
+                telemetry.emit("window", iter=it, size=arm.size,
+                               shape=arm.shape, center_strategy=arm.center,
+                               hint=arm.hint,
+                               mode="repair" if cheap else "mip",
+                               outcome=outcome, accepted=gain > 0,
+                               gain=gain, best=result.maximin,
+                               pool=(exchange.pool_size
+                                     if exchange is not None else None),
+                               seconds=seconds, **rec)
+
+        center = None
+        # the solution the window is cut from: the incumbent, or for
+        # relink windows the better of the two relinked solutions
+        base, base_anchors = result.walls, anchors
+        with profiling.timer("lns.neighborhood"):
+            if arm.shape == "relink":
+                pair = _relink_pair((result.maximin, result.walls, anchors),
+                                    pool, rng)
+                if pair is None:
+                    credit(0, "no_pair")
+                    continue
+                (_v, base, base_anchors), (_v, guide, guide_anchors) = pair
+                window = _relink_cells(
+                    grid, base, guide, rng, arm.size,
+                    guide_anchors if blocks2 else None)
+            elif arm.shape == "square":
+                center = _pick_center(grid, result.walls, result.per_spawn,
+                                      rng, strategy=arm.center)
+                window = _window_cells(grid, center, arm.size)
+            else:
+                window = _path_neighborhood(grid, result.walls,
+                                            result.per_spawn, rng, arm.size,
+                                            arm.shape)
         removed = set()
         if blocks2:
             # blocks straddling the window edge are freed whole, so the
             # window may grow by one cell per side
-            removed = {a for a in anchors if set(square2(a)) & window}
+            removed = {a for a in base_anchors if set(square2(a)) & window}
             for a in removed:
                 window |= set(square2(a))
         free = window & grid.buildable
-        outside_walls = result.walls - free
+        outside_walls = base - free
 
+        t_contract = time.monotonic()
         cw = contract(grid, window, outside_walls)
-        res = solve_window(cw, time_limit=min(subsolve_time, remaining),
-                           warm_start=result.walls & free,
-                           corridor_hint=corridor_hint,
-                           blocks2=blocks2,
-                           warm_anchors=removed if blocks2 else None)
-        if res.status == "INTERRUPTED":
-            result.interrupted = True
+        rec.update(center=center, cells=len(window), free=len(free),
+                   contract=time.monotonic() - t_contract)
+        entry = None
+        if not cheap:
+            key = memo.key(cw, arm.hint, blocks2)
+            entry = memo.get(key)
+            result.memo_lookups += 1
+            if entry is not None and entry.proves_no_gain(result.maximin):
+                result.memo_skips += 1
+                credit(0, "memo_skip")
+                continue
+        with profiling.timer("lns.screen"):
+            ub = cw.maximin_upper_bound()
+        if ub < result.maximin + 1:
+            result.screen_rejects += 1
+            credit(0, "screen_reject")
+            continue
+        if cheap:
+            with profiling.timer("lns.repair"):
+                res = repair_window(cw, rng=rng,
+                                    warm_start=base & free,
+                                    blocks2=blocks2,
+                                    warm_anchors=removed if blocks2 else None,
+                                    time_limit=remaining)
+            rec.update(repair=res.runtime)
+        else:
+            limit = sched.limit(arm.size)
+            if entry is not None:
+                # same subproblem timed out before: resume it with more time
+                result.memo_resumes += 1
+                limit = max(limit, entry.seconds * MEMO_RESUME_FACTOR)
+            limit = min(limit, sched.cap, remaining)
+            res = solve_window(cw, time_limit=limit,
+                               extend_to=min(sched.cap, remaining),
+                               bound_stop=result.maximin, maximin_ub=ub,
+                               warm_start=base & free,
+                               corridor_hint=arm.hint,
+                               blocks2=blocks2,
+                               warm_anchors=removed if blocks2 else None)
+            if res.status == "INTERRUPTED":
+                result.interrupted = True
+            else:
+                memo.record(key, res)
+                sched.record(arm.size, res)
+            rec.update(limit=limit, build=res.build_time, gurobi=res.runtime,
+                       callbacks=res.callbacks, cuts=res.cuts)
         if res.walls is not None:
             candidate = outside_walls | res.walls
-            val, per = grid.evaluate(candidate)
+            with profiling.timer("lns.verify"):
+                val, per = grid.evaluate(candidate)
             # contraction exactness: BFS must agree with the contracted claim
             assert val == res.maximin and per == res.per_spawn, \
                 "contracted claim disagrees with BFS — contraction bug"
             if val > result.maximin:
                 if blocks2:
-                    anchors = (anchors - removed) | res.anchors
+                    anchors = (base_anchors - removed) | res.anchors
                     tiles = {v for a in anchors for v in square2(a)}
                     assert tiles == candidate and \
                         len(tiles) == 4 * len(anchors), \
@@ -106,11 +611,14 @@ def run_lns(grid, seed_walls, *, total_time, subsolve_time=15.0, rng,
                 result.maximin, result.per_spawn = val, per
                 result.trajectory.append(
                     (time.monotonic() - t0, it, result.maximin))
-                stall = 0
-            else:
-                stall += 1
-        else:
-            stall += 1
+                if exchange is not None:
+                    exchange.offer(result.walls, result.anchors,
+                                   result.maximin)
+        credit(result.maximin - before, res.status)
         if result.interrupted:
             break
+    result.arm_stats = selector.summary()
+    result.time_profile = sched.summary()
+    if on_checkpoint is not None:
+        on_checkpoint(snapshot())
     return result
@@ -13,12 +13,14 @@ constraints on every later solve (the LNS subsolves get stronger over time).
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
 
 import gurobipy as gp
 from gurobipy import GRB
 
+from interdiction import profiling
 from interdiction.grid import square2
+from interdiction.result import SolveResult
 
 ALT_PATHS_PER_SPAWN = 3
 ALT_POOL_THRESHOLD = 2000   # stop sampling alternates once the pool is this big
@@ -26,19 +28,10 @@ POOL_CAP = 5000             # hard cap on stored paths (~1400 cells each on endl
 MAX_CUT_ROWS = 4000         # re-add at most this many pool cuts per solve
 
 
-@dataclass
-class SolveResult:
-    status: str                 # 'OPTIMAL' | 'TIME_LIMIT' | 'INTERRUPTED' | 'NO_SOLUTION'
-    walls: set | None
-    maximin: int | None
-    per_spawn: tuple | None
-    bound: float
-    anchors: set | None = None  # blocks2 mode: top-left corners of placed 2x2 blocks
-
-
 _STATUS = {
     GRB.OPTIMAL: "OPTIMAL",
     GRB.TIME_LIMIT: "TIME_LIMIT",
+    GRB.USER_OBJ_LIMIT: "BOUND_STOP",   # BestBdStop: bound fell to the cutoff
     GRB.INTERRUPTED: "INTERRUPTED",
     GRB.MEM_LIMIT: "MEM_LIMIT",
 }
@@ -73,8 +66,43 @@ class MasterSolver:
                     out.append((k, p))
         return out
 
+    def _set_solution(self, model, y, b, zvars, z, walls, anchors):
+        """Hand an outside incumbent to Gurobi from a MIPNODE callback.
+
+        Flow values are left for Gurobi to complete; the walls must keep
+        every spawn connected (true for any evaluated incumbent).
+        """
+        val, per = self.grid.evaluate(walls)
+        if val is None:
+            return
+        model.cbSetSolution([y[v] for v in y],
+                            [1.0 if v in walls else 0.0 for v in y])
+        if self.blocks2 and anchors is not None:
+            model.cbSetSolution([b[a] for a in b],
+                                [1.0 if a in anchors else 0.0 for a in b])
+        model.cbSetSolution(zvars, [float(d) for d in per])
+        model.cbSetSolution(z, float(val))
+        model.cbUseSolution()
+
     def solve(self, *, free=None, fixed_walls=frozenset(), time_limit=None,
-              warm_start=None, warm_anchors=None) -> SolveResult:
+              warm_start=None, warm_anchors=None,
+              progress=None, inject=None, on_incumbent=None,
+              maximin_ub=None) -> SolveResult:
+        """One Gurobi solve over `free` cells with the rest pinned.
+
+        `maximin_ub` (e.g. a combinatorial bound from `interdiction.bound`)
+        caps the objective variable.
+
+        Optional hooks, all called from the Gurobi callback:
+        - `progress(runtime, incumbent, bound)` throughout the search
+          (callers throttle it); a truthy return ends the solve
+          (status INTERRUPTED).
+        - `inject()` at B&B nodes: None, or (walls, anchors) of an outside
+          incumbent to hand to Gurobi as a heuristic solution.
+        - `on_incumbent(walls, anchors, maximin)` for every solution that
+          passes the lazy-cut check.
+        """
+        t_build = time.monotonic()
         g = self.grid
         if free is None:
             free = g.buildable
@@ -160,7 +188,9 @@ class MasterSolver:
                           name=f"z_{k}")
             m.addConstr(zk == 2 * q + par)
             zvars.append(zk)
-        z = m.addVar(vtype=GRB.INTEGER, lb=0, ub=self.U, name="z")
+        z_ub = self.U if maximin_ub is None else \
+            max(0, min(self.U, int(maximin_ub)))
+        z = m.addVar(vtype=GRB.INTEGER, lb=0, ub=z_ub, name="z")
         for zk in zvars:
             m.addConstr(z <= zk)
         m.setObjective(z, GRB.MAXIMIZE)
@@ -202,10 +232,27 @@ class MasterSolver:
 
         # --- lazy cut callback ---
         order = sorted(y)
+        counts = [0, 0]     # MIPSOL callbacks, lazy cuts
 
         def cb(model, where):
+            if where == GRB.Callback.MIP and progress is not None:
+                if progress(model.cbGet(GRB.Callback.RUNTIME),
+                            model.cbGet(GRB.Callback.MIP_OBJBST),
+                            model.cbGet(GRB.Callback.MIP_OBJBND)):
+                    model.terminate()
+                return
+            if where == GRB.Callback.MIPNODE and inject is not None:
+                sol = inject()
+                if sol is not None:
+                    self._set_solution(model, y, b, zvars, z, *sol)
+                return
             if where != GRB.Callback.MIPSOL:
                 return
+            with profiling.timer("master.callback"):
+                mipsol(model)
+
+        def mipsol(model):
+            counts[0] += 1
             yv = model.cbGetSolution([y[v] for v in order])
             walls = {v for v, val in zip(order, yv) if val > 0.5}
             dist = g.dist_field(walls)
@@ -218,16 +265,29 @@ class MasterSolver:
                 if claims[k] > true_d + 0.5:
                     violated.add(k)
             if not violated:
+                if on_incumbent is not None:
+                    anchors = None
+                    if self.blocks2:
+                        bv = model.cbGetSolution([b[a] for a in b])
+                        anchors = {a for a, val in zip(b, bv) if val > 0.5}
+                    on_incumbent(walls, anchors,
+                                 min(dist[s] for s in g.spawns))
                 return
             alts = (ALT_PATHS_PER_SPAWN
                     if len(self.cut_pool) < ALT_POOL_THRESHOLD else 0)
             for k, p in self._paths_for(walls, alts=alts):
                 if k in violated:
                     model.cbLazy(cut_expr(k, p))
+                    counts[1] += 1
                     if len(self.cut_pool) < POOL_CAP:
                         self.cut_pool.add((k, p))
 
-        m.optimize(cb)
+        build_time = time.monotonic() - t_build
+        profiling.add("master.build", build_time)
+        with profiling.timer("master.optimize"):
+            m.optimize(cb)
+        stats = dict(build_time=build_time, callbacks=counts[0],
+                     cuts=counts[1])
 
         # the callback closure keeps the model alive through reference
         # cycles — dispose explicitly or repeated solves leak the C-side
@@ -241,9 +301,11 @@ class MasterSolver:
 
         status = _STATUS.get(m.Status, str(m.Status))
         bound = m.ObjBound
+        runtime = m.Runtime
         if m.SolCount == 0:
             m.dispose()
-            return SolveResult("NO_SOLUTION", None, None, None, bound)
+            return SolveResult("NO_SOLUTION", None, None, None, bound,
+                               runtime=runtime, **stats)
 
         walls = {v for v, var in y.items() if var.X > 0.5}
         anchors = ({a for a, var in b.items() if var.X > 0.5}
@@ -254,4 +316,5 @@ class MasterSolver:
         # callback guarantees incumbents never overclaim
         assert maximin is not None and round(obj_val) <= maximin, \
             "incumbent overclaims shortest path — cut bug"
-        return SolveResult(status, walls, maximin, per, bound, anchors)
+        return SolveResult(status, walls, maximin, per, bound, anchors,
+                           runtime, **stats)
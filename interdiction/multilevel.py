@@ -0,0 +1,107 @@
+"""Coarse-to-fine multilevel warm start for large maps.
+
+    myenv/bin/python -m interdiction maps/endless.txt --multilevel 2 \
+        --time 600
+
+`coarsen` merges k x k fine cells into one supercell. A coarse wall
+stands for walling every buildable fine cell of its supercell, so coarse
+corridors are k cells wide and coarse distances are about 1/k of the fine
+ones, while an LNS window of the same size covers k^2 times the area.
+`multilevel_seed` solves the coarsest map with LNS from the best
+constructive seed (interdiction.seedgen), then projects each level's
+result one level down and refines it there with LNS. It returns the
+finest projection, which the CLI's fine LNS refines like any seed.
+Projection reuses seedgen's `realize`, which tiles the fine walls into
+2x2 blocks under blocks2, and `connect`.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+
+from interdiction.grid import GridMap
+from interdiction.lns import run_lns
+from interdiction.seedgen import STYLES, connect, generate, realize
+
+
+def coarsen(grid, k) -> GridMap:
+    """The map of k x k supercells.
+
+    A supercell is an obstacle if none of its cells is walkable, the
+    target (spawn) if it holds the target (a spawn), buildable if all its
+    walkable cells are, and unbuildable otherwise. Spawns sharing the
+    target's supercell are dropped. Preset walls are not carried over.
+    """
+    rows, cols = math.ceil(grid.rows / k), math.ceil(grid.cols / k)
+    target = (grid.target[0] // k, grid.target[1] // k)
+    spawns = tuple(dict.fromkeys(
+        (r // k, c // k) for r, c in grid.spawns
+        if (r // k, c // k) != target))
+    obstacles, unbuildables = set(), set()
+    for cr in range(rows):
+        for cc in range(cols):
+            walk = [(r, c) for r in range(cr * k, min(cr * k + k, grid.rows))
+                    for c in range(cc * k, min(cc * k + k, grid.cols))
+                    if (r, c) in grid.walkable]
+            if not walk:
+                obstacles.add((cr, cc))
+            elif (cr, cc) != target and (cr, cc) not in spawns and \
+                    not all(v in grid.buildable for v in walk):
+                unbuildables.add((cr, cc))
+    return GridMap(rows, cols, spawns, target, frozenset(obstacles),
+                   frozenset(unbuildables), frozenset())
+
+
+def project(fine, coarse_walls, k, *, blocks2=False, base=()) -> set:
+    """Fine walls for coarse walls: every buildable cell of each walled
+    supercell (2x2-tiled under blocks2), cleared where they cut a spawn
+    off. `base` walls are kept as in `seedgen.connect`."""
+    mask = {(r, c) for cr, cc in coarse_walls
+            for r in range(cr * k, cr * k + k)
+            for c in range(cc * k, cc * k + k)}
+    if fine.evaluate(base)[0] is None:
+        base = ()
+    return connect(fine, realize(fine, mask, blocks2=blocks2, base=base),
+                   base)
+
+
+def multilevel_seed(grid, *, factor=2, levels=1, total_time, rng,
+                    blocks2=False, base=(), **lns_kwargs):
+    """Warm-start walls for `grid` from `levels` rounds of coarsening.
+
+    `total_time` is split evenly over the coarse levels. `lns_kwargs` go
+    to every coarse `run_lns`; coarse levels never use blocks2, which only
+    shapes the final projection. Returns (walls, history) with one
+    (rows, cols, seed maximin, LNS maximin, seconds) row per coarse level,
+    coarsest first.
+    """
+    chain = [grid]
+    for _ in range(levels):
+        coarse = coarsen(chain[-1], factor)
+        if not coarse.spawns or coarse.evaluate(set())[0] is None:
+            break
+        chain.append(coarse)
+    if len(chain) == 1:
+        return set(base), []
+    share = total_time / (len(chain) - 1)
+
+    coarsest = chain[-1]
+    walls, best_val = set(), coarsest.evaluate(set())[0]
+    for style in STYLES:
+        w, val, _n = generate(coarsest, style)
+        if val is not None and val > best_val:
+            walls, best_val = w, val
+    history = []
+    for level in range(len(chain) - 1, 0, -1):
+        g = chain[level]
+        t0 = time.monotonic()
+        start = g.evaluate(walls)[0]
+        res = run_lns(g, walls, total_time=share, rng=rng, **lns_kwargs)
+        history.append((g.rows, g.cols, start, res.maximin,
+                        time.monotonic() - t0))
+        finest = level == 1
+        walls = project(chain[level - 1], res.walls, factor,
+                        blocks2=blocks2 and finest,
+                        base=base if finest else ())
+    return walls, history
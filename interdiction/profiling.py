@@ -0,0 +1,133 @@
+"""Process-wide hot-path timers and counters.
+
+Disabled by default: `timer()` then returns a shared no-op context manager
+and `count()` returns at once, so instrumented code pays one function call
+and a global check. `enable()` turns collection on (the CLI's `--profile`)
+and `format_report()` renders the totals. Timers nest and are inclusive —
+`master.optimize` contains `master.callback`.
+
+`phase(name)` additionally wraps a whole CLI phase in cProfile and/or
+tracemalloc when a dump directory was given, writing `<name>.prof`
+(readable with pstats/snakeviz) and `<name>.tracemalloc` snapshots.
+Only the current process is measured; the concurrent bound worker is not.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+from collections import defaultdict
+
+ENABLED = False
+_dump_dir = None
+_memory = False
+_totals: dict[str, float] = defaultdict(float)
+_calls: dict[str, int] = defaultdict(int)
+_counts: dict[str, int] = defaultdict(int)
+_NULL = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _totals[self.name] += time.perf_counter() - self.t0
+        _calls[self.name] += 1
+        return False
+
+
+def timer(name):
+    """Context manager adding its wall time to `name` when enabled."""
+    if not ENABLED:
+        return _NULL
+    return _Timer(name)
+
+
+def add(name, seconds) -> None:
+    """Record a duration measured elsewhere as one call of `name`."""
+    if ENABLED:
+        _totals[name] += seconds
+        _calls[name] += 1
+
+
+def count(name, n=1) -> None:
+    if ENABLED:
+        _counts[name] += n
+
+
+def enable(dump_dir=None, memory=False) -> None:
+    """Start collecting; `dump_dir` also turns on per-phase dumps."""
+    global ENABLED, _dump_dir, _memory
+    ENABLED = True
+    _dump_dir = dump_dir
+    _memory = memory and dump_dir is not None
+    if dump_dir is not None:
+        os.makedirs(dump_dir, exist_ok=True)
+
+
+def disable() -> None:
+    global ENABLED, _dump_dir, _memory
+    ENABLED, _dump_dir, _memory = False, None, False
+
+
+def reset() -> None:
+    _totals.clear()
+    _calls.clear()
+    _counts.clear()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a phase; cProfile/tracemalloc dumps when a dump dir is set."""
+    if not ENABLED:
+        yield
+        return
+    prof = None
+    if _dump_dir is not None:
+        import cProfile
+        prof = cProfile.Profile()
+    if _memory:
+        import tracemalloc
+        tracemalloc.start()
+    try:
+        with timer(f"phase.{name}"):
+            if prof is not None:
+                prof.enable()
+            try:
+                yield
+            finally:
+                if prof is not None:
+                    prof.disable()
+    finally:
+        if prof is not None:
+            prof.dump_stats(os.path.join(_dump_dir, f"{name}.prof"))
+        if _memory:
+            snap = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snap.dump(os.path.join(_dump_dir, f"{name}.tracemalloc"))
+
+
+def report() -> list:
+    """[(name, calls, seconds), ...] by total time, then counter rows."""
+    rows = sorted(((n, _calls[n], t) for n, t in _totals.items()),
+                  key=lambda r: -r[2])
+    return rows + sorted((n, c, None) for n, c in _counts.items())
+
+
+def format_report() -> str:
+    lines = [f"{'timer':<24} {'calls':>9} {'total':>10} {'mean':>10}"]
+    for name, calls, secs in report():
+        if secs is None:
+            lines.append(f"{name:<24} {calls:>9}")
+        else:
+            lines.append(f"{name:<24} {calls:>9} {secs:>9.3f}s "
+                         f"{1000 * secs / max(calls, 1):>8.3f}ms")
+    return "\n".join(lines)
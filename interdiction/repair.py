@@ -0,0 +1,108 @@
+"""MIP-free window repair: destroy part of a window, rebuild it by annealing.
+
+A cheap alternative to `solve_window` for LNS. The incumbent's window walls
+are partly cleared, then a short simulated annealing run re-adds walls on
+cells of the current shortest paths (the only cells whose walling can
+lengthen a path) and occasionally removes walls, scoring each state with
+the contracted Dijkstra. No proof comes out of it — the returned bound is
++inf — but a window costs milliseconds instead of a model build and a
+Gurobi solve.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+
+from interdiction.grid import square2
+from interdiction.result import SolveResult
+
+DESTROY_FRAC = 0.3      # share of the window's walls/blocks cleared first
+REPAIR_ITERS = 300
+ADD_PROB = 0.7          # add vs remove move mix
+T0 = 2.0
+T_END = 0.05
+TIE_WEIGHT = 0.01       # sum of spawn distances breaks maximin plateaus
+
+
+def _score(res):
+    per = [d for d, _cells in res]
+    return min(per) + TIE_WEIGHT * sum(per)
+
+
+def repair_window(cw, *, rng, warm_start=(), blocks2=False,
+                  warm_anchors=None, iters=REPAIR_ITERS,
+                  time_limit=None) -> SolveResult:
+    """Anneal the window's walls from a partly destroyed warm start.
+
+    In blocks2 mode moves place/remove whole 2x2 blocks fully inside the
+    free set, starting from `warm_anchors`, so the returned anchors keep
+    the global tiling intact.
+    """
+    t_start = time.monotonic()
+    free = cw.free
+    if blocks2:
+        units = {a for a in (warm_anchors or ())
+                 if set(square2(a)) <= free}
+    else:
+        units = set(warm_start) & free
+    units = {u for u in units if rng.random() >= DESTROY_FRAC}
+
+    def cells_of(us):
+        if blocks2:
+            return {v for a in us for v in square2(a)}
+        return set(us)
+
+    def placeable(v):
+        """Units that would wall path cell v, if any."""
+        if not blocks2:
+            return [v] if v in free and v not in units else []
+        taken = cells_of(units)
+        out = []
+        for a in ((v[0] - dr, v[1] - dc) for dr in (0, 1) for dc in (0, 1)):
+            sq = square2(a)
+            if all(u in free and u not in taken for u in sq):
+                out.append(a)
+        return out
+
+    res = cw.dijkstra(cells_of(units))
+    if any(d is None for d, _cells in res):
+        # destroying only removes walls, so this is the warm start itself
+        raise AssertionError("repair warm start disconnects a spawn")
+    score = _score(res)
+    best_units, best_res, best_score = set(units), res, score
+
+    temp = T0
+    cool = (T_END / T0) ** (1.0 / max(iters, 1))
+    for _ in range(iters):
+        if time_limit is not None and \
+                time.monotonic() - t_start >= time_limit:
+            break
+        temp *= cool
+        if units and rng.random() >= ADD_PROB:
+            u = rng.choice(sorted(units))
+            trial = units - {u}
+        else:
+            binding = min(range(len(res)), key=lambda k: res[k][0])
+            path_cells = res[binding][1]
+            if not path_cells:
+                continue
+            options = placeable(rng.choice(path_cells))
+            if not options:
+                continue
+            trial = units | {rng.choice(options)}
+        trial_res = cw.dijkstra(cells_of(trial))
+        if any(d is None for d, _cells in trial_res):
+            continue
+        trial_score = _score(trial_res)
+        delta = trial_score - score
+        if delta >= 0 or rng.random() < math.exp(delta / temp):
+            units, res, score = trial, trial_res, trial_score
+            if score > best_score:
+                best_units, best_res, best_score = set(units), res, score
+
+    per = tuple(d for d, _cells in best_res)
+    return SolveResult("HEURISTIC", cells_of(best_units), min(per), per,
+                       float("inf"),
+                       set(best_units) if blocks2 else None,
+                       time.monotonic() - t_start)
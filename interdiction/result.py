@@ -0,0 +1,19 @@
+"""Solver result type, importable without gurobipy."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class SolveResult:
+    status: str                 # 'OPTIMAL' | 'TIME_LIMIT' | 'BOUND_STOP' | 'INTERRUPTED' | 'NO_SOLUTION'
+    walls: set | None
+    maximin: int | None
+    per_spawn: tuple | None
+    bound: float
+    anchors: set | None = None  # blocks2 mode: top-left corners of placed 2x2 blocks
+    runtime: float = 0.0        # Gurobi seconds spent in optimize()
+    build_time: float = 0.0     # Python model construction before optimize()
+    callbacks: int = 0          # MIPSOL callback invocations
+    cuts: int = 0               # lazy cuts added
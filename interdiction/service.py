@@ -0,0 +1,249 @@
+"""Long-running local evaluation service for interactive tools.
+
+    myenv/bin/python -m interdiction.service                # JSON lines
+    myenv/bin/python -m interdiction.service --http 8765    # localhost HTTP
+
+Maps stay parsed and each keeps an incrementally maintained distance
+field (interdiction.incremental), so an edit costs a local repair instead
+of a process start, a parse and a full BFS. One JSON request per line on
+stdin (or per POST body) and one JSON response per request:
+
+    {"op": "load", "map": "maps/endless.txt", "name": "e"}
+    {"op": "load", "text": "S..\\n...\\n..T", "name": "tiny"}
+    {"op": "set", "name": "e", "walls": [[3, 4], [3, 5]]}
+    {"op": "delta", "name": "e", "add": [[7, 7]], "remove": [[3, 4]]}
+    {"op": "eval", "name": "e", "paths": true}
+    {"op": "stats"}
+    {"op": "unload", "name": "e"}
+
+`set`, `delta` and `eval` answer with maximin (null if a spawn is cut
+off), per-spawn distances and wall count, plus one shortest path per spawn
+when `"paths": true`. An `id` in a request is echoed back. `stats` reports
+request-latency percentiles per op, and they are also printed to stderr on
+exit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from interdiction.grid import load_map, parse_map_text
+from interdiction.incremental import DistField
+
+LATENCY_HISTORY = 10000     # latencies kept per op for the percentiles
+PERCENTILES = (50, 90, 99)
+
+
+def _cells(data):
+    try:
+        return [(int(r), int(c)) for r, c in data]
+    except (TypeError, ValueError):
+        raise ValueError("cells must be [[row, col], ...]") from None
+
+
+def _str(req, key):
+    v = req.get(key)
+    if not isinstance(v, str):
+        raise ValueError(f"{key!r} must be a string")
+    return v
+
+
+def _percentile(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q / 100 * len(xs)))]
+
+
+class EvalService:
+    """Resident maps and distance fields; one `handle()` per request."""
+
+    def __init__(self):
+        self.maps: dict[str, DistField] = {}
+        self.latency = defaultdict(lambda: deque(maxlen=LATENCY_HISTORY))
+
+    def handle(self, req) -> dict:
+        t0 = time.perf_counter()
+        op = req.get("op") if isinstance(req, dict) else None
+        try:
+            handler = getattr(self, f"_op_{op}", None)
+            if handler is None:
+                raise ValueError(f"unknown op {op!r}")
+            resp = {"ok": True, **handler(req)}
+        except (ValueError, OSError) as e:
+            resp = {"ok": False, "error": str(e)}
+        ms = 1000 * (time.perf_counter() - t0)
+        if resp["ok"]:
+            self.latency[op].append(ms)
+        resp["ms"] = round(ms, 3)
+        if isinstance(req, dict) and "id" in req:
+            resp["id"] = req["id"]
+        return resp
+
+    def _field(self, req) -> DistField:
+        name = _str(req, "name")
+        if name not in self.maps:
+            raise ValueError(f"no map loaded as {name!r}")
+        return self.maps[name]
+
+    def _answer(self, df, req):
+        val, per = df.evaluate()
+        out = {"maximin": val, "per_spawn": list(per),
+               "walls": len(df.walls)}
+        if req.get("paths"):
+            out["paths"] = [None if d is None
+                            else [list(v) for v in df.shortest_path(s)]
+                            for s, d in zip(df.grid.spawns, per)]
+        return out
+
+    def _op_load(self, req):
+        if "text" in req:
+            name = _str(req, "name")     # nothing else to call it by
+            grid = parse_map_text(_str(req, "text"))
+        elif "map" in req:
+            name = _str(req, "name" if "name" in req else "map")
+            grid = load_map(_str(req, "map"))
+        else:
+            raise ValueError("load needs 'map' (path) or 'text'")
+        df = DistField(grid, grid.preset_walls)
+        self.maps[name] = df
+        return {"name": name, "rows": grid.rows, "cols": grid.cols,
+                "spawns": [list(s) for s in grid.spawns],
+                **self._answer(df, req)}
+
+    def _op_unload(self, req):
+        self._field(req)
+        del self.maps[req["name"]]
+        return {}
+
+    def _op_set(self, req):
+        df = self._field(req)
+        walls = set(_cells(req.get("walls", ())))
+        bad = walls - df.grid.buildable
+        if bad:
+            raise ValueError(f"not buildable: {sorted(bad)[:5]}")
+        df.apply(add=walls - df.walls, remove=df.walls - walls)
+        return self._answer(df, req)
+
+    def _op_delta(self, req):
+        df = self._field(req)
+        add = _cells(req.get("add", ()))
+        bad = set(add) - df.grid.buildable
+        if bad:
+            raise ValueError(f"not buildable: {sorted(bad)[:5]}")
+        df.apply(add=add, remove=_cells(req.get("remove", ())))
+        return self._answer(df, req)
+
+    def _op_eval(self, req):
+        return self._answer(self._field(req), req)
+
+    def _op_stats(self, req):
+        return {"latency_ms": self.stats(), "maps": sorted(self.maps)}
+
+    def stats(self) -> dict:
+        out = {}
+        for op, xs in sorted(self.latency.items()):
+            if xs:
+                out[op] = {"n": len(xs), "max": round(max(xs), 3),
+                           **{f"p{q}": round(_percentile(xs, q), 3)
+                              for q in PERCENTILES}}
+        return out
+
+    def format_stats(self) -> str:
+        lines = []
+        for op, st in self.stats().items():
+            pct = " ".join(f"p{q}={st[f'p{q}']:.3f}ms" for q in PERCENTILES)
+            lines.append(f"[latency] {op}: n={st['n']} {pct} "
+                         f"max={st['max']:.3f}ms")
+        return "\n".join(lines)
+
+
+def serve_lines(service, fin, fout) -> None:
+    for line in fin:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+        except json.JSONDecodeError as e:
+            resp = {"ok": False, "error": f"bad JSON: {e}"}
+        else:
+            resp = service.handle(req)
+        fout.write(json.dumps(resp) + "\n")
+        fout.flush()
+
+
+def make_http_server(service, port, host="127.0.0.1") -> HTTPServer:
+    """POST a request body to any path; GET /stats for the percentiles."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, resp, code=200):
+            body = json.dumps(resp).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            try:
+                n = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                n = -1
+            if n < 0:
+                self._reply({"ok": False, "error": "bad Content-Length"}, 400)
+                return
+            try:
+                req = json.loads(self.rfile.read(n))
+            except json.JSONDecodeError as e:
+                self._reply({"ok": False, "error": f"bad JSON: {e}"}, 400)
+                return
+            resp = service.handle(req)
+            self._reply(resp, 200 if resp["ok"] else 400)
+
+        def do_GET(self):
+            self._reply(service.handle({"op": "stats"}))
+
+        def log_message(self, *args):
+            pass
+
+    return HTTPServer((host, port), Handler)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="interdiction.service")
+    p.add_argument("--http", type=int, metavar="PORT",
+                   help="serve HTTP on 127.0.0.1:PORT instead of stdin/stdout")
+    p.add_argument("--load", action="append", default=[], metavar="MAP",
+                   help="preload a map (named by its path); repeatable")
+    args = p.parse_args(argv)
+
+    service = EvalService()
+    for path in args.load:
+        resp = service.handle({"op": "load", "map": path})
+        if not resp["ok"]:
+            print(f"error: {path}: {resp['error']}", file=sys.stderr)
+            return 2
+    try:
+        if args.http is not None:
+            server = make_http_server(service, args.http)
+            print(f"serving on http://127.0.0.1:{server.server_port}",
+                  file=sys.stderr)
+            try:
+                server.serve_forever()
+            finally:
+                server.server_close()
+        else:
+            serve_lines(service, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    stats = service.format_stats()
+    if stats:
+        print(stats, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Live JSON-lines telemetry of a solver run, and its summarizer.
+
+Every record has `t` (seconds since the stream opened) and `kind`:
+- `window`: one LNS iteration — arm, center, window/free cell counts,
+  contraction time, outcome (memo_skip, screen_reject or the solve
+  status), model build time, Gurobi runtime, callback and cut counts,
+  the concurrent bound's cut pool size, whether the result was accepted,
+  and the incumbent after it;
+- `bound`: full-map bound progress (bound, incumbent, gap, cut pool size);
+- `phase`: wall-clock seconds a CLI phase took.
+
+Lines are flushed as written, so `tail -f` follows a run and a crash
+loses at most the record being written.
+
+    myenv/bin/python -m interdiction.telemetry run.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+
+# per-window seconds split into these parts; "other" is the remainder
+# (neighborhood choice, memo, screen, BFS re-check)
+WINDOW_PARTS = ("contract", "build", "gurobi", "repair")
+
+
+class Telemetry:
+    def __init__(self, path):
+        self._f = open(path, "a")
+        self._t0 = time.monotonic()
+
+    def emit(self, kind, **fields) -> None:
+        rec = {"t": round(time.monotonic() - self._t0, 3), "kind": kind}
+        for k, v in fields.items():
+            if isinstance(v, float):
+                v = None if not math.isfinite(v) else round(v, 4)
+            rec[k] = v
+        self._f.write(json.dumps(rec) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summarize(path) -> dict:
+    """Aggregate a telemetry file into per-phase and per-part seconds."""
+    phases = {}
+    parts = defaultdict(float)
+    outcomes = defaultdict(int)
+    windows = accepted = callbacks = cuts = 0
+    window_seconds = 0.0
+    last_bound = None
+    with open(path) as f:
+        for line in f:
+            rec = json.loads(line)
+            kind = rec["kind"]
+            if kind == "phase":
+                phases[rec["phase"]] = phases.get(rec["phase"], 0.0) \
+                    + rec["seconds"]
+            elif kind == "bound":
+                last_bound = rec
+            elif kind == "window":
+                windows += 1
+                accepted += bool(rec.get("accepted"))
+                outcomes[rec["outcome"]] += 1
+                window_seconds += rec["seconds"]
+                callbacks += rec.get("callbacks") or 0
+                cuts += rec.get("cuts") or 0
+                for part in WINDOW_PARTS:
+                    parts[part] += rec.get(part) or 0.0
+    parts["other"] = window_seconds - sum(parts[p] for p in WINDOW_PARTS)
+    return {"phases": phases, "windows": windows, "accepted": accepted,
+            "outcomes": dict(outcomes), "window_seconds": window_seconds,
+            "parts": dict(parts), "callbacks": callbacks, "cuts": cuts,
+            "last_bound": last_bound}
+
+
+def format_summary(s) -> str:
+    lines = []
+    for phase, secs in s["phases"].items():
+        lines.append(f"phase {phase:<8} {secs:9.1f}s")
+    if s["windows"]:
+        total = s["window_seconds"] or 1.0
+        lines.append(f"windows {s['windows']} accepted {s['accepted']} "
+                     f"callbacks {s['callbacks']} cuts {s['cuts']}")
+        for outcome, n in sorted(s["outcomes"].items()):
+            lines.append(f"  {outcome:<14} {n:6d}")
+        for part, secs in s["parts"].items():
+            lines.append(f"  {part:<14} {secs:9.1f}s {secs / total:6.1%}")
+    b = s["last_bound"]
+    if b is not None:
+        lines.append(f"bound {b['bound']} incumbent {b['incumbent']} "
+                     f"gap {b['gap']} pool {b['pool']} at t={b['t']}s")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python -m interdiction.telemetry FILE",
+              file=sys.stderr)
+        return 2
+    print(format_summary(summarize(argv[0])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,20 +6,34 @@ weighted outside edges, so the callback runs Dijkstra instead of a
 (no fully-open and no fully-walled 2x2 square) prune toward maze-like
 solutions; with hints the model may be INFEASIBLE, which callers treat as
 "no improvement in this window".
+
+`time_limit` is soft when `extend_to` is given: past it the solve only
+continues while incumbents keep arriving, up to `extend_to` seconds.
+`bound_stop` ends the solve as soon as the bound proves the window cannot
+beat that maximin (status BOUND_STOP); `maximin_ub` (e.g. the contracted
+window's combinatorial bound) caps the objective variable.
 """
 
 from __future__ import annotations
 
+import time
+
 import gurobipy as gp
 from gurobipy import GRB
 
+from interdiction import profiling
 from interdiction.grid import square2
 from interdiction.master import SolveResult, _STATUS
 
+STALE_FRAC = 0.25   # extended solves stop once this fraction of the soft
+                    # limit has passed without a new incumbent
+
 
 def solve_window(cw, *, time_limit=None, warm_start=None, corridor_hint=True,
-                 blocks2=False, warm_anchors=None,
-                 gurobi_seed=0, output=False) -> SolveResult:
+                 blocks2=False, warm_anchors=None, extend_to=None,
+                 bound_stop=None, maximin_ub=None, gurobi_seed=0,
+                 output=False) -> SolveResult:
+    t_build = time.monotonic()
     # a placed 2x2 block is exactly the "thick wall" square the hint forbids
     if blocks2:
         corridor_hint = False
@@ -35,8 +49,15 @@ def solve_window(cw, *, time_limit=None, warm_start=None, corridor_hint=True,
     m.Params.MIPFocus = 1
     m.Params.NodefileStart = 0.5
     m.Params.SoftMemLimit = 8
+    soft = None
     if time_limit is not None:
         m.Params.TimeLimit = max(time_limit, 0.01)
+        if extend_to is not None and extend_to > time_limit:
+            soft = time_limit
+            m.Params.TimeLimit = extend_to
+    if bound_stop is not None:
+        # integral maximin: a bound below bound_stop + 1 proves no gain
+        m.Params.BestBdStop = bound_stop + 1 - 1e-4
 
     y = {v: m.addVar(vtype=GRB.BINARY, name=f"y_{v[0]}_{v[1]}")
          for v in sorted(cw.free)}
@@ -67,7 +88,8 @@ def solve_window(cw, *, time_limit=None, warm_start=None, corridor_hint=True,
         zk = m.addVar(vtype=GRB.INTEGER, lb=d_open, ub=U, name=f"z_{k}")
         m.addConstr(zk == 2 * q + par)
         zvars.append(zk)
-    z = m.addVar(vtype=GRB.INTEGER, lb=0, ub=U, name="z")
+    z_ub = U if maximin_ub is None else max(0, min(U, maximin_ub))
+    z = m.addVar(vtype=GRB.INTEGER, lb=0, ub=z_ub, name="z")
     for zk in zvars:
         m.addConstr(z <= zk)
     m.setObjective(z, GRB.MAXIMIZE)
@@ -111,33 +133,61 @@ def solve_window(cw, *, time_limit=None, warm_start=None, corridor_hint=True,
         hits = gp.quicksum(y[v] for v in cells if v in y)
         return zvars[k] <= length + (U - length) * hits
 
+    last_incumbent = [0.0]
+    soft_stopped = [False]
+    counts = [0, 0]     # MIPSOL callbacks, lazy cuts
+
     def cb(model, where):
+        if where == GRB.Callback.MIP and soft is not None:
+            now = model.cbGet(GRB.Callback.RUNTIME)
+            if now >= soft and now - last_incumbent[0] >= soft * STALE_FRAC:
+                soft_stopped[0] = True
+                model.terminate()
+            return
         if where != GRB.Callback.MIPSOL:
             return
+        with profiling.timer("window.callback"):
+            mipsol(model)
+
+    def mipsol(model):
+        counts[0] += 1
         yv = model.cbGetSolution([y[v] for v in order])
         walls = {v for v, val in zip(order, yv) if val > 0.5}
         res = cw.dijkstra(walls)
         claims = model.cbGetSolution(zvars)
+        violated = False
         for k, (true_d, cells) in enumerate(res):
             assert true_d is not None, \
                 "spawn disconnected in incumbent — flow constraints broken"
             if claims[k] > true_d + 0.5:
                 model.cbLazy(cut_expr(k, cells, true_d))
-
-    m.optimize(cb)
+                counts[1] += 1
+                violated = True
+        if not violated:
+            last_incumbent[0] = model.cbGet(GRB.Callback.RUNTIME)
+
+    build_time = time.monotonic() - t_build
+    profiling.add("window.build", build_time)
+    with profiling.timer("window.optimize"):
+        m.optimize(cb)
+    stats = dict(runtime=m.Runtime, build_time=build_time,
+                 callbacks=counts[0], cuts=counts[1])
 
     if m.Status == GRB.INFEASIBLE:
         m.dispose()
         if corridor_hint:
-            return SolveResult("NO_SOLUTION", None, None, None, float("-inf"))
+            return SolveResult("NO_SOLUTION", None, None, None, float("-inf"),
+                               **stats)
         raise AssertionError(
             "window master infeasible without corridor hints — impossible")
 
     status = _STATUS.get(m.Status, str(m.Status))
+    if soft_stopped[0] and m.Status == GRB.INTERRUPTED:
+        status = "TIME_LIMIT"
     bound = m.ObjBound
     if m.SolCount == 0:
         m.dispose()
-        return SolveResult("NO_SOLUTION", None, None, None, bound)
+        return SolveResult("NO_SOLUTION", None, None, None, bound, **stats)
 
     walls = {v for v, var in y.items() if var.X > 0.5}
     anchors = ({a for a, var in b.items() if var.X > 0.5}
@@ -151,4 +201,4 @@ def solve_window(cw, *, time_limit=None, warm_start=None, corridor_hint=True,
     maximin = min(per)
     assert round(obj_val) <= maximin, \
         "window incumbent overclaims shortest path — cut bug"
-    return SolveResult(status, walls, maximin, per, bound, anchors)
+    return SolveResult(status, walls, maximin, per, bound, anchors, **stats)
@@ -1,8 +1,16 @@
+import os
+import sys
 import textwrap
 from itertools import combinations
 
 import pytest
 
+# the annealing/ and genetic/ scripts import their siblings as top-level
+# modules, as when run from their own directory
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _d in ("annealing", "genetic"):
+    sys.path.insert(0, os.path.join(_ROOT, _d))
+
 
 def brute_force_opt(grid):
     """Exhaustive optimum over all wall subsets. Only for tiny maps."""
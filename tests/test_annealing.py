@@ -0,0 +1,142 @@
+import glob
+import random
+
+import pytest
+
+from solver import (PIECES, IncrementalDistances, PieceStore, can_place,
+                    compute_distances, place_piece, read_map_file,
+                    remove_piece, score_of)
+
+
+def _random_piece(rng, grid, obstacles, unbuildables):
+    R, C = len(grid), len(grid[0])
+    for _ in range(200):
+        symbol, orientations = rng.choice(PIECES)
+        coords = can_place(grid, rng.randrange(R), rng.randrange(C),
+                           rng.choice(orientations), obstacles, unbuildables)
+        if coords is not None:
+            return coords, symbol
+    return None
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("maps/*.txt")))
+def test_incremental_field_matches_full_bfs(path):
+    lines, spawns, target, obstacles, unbuildables = read_map_file(path)
+    grid = [list(row) for row in lines]
+    field = IncrementalDistances(grid, target)
+    assert field.rows() == compute_distances(grid, target)
+    rng = random.Random(path)
+    placed = []
+    for _ in range(120):
+        if placed and rng.random() < 0.4:
+            coords, symbol = placed.pop(rng.randrange(len(placed)))
+            remove_piece(grid, coords)
+            field.unblock(coords)
+            adding = False
+        else:
+            piece = _random_piece(rng, grid, obstacles, unbuildables)
+            if piece is None:
+                continue
+            coords, symbol = piece
+            place_piece(grid, coords, symbol)
+            field.block(coords)
+            adding = True
+        expected = compute_distances(grid, target)
+        assert field.rows() == expected
+        assert field.score(spawns) == score_of(expected, spawns)
+        if rng.random() < 0.5:      # reject: undo the move
+            if adding:
+                remove_piece(grid, coords)
+            else:
+                place_piece(grid, coords, symbol)
+                placed.append((coords, symbol))
+            field.rollback()
+        else:
+            if adding:
+                placed.append((coords, symbol))
+            field.commit()
+        assert field.rows() == compute_distances(grid, target)
+
+def test_binding_dag_is_every_shortest_path_of_the_closest_spawn():
+    lines, spawns, target, _obs, _unb = read_map_file("maps/basic.txt")
+    field = IncrementalDistances([list(row) for row in lines], target)
+    dag = field.binding_dag(spawns)
+    dist = field.rows()
+    d = min(dist[r][c] for r, c in spawns)
+    assert {s for s in spawns if dist[s[0]][s[1]] == d} <= dag
+    assert target in dag
+    # each DAG cell but the target has a DAG neighbor one step closer
+    for r, c in dag - {target}:
+        assert any((r + dr, c + dc) in dag
+                   and dist[r + dr][c + dc] == dist[r][c] - 1
+                   for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)))
+
+
+def _nearest_of(grid, roots):
+    fields = [compute_distances(grid, root) for root in roots]
+    return [[min((d for d in ds if d is not None), default=None)
+             for ds in zip(*rows)] for rows in zip(*fields)]
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("maps/*.txt")))
+def test_spawn_rooted_field_bounds_the_score_after_a_removal(path):
+    lines, spawns, target, obstacles, unbuildables = read_map_file(path)
+    grid = [list(row) for row in lines]
+    field = IncrementalDistances(grid, target)
+    from_spawns = IncrementalDistances(grid, *spawns)
+    rng = random.Random(path)
+    placed = []
+    for _ in range(60):
+        piece = _random_piece(rng, grid, obstacles, unbuildables)
+        if piece is None:
+            continue
+        coords, symbol = piece
+        place_piece(grid, coords, symbol)
+        field.block(coords)
+        if field.score(spawns) < 0:     # keep every spawn connected
+            remove_piece(grid, coords)
+            field.rollback()
+            continue
+        field.commit()
+        from_spawns.block(coords)
+        from_spawns.commit()
+        placed.append((coords, symbol))
+        assert from_spawns.rows() == _nearest_of(grid, spawns)
+    exact = 0
+    for coords, symbol in placed:
+        score = field.score(spawns)
+        bound = field.detour(coords, from_spawns)
+        remove_piece(grid, coords)
+        field.unblock(coords)
+        after = field.score(spawns)
+        # an upper bound on the score after the removal, usually exact
+        assert after <= min(score, bound)
+        exact += after == min(score, bound)
+        place_piece(grid, coords, symbol)
+        field.rollback()
+    assert exact >= 0.9 * len(placed)
+
+
+def test_piece_store_swap_remove_and_choice():
+    store = PieceStore()
+    pieces = [(((0, i), (1, i)), "I") for i in range(5)]
+    for coords, symbol in pieces:
+        store.add(coords, symbol)
+    store.remove(pieces[1][0])          # the last piece fills slot 1
+    assert store.pieces[1] == pieces[4]
+    store.remove(pieces[4][0])
+    store.remove(pieces[3][0])          # removing the last slot itself
+    assert len(store) == 2
+    assert sorted(store.pieces) == sorted([pieces[0], pieces[2]])
+    assert all(store.pieces[i][0] == c for c, i in store.index.items())
+    assert store.get(pieces[2][0]) == pieces[2]
+    assert store.owner == {cell: coords for coords, _s in store.pieces
+                           for cell in coords}
+
+    state = random.getstate()
+    try:
+        random.seed(0)
+        seen = {store.choice() for _ in range(200)}
+    finally:
+        random.setstate(state)
+    assert seen == set(store.pieces)
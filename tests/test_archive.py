@@ -0,0 +1,192 @@
+import json
+import random
+import threading
+
+import pytest
+
+from interdiction.archive import (EliteArchive, pack_walls, unpack_walls,
+                                  wall_hash)
+from interdiction.cli import main
+from interdiction.grid import parse_map, square2, tile2_decompose
+from interdiction.lns import _relink_cells, _relink_pair, run_lns
+
+
+def test_pack_roundtrip_and_hash():
+    grid = parse_map("maps/basic.txt")
+    walls = set(sorted(grid.buildable)[::7])
+    assert unpack_walls(grid, pack_walls(grid, walls)) == walls
+    assert len(pack_walls(grid, walls)) == (len(grid.buildable) + 7) // 8
+    assert wall_hash(grid, walls) == wall_hash(grid, list(walls))
+    assert wall_hash(grid, walls) != wall_hash(grid, set())
+
+
+def test_archive_keeps_top_k_distinct_connected(make_map):
+    grid = parse_map(make_map("""
+        S....
+        .....
+        .....
+        ....T
+    """))
+    snake = {(0, 1), (1, 1), (2, 1), (1, 3), (2, 3), (3, 3)}
+    arch = EliteArchive(grid, size=2)
+    assert arch.add({(1, 1)})                       # 7
+    assert not arch.add({(1, 1)})                   # duplicate
+    assert not arch.add({(0, 1), (1, 0)})           # cuts the spawn off
+    assert arch.add(snake)                          # 13
+    assert not arch.add({(1, 2)})                   # 7: ties keep the older
+    assert [e.maximin for e in arch.elites] == [13, 7]
+    assert arch.best().walls == frozenset(snake)
+    assert arch.elites[1].walls == frozenset({(1, 1)})
+
+
+def test_archive_save_merges_and_rejects_other_maps(make_map, tmp_path):
+    path = make_map("""
+        S....
+        .....
+        ....T
+    """)
+    grid = parse_map(path)
+    f = str(tmp_path / "m.elites")
+    a = EliteArchive(grid)
+    a.add({(1, 1)})
+    a.save(f)
+    b = EliteArchive.load(f, grid)
+    b.add({(1, 1), (1, 2), (1, 3)})
+    a.add({(0, 2), (1, 2)})
+    b.save(f)
+    a.save(f)       # re-reads b's elite before writing
+    merged = EliteArchive.load(f, grid)
+    assert len(merged.elites) == 3
+    assert json.load(open(f))["elites"][0]["hash"] == merged.best().digest
+
+    other = parse_map(make_map("""
+        S...
+        ...T
+    """, name="other.txt"))
+    with pytest.raises(ValueError):
+        EliteArchive.load(f, other)
+    assert EliteArchive.load(str(tmp_path / "none.elites"), grid).elites == []
+
+
+def test_malformed_archive_is_a_value_error(make_map, tmp_path, capsys):
+    path = make_map("""
+        S....
+        ....T
+    """)
+    grid = parse_map(path)
+    good = EliteArchive(grid).to_json()
+    for data in ([], "x", {"version": 1},
+                 {**good, "elites": {}},
+                 {**good, "elites": [{}]},
+                 {**good, "elites": [{"walls": 3}]},
+                 {**good, "elites": [{"walls": "AAAA"}]}):
+        with pytest.raises(ValueError):
+            EliteArchive(grid).merge_json(data)
+
+    f = tmp_path / "m.elites"
+    f.write_text("[]")
+    assert main([path, "--time", "1", "--archive", str(f),
+                 "--out", str(tmp_path / "sol.txt")]) == 2
+    assert f"cannot read archive {f}" in capsys.readouterr().err
+
+
+def test_concurrent_saves_keep_every_elite(make_map, tmp_path):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        .....T
+    """))
+    f = str(tmp_path / "m.elites")
+    archives = []
+    for c in range(4):
+        a = EliteArchive(grid)
+        a.add({(1, c)})
+        archives.append(a)
+    threads = [threading.Thread(target=a.save, args=(f,)) for a in archives]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(EliteArchive.load(f, grid).elites) == 4
+    assert not list(tmp_path.glob("*.tmp"))
+
+    other = parse_map(make_map("""
+        S...
+        ...T
+    """, name="other.txt"))
+    with pytest.raises(ValueError):
+        EliteArchive(other).save(f)
+
+
+def test_cli_warns_when_the_archive_cannot_be_saved(make_map, tmp_path,
+                                                    capsys):
+    path = make_map("""
+        S....
+        ....T
+    """)
+    f = tmp_path / "missing" / "m.elites"
+    out_file = tmp_path / "sol.txt"
+    assert main([path, "--time", "1", "--archive", str(f),
+                 "--out", str(out_file)]) == 0
+    assert f"warning: cannot save archive {f}" in capsys.readouterr().err
+    assert out_file.exists()
+
+
+def test_relink_frees_only_differing_cells():
+    grid = parse_map("maps/basic.txt")
+    rng = random.Random(0)
+    cells = sorted(grid.buildable)
+    a, b = set(cells[:30]), set(cells[20:50])
+    for _ in range(20):
+        window = _relink_cells(grid, a, b, rng, 6)
+        assert window and window <= a ^ b
+    base, guide = _relink_pair((5, a, set()), [(9, b, set())], rng)
+    assert base[0] == 9 and guide[0] == 5
+    assert _relink_pair((5, a, set()), [(5, set(a), set())], rng) is None
+
+
+def test_relink_blocks2_window_holds_whole_guide_blocks():
+    grid = parse_map("maps/basic.txt")
+    anchors = [a for a in sorted(grid.buildable)
+               if all(v in grid.buildable for v in square2(a))]
+    guide_anchors = {anchors[0], anchors[-1]}
+    guide = {v for a in guide_anchors for v in square2(a)}
+    rng = random.Random(1)
+    window = _relink_cells(grid, set(), guide, rng, 2, guide_anchors)
+    tile2_decompose(window)     # a union of whole guide blocks
+
+
+def test_lns_relinks_archived_elites():
+    grid = parse_map("maps/basic.txt")
+    a = run_lns(grid, set(), total_time=6.0, subsolve_time=2.0,
+                rng=random.Random(0), window_sizes=(4, 6))
+    b = run_lns(grid, set(), total_time=6.0, subsolve_time=2.0,
+                rng=random.Random(1), window_sizes=(4, 6))
+    res = run_lns(grid, set(), total_time=8.0, subsolve_time=2.0,
+                  rng=random.Random(2), window_sizes=(4, 6),
+                  elites=[a.walls, b.walls, {next(iter(grid.buildable))}])
+    relink = [st for arm, st in res.arm_stats if arm.shape == "relink"]
+    assert relink and sum(st.pulls for st in relink) > 0
+    val, per = grid.evaluate(res.walls)
+    assert val == res.maximin and per == res.per_spawn
+
+
+def test_cli_archive_seeds_and_collects(make_map, tmp_path, capsys):
+    path = make_map("""
+        S......
+        .......
+        .......
+        ......T
+    """)
+    out_file = str(tmp_path / "sol.txt")
+    argv = [path, "--time", "6", "--bound-mode", "sequential",
+            "--bound-frac", "0.3", "--subsolve-time", "2",
+            "--window-sizes", "4,6", "--no-corridor-hint",
+            "--archive", "--out", out_file]
+    assert main(argv) == 0
+    arch = EliteArchive.load(str(tmp_path / "m.elites"), parse_map(path))
+    assert len(arch.elites) == 1
+    assert main(argv + ["--rng-seed", "1"]) == 0
+    out = capsys.readouterr().out
+    assert f"seeding from the best of 1 elites (maximin " \
+           f"{arch.best().maximin})" in out
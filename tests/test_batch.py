@@ -0,0 +1,64 @@
+import csv
+import json
+import os
+
+import pytest
+
+from interdiction.batch import collect_maps, is_map_file, main
+from interdiction.grid import parse_map, parse_solution
+
+
+def test_map_files_skip_solutions_and_seeds():
+    maps = collect_maps(["maps"])
+    assert "maps/basic.txt" in maps and "maps/endless.txt" in maps
+    assert not any("solution" in m or m.endswith("_seed.txt")
+                   or m.endswith(".py") for m in maps)
+    assert is_map_file("testcase/simple.json")
+    # globs and explicit files are taken as given, duplicates dropped
+    assert collect_maps(["testcase/s*.json", "testcase/simple.json"]) == \
+        ["testcase/simple.json", "testcase/spiral.json"]
+
+
+def test_batch_solves_every_map_and_writes_table(make_map, tmp_path):
+    txt = make_map("""
+        S....
+        .....
+        ....T
+    """, name="tiny.txt")
+    tc = tmp_path / "case.json"
+    tc.write_text(json.dumps({"grid_size": [3, 5], "nucleus": [2, 4],
+                              "spawns": [[0, 0]], "obstacles": [[1, 1]]}))
+    out_dir = tmp_path / "out"
+    table = str(tmp_path / "r.csv")
+    assert main([str(tmp_path), "--jobs", "2", "--time", "10",
+                 "--table", table, "--out-dir", str(out_dir),
+                 "--subsolve-time", "2", "--window-sizes", "4"]) == 0
+    with open(table) as f:
+        rows = list(csv.DictReader(f))
+    assert [os.path.basename(r["map"]) for r in rows] == \
+        ["case.json", "tiny.txt"]
+    for row in rows:
+        assert row["status"] == "ok"
+        assert float(row["bound"]) >= int(row["maximin"])
+        assert os.path.exists(row["out"]) and os.path.exists(
+            row["out"] + ".log")
+        assert float(row["t_bound"]) > 0        # sequential final phase
+    grid = parse_map(txt)
+    val, _ = grid.evaluate(parse_solution(grid, rows[1]["out"]))
+    assert val == int(rows[1]["maximin"])
+
+
+def test_batch_reports_failed_maps(make_map, tmp_path):
+    bad = make_map("S..\n###\n..T", name="cut.txt")
+    table = str(tmp_path / "r.jsonl")
+    assert main([bad, "--jobs", "1", "--time", "5", "--table", table,
+                 "--out-dir", str(tmp_path)]) == 1
+    with open(table) as f:
+        (row,) = [json.loads(ln) for ln in f]
+    assert row["status"] == "error" and "unreachable" in row["error"]
+
+
+def test_batch_rejects_a_concurrent_bound(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["maps/basic.txt", "--bound-mode", "concurrent",
+              "--table", str(tmp_path / "r.csv")])
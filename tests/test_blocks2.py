@@ -109,7 +109,7 @@ def test_cli_blocks2_pipeline(make_map, tmp_path):
         ......T
     """)
     out_file = str(tmp_path / "sol.txt")
-    assert main([path, "--blocks2", "--time", "20", "--bound-frac", "0.5",
+    assert main([path, "--blocks2", "--time", "20",
                  "--subsolve-time", "4", "--rng-seed", "1",
                  "--window-sizes", "6,8", "--out", out_file]) == 0
     grid = parse_map(path)
@@ -1,9 +1,15 @@
 import math
 import random
+import time
 
-from interdiction.bound import gap, run_bound
+import pytest
+
+from interdiction.bound import (ConcurrentBound, _blocks, blockcut_bound,
+                                cheap_bounds, colour_bound, gap, reduced_bound,
+                                reduced_grid, run_bound)
 from interdiction.grid import parse_map
 from interdiction.master import MasterSolver
+from tests.conftest import brute_force_opt
 
 
 def test_bound_run_tightens_to_optimum_on_small_map(make_map):
@@ -26,3 +32,115 @@ def test_gap():
     assert gap(10, 12.0) == 0.2
     assert gap(10, 10.0) == 0.0
     assert math.isinf(gap(0, 5.0))
+
+
+def test_concurrent_bound_reports_bound_and_incumbent(make_map):
+    grid = parse_map(make_map("""
+        S....
+        .....
+        .....
+        ....T
+    """))
+    cb = ConcurrentBound(grid, set(), time_limit=60).start()
+    try:
+        deadline = time.monotonic() + 90
+        while not cb.done() and time.monotonic() < deadline:
+            cb.poll()
+            time.sleep(0.1)
+        bound, walls, _anchors, val = cb.finish()
+    finally:
+        cb.close()
+    assert val == grid.evaluate(walls)[0]
+    assert round(bound) == val
+
+
+def test_concurrent_bound_stops_at_gap_target(make_map):
+    grid = parse_map(make_map("""
+        S......
+        .......
+        .......
+        ......T
+    """))
+    # a loose target is met as soon as the first bound arrives
+    cb = ConcurrentBound(grid, set(), time_limit=60, gap_target=10.0).start()
+    try:
+        deadline = time.monotonic() + 90
+        while not cb.done() and time.monotonic() < deadline:
+            cb.poll()
+            time.sleep(0.1)
+    finally:
+        cb.close()
+    assert cb.done()
+    bound, walls, _anchors, val = cb.result
+    assert gap(val, bound) <= 10.0
+
+
+BRIDGED = """
+    S..#....
+    ...#....
+    ........
+    ####.###
+    .......T
+    ...#....
+"""
+
+
+def test_blocks_split_at_bridges(make_map):
+    grid = parse_map(make_map(BRIDGED))
+    blocks = _blocks(grid)
+    # every walkable edge lies in exactly one block
+    edges = {frozenset((u, v)) for u in grid.walkable
+             for v in grid.neighbors(u)}
+    covered = [frozenset((u, v)) for b in blocks for u in b
+               for v in grid.neighbors(u) if v in b and u < v]
+    assert sorted(covered, key=sorted) == sorted(edges, key=sorted)
+    assert {(2, 4), (3, 4)} in blocks     # the corridor is a bridge
+    # the bottom-left room hangs off the chain and is dropped
+    small = reduced_grid(grid)
+    assert (5, 0) not in small.walkable and (5, 7) in small.walkable
+
+
+@pytest.mark.parametrize("text", [
+    """
+    S.#.
+    ....
+    ##.#
+    ...T
+    """,
+    """
+    S....
+    .#...
+    ...#T
+    """,
+    """
+    S.X..
+    ..#..
+    S...T
+    """,
+    """
+    S...
+    ....
+    S..T
+    """,
+])
+def test_cheap_bounds_are_valid(make_map, text):
+    grid = parse_map(make_map(text))
+    opt, _ = brute_force_opt(grid)
+    cb, bc = colour_bound(grid), blockcut_bound(grid)
+    assert opt <= cb
+    assert opt <= bc
+    red = reduced_bound(grid, time_limit=30, maximin_ub=bc)
+    assert opt <= red + 1e-6 and red <= bc
+
+
+def test_cheap_bounds_report_in_order(make_map):
+    grid = parse_map(make_map(BRIDGED))
+    out = cheap_bounds(grid, ["blockcut", "colour"])
+    assert [m for m, _b, _t in out] == ["blockcut", "colour"]
+    with pytest.raises(ValueError):
+        cheap_bounds(grid, ["nope"])
+
+
+def test_gap_uses_tightest_bound():
+    assert gap(10, 12.0, 11.0, None) == pytest.approx(0.1)
+    assert math.isinf(gap(10))
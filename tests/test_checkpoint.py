@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from interdiction.checkpoint import (decode_path, decode_pool, encode_path,
+                                     encode_pool, encode_rng, load_checkpoint,
+                                     map_fingerprint, restore_rng,
+                                     save_checkpoint)
+from interdiction.cli import main
+from interdiction.grid import parse_map, parse_solution
+from interdiction.lns import run_lns
+
+
+def test_path_and_pool_roundtrip():
+    path = ((0, 0), (0, 1), (1, 1), (2, 1), (2, 0))
+    assert encode_path(path) == [0, 0, "RDDL"]
+    assert decode_path(encode_path(path)) == path
+    pool = {(0, path), (1, path[:3])}
+    assert decode_pool(encode_pool(pool)) == pool
+
+
+def test_rng_roundtrip_through_file(tmp_path):
+    rng = random.Random(5)
+    rng.random()
+    f = str(tmp_path / "ck.gz")
+    save_checkpoint(f, {"rng": encode_rng(rng)})
+    expected = [rng.random() for _ in range(5)]
+    other = random.Random(0)
+    restore_rng(other, load_checkpoint(f)["rng"])
+    assert [other.random() for _ in range(5)] == expected
+
+
+def test_checkpoint_rejects_other_map(make_map, tmp_path):
+    a = parse_map(make_map("S..\n..T", name="a.txt"))
+    b = parse_map(make_map("S...\n...T", name="b.txt"))
+    f = str(tmp_path / "ck.gz")
+    save_checkpoint(f, {"map": map_fingerprint(a)})
+    assert load_checkpoint(f, a)["map"] == map_fingerprint(a)
+    with pytest.raises(ValueError):
+        load_checkpoint(f, b)
+
+
+def test_lns_resume_continues_clock_and_stats():
+    grid = parse_map("maps/basic.txt")
+    snaps = []
+    first = run_lns(grid, set(), total_time=4.0, subsolve_time=1.0,
+                    rng=random.Random(0), window_sizes=(4,),
+                    on_checkpoint=snaps.append)
+    snap = snaps[-1]
+    assert snap["elapsed"] >= 3.0
+    pulls = sum(st.pulls for _arm, st in first.arm_stats)
+    # budget already used up: the resumed run only restores state
+    again = run_lns(grid, first.walls, total_time=4.0, subsolve_time=1.0,
+                    rng=random.Random(0), window_sizes=(4,), resume=snap)
+    assert again.maximin == first.maximin
+    assert again.trajectory == first.trajectory
+    assert sum(st.pulls for _arm, st in again.arm_stats) == pulls
+
+
+def test_cli_checkpoint_then_resume(make_map, tmp_path, capsys):
+    path = make_map("""
+        S......
+        .......
+        ......T
+    """)
+    ck = str(tmp_path / "run.ckpt")
+    out_file = str(tmp_path / "sol.txt")
+    assert main([path, "--time", "6", "--bound-mode", "sequential",
+                 "--bound-frac", "0.5",
+                 "--subsolve-time", "1", "--window-sizes", "4",
+                 "--checkpoint", ck, "--out", out_file]) == 0
+    grid = parse_map(path)
+    state = load_checkpoint(ck, grid)
+    assert state["phase"] == "done"
+    assert len(state["cut_pool"]) > 0
+    val = grid.evaluate(parse_solution(grid, out_file))[0]
+    capsys.readouterr()
+    # a finished run resumes straight to its result
+    assert main([path, "--resume", ck, "--out", out_file]) == 0
+    assert f"maximin: {val}" in capsys.readouterr().out
@@ -1,4 +1,5 @@
 import os
+import time
 
 from interdiction.cli import main
 from interdiction.grid import parse_map, parse_solution
@@ -56,7 +57,8 @@ def test_lns_pipeline_smoke(make_map, tmp_path, capsys):
         ......T
     """)
     out_file = str(tmp_path / "sol.txt")
-    assert main([path, "--time", "20", "--bound-frac", "0.5",
+    assert main([path, "--time", "20", "--bound-mode", "sequential",
+                 "--bound-frac", "0.5",
                  "--subsolve-time", "4", "--rng-seed", "1",
                  "--window-sizes", "6,8", "--no-corridor-hint",
                  "--out", out_file]) == 0
@@ -65,3 +67,24 @@ def test_lns_pipeline_smoke(make_map, tmp_path, capsys):
     val, _ = grid.evaluate(walls)
     baseline, _ = grid.evaluate(set())
     assert val >= baseline
+
+
+def test_concurrent_bound_pipeline(make_map, tmp_path, capsys):
+    path = make_map("""
+        S......
+        .......
+        .......
+        ......T
+    """)
+    out_file = str(tmp_path / "sol.txt")
+    # the bound closes this map quickly, which ends the LNS early
+    t0 = time.monotonic()
+    assert main([path, "--time", "120", "--subsolve-time", "4",
+                 "--rng-seed", "1", "--window-sizes", "6,8",
+                 "--out", out_file]) == 0
+    assert time.monotonic() - t0 < 100
+    out = capsys.readouterr().out
+    assert "gap: 0.000" in out
+    grid = parse_map(path)
+    val, _ = grid.evaluate(parse_solution(grid, out_file))
+    assert f"maximin: {val}" in out
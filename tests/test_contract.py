@@ -1,6 +1,6 @@
 import random
 
-from interdiction.contract import contract
+from interdiction.contract import _bfs, contract
 from interdiction.grid import parse_map
 
 
@@ -53,6 +53,38 @@ def test_contraction_exactness_property(make_map):
     assert checked >= 150
 
 
+def test_early_stopping_searches_match_full_searches(make_map):
+    rng = random.Random(7)
+    for i in range(60):
+        grid = _random_map(make_map, rng, i)
+        window = _window(grid, rng.randint(0, grid.rows - 2),
+                         rng.randint(0, grid.cols - 2), 3)
+        walls = {v for v in grid.buildable - window if rng.random() < 0.2}
+        cw = contract(grid, window, walls)
+        blocked = {v for v in cw.free if rng.random() < 0.3}
+        full, _ = cw._from(grid.target, blocked)
+        part, _ = cw._from(grid.target, blocked, stop=set(grid.spawns))
+        assert [part.get(s) for s in grid.spawns] == \
+            [full.get(s) for s in grid.spawns]
+
+        out_open = grid.walkable - window - walls
+        stop = set(rng.sample(sorted(out_open), min(3, len(out_open))))
+        src = rng.choice(sorted(out_open))
+        full = _bfs(grid, src, out_open)
+        part = _bfs(grid, src, out_open, stop=stop)
+        assert {v: part.get(v) for v in stop} == {v: full.get(v) for v in stop}
+
+
+def test_bfs_stops_once_every_stop_cell_is_reached(make_map):
+    grid = parse_map(make_map("""
+        S.........
+        ..........
+        .........T
+    """))
+    assert len(_bfs(grid, (0, 0), grid.walkable, stop={(0, 1)})) < 5
+    assert len(_bfs(grid, (0, 0), grid.walkable)) == 30
+
+
 def test_contraction_path_cells_are_window_cells_of_shortest_path(make_map):
     grid = parse_map(make_map("""
         S....
@@ -82,6 +114,19 @@ def test_contraction_with_target_inside_window(make_map):
     assert d == 6
 
 
+def test_contraction_path_through_a_spawn_on_the_window_edge(make_map):
+    # the top spawn's only way in runs through the bottom spawn, a portal
+    grid = parse_map(make_map("""
+        S#...
+        .#...
+        S....
+        ##..T
+    """))
+    cw = contract(grid, _window(grid, 2, 1, 2), set())
+    got = [d for d, _cells in cw.dijkstra(frozenset())]
+    assert got == [grid.dist_field(set())[s] for s in grid.spawns] == [7, 5]
+
+
 def test_contraction_reports_disconnect(make_map):
     grid = parse_map(make_map("""
         S..
@@ -92,3 +137,55 @@ def test_contraction_reports_disconnect(make_map):
     cw = contract(grid, window, set())
     got = cw.dijkstra(frozenset({(0, 1), (1, 0)}))   # seals the spawn
     assert got[0] == (None, None)
+
+
+def test_window_upper_bound_is_valid(make_map):
+    """Brute force every window wall assignment: none beats the bound."""
+    rng = random.Random(7)
+    for i in range(60):
+        grid = _random_map(make_map, rng, i)
+        window = _window(grid, rng.randint(0, grid.rows - 2),
+                         rng.randint(0, grid.cols - 2), rng.randint(2, 3))
+        free = sorted(window & grid.buildable)
+        outside = {v for v in grid.buildable - set(free)
+                   if rng.random() < 0.2}
+        if grid.evaluate(outside)[0] is None:
+            continue
+        cw = contract(grid, window, outside)
+        ub = cw.maximin_upper_bound()
+        best = None
+        for mask in range(1 << len(free)):
+            walls = {v for j, v in enumerate(free) if mask >> j & 1}
+            val, _ = grid.evaluate(walls | outside)
+            if val is not None and (best is None or val > best):
+                best = val
+        assert best is not None and best <= ub, f"case {i}: {best} > {ub}"
+
+
+def test_window_upper_bound_when_window_cannot_block(make_map):
+    # the window sits off the only corridor: nothing inside matters
+    grid = parse_map(make_map("""
+        S....
+        ####.
+        ....T
+    """))
+    cw = contract(grid, _window(grid, 2, 0, 2), set())
+    assert cw.maximin_upper_bound() == grid.evaluate(set())[0]
+
+
+def test_contraction_exact_for_disjoint_regions(make_map):
+    """Two separate windows contracted together stay exact."""
+    rng = random.Random(11)
+    for i in range(100):
+        grid = _random_map(make_map, rng, i)
+        window = (_window(grid, rng.randint(0, grid.rows - 2),
+                          rng.randint(0, grid.cols - 2), 2)
+                  | _window(grid, rng.randint(0, grid.rows - 2),
+                            rng.randint(0, grid.cols - 2), 2))
+        free = window & grid.buildable
+        walls = {v for v in grid.buildable if rng.random() < 0.25}
+        cw = contract(grid, window, walls - free)
+        got = cw.dijkstra(walls & free)
+        dist = grid.dist_field(walls)
+        for k, s in enumerate(grid.spawns):
+            assert got[k][0] == dist.get(s), f"case {i}, spawn {s}"
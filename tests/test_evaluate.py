@@ -0,0 +1,73 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from interdiction.evaluate import main, process_age, split_stdin
+from interdiction.grid import parse_map, write_solution
+
+
+def test_solver_free_paths_never_import_gurobipy():
+    code = ("import sys\n"
+            "from interdiction.cli import main\n"
+            "import interdiction.evaluate, interdiction.lns\n"
+            "import interdiction.bound, interdiction.repair\n"
+            "main(['maps/basic.txt', '--eval-only',\n"
+            "      '--bound-method', 'colour,blockcut,reduced'])\n"
+            "assert 'gurobipy' not in sys.modules, 'gurobipy imported'\n")
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   capture_output=True)
+
+
+def test_evaluates_files_and_stdin(make_map, tmp_path, monkeypatch, capsys):
+    path = make_map("""
+        S....
+        .....
+        ....T
+    """)
+    grid = parse_map(path)
+    good, cut = tmp_path / "good.txt", tmp_path / "cut.txt"
+    write_solution(grid, {(1, 1), (1, 2)}, good)
+    write_solution(grid, {(0, 1), (1, 0)}, cut)
+    assert main([path, str(good), str(cut)]) == 1   # one disconnects
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split("\t") == [str(good), "6", "2", "6"]
+    assert lines[1].split("\t")[1] == "disconnected"
+
+    piped = good.read_text() + "\n" + good.read_text()
+    monkeypatch.setattr(sys, "stdin", io.StringIO(piped))
+    assert main([path, "--json"]) == 0
+    recs = [json.loads(ln) for ln in capsys.readouterr().out.splitlines()]
+    assert [r["name"] for r in recs] == ["<stdin:0>", "<stdin:1>"]
+    assert all(r["maximin"] == 6 and r["walls"] == 2 for r in recs)
+
+
+def test_split_stdin_on_blank_lines():
+    assert split_stdin("a\nb\n\n\nc\n") == ["a\nb", "c"]
+    assert split_stdin("\n") == []
+
+
+def test_timing_report(make_map, tmp_path, capsys):
+    path = make_map("""
+        S..
+        ..T
+    """)
+    sol = tmp_path / "s.txt"
+    write_solution(parse_map(path), set(), sol)
+    assert main([path, str(sol), "--timing"]) == 0
+    err = capsys.readouterr().err
+    assert err.startswith("[timing] startup=") and "1 solutions" in err
+
+
+@pytest.mark.skipif(process_age() is None, reason="needs /proc")
+def test_startup_is_wall_clock_from_process_start():
+    # a sleep costs no CPU, so only a wall-clock startup includes it
+    code = ("import time\n"
+            "time.sleep(0.5)\n"
+            "from interdiction.evaluate import process_age\n"
+            "print(process_age())\n")
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    assert 0.5 <= float(out) < 5
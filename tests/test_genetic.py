@@ -0,0 +1,166 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from genetic_algorithm import (FitnessCache, apply_masks,
+                               create_random_chrom, evaluate_population,
+                               fitness, min_crossing_walls,
+                               repair_chromosome)
+from map_reader import read_map_file
+
+
+def _random_problem(rng, nrows, ncols, n_spawns=3, obstacle_prob=0.1):
+    cells = [(r, c) for r in range(nrows) for c in range(ncols)]
+    picked = rng.sample(cells, n_spawns + 1)
+    spawns, dst = picked[:-1], picked[-1]
+    rest = set(cells) - set(picked)
+    obstacles = {v for v in rest if rng.random() < obstacle_prob}
+    unbuildables = {v for v in rest - obstacles if rng.random() < 0.05}
+    return nrows, ncols, spawns, dst, obstacles, unbuildables
+
+
+def _problems():
+    rng = random.Random(3)
+    lines, spawns, dst, obstacles, unbuildables = \
+        read_map_file("maps/endless.txt")
+    yield len(lines), len(lines[0]), spawns, dst, obstacles, unbuildables
+    # one, two and three 64-bit words per bitboard row
+    for nrows, ncols in ((9, 63), (7, 64), (8, 65), (6, 130), (40, 3)):
+        yield _random_problem(rng, nrows, ncols)
+
+
+@pytest.mark.parametrize("problem", list(_problems()),
+                         ids=lambda p: f"{p[0]}x{p[1]}")
+def test_population_evaluation_matches_per_individual(problem):
+    nrows, ncols, spawns, dst, obstacles, unbuildables = problem
+    np.random.seed(0)
+    pop = np.stack([create_random_chrom(nrows, ncols, p, spawns, dst,
+                                        obstacles, unbuildables)
+                    for p in (0.0, 0.1, 0.25, 0.4) * 6])
+    before = [fitness(c, nrows, ncols, spawns, dst) for c in pop]
+    assert min(before) < 0          # some individuals need the repair
+    expected_rows = [repair_chromosome(c, nrows, ncols, spawns, dst,
+                                       obstacles, unbuildables) for c in pop]
+    expected = [fitness(c, nrows, ncols, spawns, dst)
+                for c in expected_rows]
+    got = evaluate_population(pop, nrows, ncols, spawns, dst, obstacles,
+                              unbuildables)
+    assert got.tolist() == expected
+    assert (pop == np.stack(expected_rows)).all()
+
+
+def _fewest_crossings(chrom, nrows, ncols, src, dst, obstacles):
+    """Dijkstra reference: walls crossed on the best src->dst path."""
+    cost = {src: 0}
+    pq = [(0, src)]
+    while pq:
+        k, (r, c) = heapq.heappop(pq)
+        if (r, c) == dst:
+            return k
+        if k > cost[(r, c)]:
+            continue
+        for v in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= v[0] < nrows and 0 <= v[1] < ncols \
+                    and v not in obstacles:
+                kv = k + int(chrom[v[0] * ncols + v[1]])
+                if kv < cost.get(v, kv + 1):
+                    cost[v] = kv
+                    heapq.heappush(pq, (kv, v))
+    return None
+
+
+def test_min_crossing_repair_only_opens_walls_and_reconnects():
+    rng = random.Random(11)
+    np.random.seed(11)
+    repaired = 0
+    for _ in range(40):
+        nrows, ncols, spawns, dst, obstacles, unbuildables = \
+            _random_problem(rng, rng.randint(4, 12), rng.randint(4, 12),
+                            n_spawns=rng.randint(1, 3), obstacle_prob=0.2)
+        if any(_fewest_crossings(np.zeros(nrows * ncols), nrows, ncols, s,
+                                 dst, obstacles) is None for s in spawns):
+            continue        # obstacles alone enclose a spawn
+        chrom = create_random_chrom(nrows, ncols, 0.45, spawns, dst,
+                                    obstacles, unbuildables)
+        opened = min_crossing_walls(chrom, nrows, ncols, spawns, dst,
+                                    obstacles)
+        # only walls of the chromosome, never an obstacle, get opened
+        assert all(chrom[i] == 1 for i in opened)
+        assert not {(i // ncols, i % ncols) for i in opened} & obstacles
+        # no spawn's path opens more walls than its fewest crossings
+        need = [_fewest_crossings(chrom, nrows, ncols, s, dst, obstacles)
+                for s in spawns]
+        assert len(opened) <= sum(need)
+        fixed = repair_chromosome(chrom, nrows, ncols, spawns, dst,
+                                  obstacles, unbuildables)
+        assert (fixed <= chrom).all()           # never adds a wall
+        assert fitness(fixed, nrows, ncols, spawns, dst) > 0
+        repaired += bool(opened)
+    assert repaired >= 10
+
+
+def test_repair_routes_around_obstacles_on_the_empty_grid_path():
+    # obstacles block the straight empty-grid path; the only way round
+    # enters column 3 at the bottom and leaves it at the top
+    nrows, ncols = 5, 7
+    spawns, dst = [(2, 0)], (2, 6)
+    obstacles = {(r, 2) for r in range(4)} | {(r, 4) for r in range(1, 5)}
+    chrom = np.zeros(nrows * ncols, dtype=np.uint8)
+    for r in range(nrows):
+        chrom[r * ncols + 3] = 1
+    chrom = apply_masks(chrom, nrows, ncols, spawns, dst, obstacles, set())
+    assert fitness(chrom, nrows, ncols, spawns, dst) < 0
+    opened = min_crossing_walls(chrom, nrows, ncols, spawns, dst, obstacles)
+    assert opened == {r * ncols + 3 for r in range(nrows)}
+    fixed = repair_chromosome(chrom, nrows, ncols, spawns, dst, obstacles,
+                              set())
+    assert fitness(fixed, nrows, ncols, spawns, dst) > 0
+
+
+def test_fitness_cache_hits_restore_the_repaired_chromosome():
+    nrows, ncols, spawns, dst, obstacles, unbuildables = \
+        _random_problem(random.Random(5), 10, 12)
+    args = (nrows, ncols, spawns, dst, obstacles, unbuildables)
+    np.random.seed(1)
+    cut = next(c for c in (create_random_chrom(nrows, ncols, 0.5, spawns,
+                                                dst, obstacles, unbuildables)
+                           for _ in range(100))
+               if fitness(c, nrows, ncols, spawns, dst) < 0)
+    fine = create_random_chrom(nrows, ncols, 0.0, spawns, dst, obstacles,
+                               unbuildables)
+    cache = FitnessCache(maxsize=10)
+    pop = np.stack([cut, cut, fine, cut])
+    fit, n = cache.evaluate(pop, *args)
+    assert n == 2                       # identical siblings run once
+    repaired = repair_chromosome(cut.copy(), *args)
+    assert (pop[[0, 1, 3]] == repaired).all() and (pop[2] == fine).all()
+    assert fit[0] == fit[1] == fit[3] == fitness(repaired, nrows, ncols,
+                                                  spawns, dst) > 0
+
+    again = np.stack([cut, fine])
+    fit2, n = cache.evaluate(again, *args)
+    assert n == 0                       # both served by the cache
+    assert (again[0] == repaired).all()
+    assert fit2.tolist() == [fit[0], fit[2]]
+
+
+def test_fitness_cache_is_a_bounded_lru():
+    nrows, ncols, spawns, dst, obstacles, unbuildables = \
+        _random_problem(random.Random(6), 8, 8, obstacle_prob=0.0)
+    args = (nrows, ncols, spawns, dst, obstacles, unbuildables)
+    np.random.seed(2)
+    pop = np.stack([create_random_chrom(nrows, ncols, 0.2, spawns, dst,
+                                        obstacles, unbuildables)
+                    for _ in range(6)])
+    assert len({row.tobytes() for row in pop}) == 6
+    cache = FitnessCache(maxsize=4)
+    cache.evaluate(pop[:4].copy(), *args)
+    cache.evaluate(pop[:1].copy(), *args)       # touch 0: 1 is now oldest
+    _fit, n = cache.evaluate(pop[4:].copy(), *args)
+    assert n == 2 and len(cache.entries) == 4
+    _fit, n = cache.evaluate(pop[[0, 3]].copy(), *args)
+    assert n == 0                               # kept: recently used
+    _fit, n = cache.evaluate(pop[[1, 2]].copy(), *args)
+    assert n == 2 and len(cache.entries) == 4   # evicted first
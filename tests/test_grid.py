@@ -1,6 +1,7 @@
 import pytest
 
-from interdiction.grid import parse_map, parse_solution, write_solution
+from interdiction.grid import (load_map, parse_map, parse_solution,
+                               parse_testcase, write_solution)
 
 
 def test_parse_symbols_and_derived_sets(make_map):
@@ -151,3 +152,23 @@ def test_parse_solution_hash_convention_ignores_base_obstacles(make_map):
 def test_parse_errors(make_map, text, msg):
     with pytest.raises(ValueError, match=msg):
         parse_map(make_map(text))
+
+
+def test_parse_testcase_json(tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text('{"grid_size": [3, 7], "nucleus": [1, 6], '
+                    '"spawns": [[1, 0]], "obstacles": [[0, 3], [2, 3]], '
+                    '"description": "ignored"}')
+    g = parse_testcase(str(path))
+    assert (g.rows, g.cols, g.target, g.spawns) == (3, 7, (1, 6), ((1, 0),))
+    assert g.obstacles == {(0, 3), (2, 3)}
+    assert load_map(str(path)) == g
+    assert g.evaluate(set())[0] == 6
+
+
+def test_parse_testcase_rejects_bad_cells(tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text('{"grid_size": [2, 2], "nucleus": [1, 1], '
+                    '"spawns": [[0, 5]], "obstacles": []}')
+    with pytest.raises(ValueError):
+        parse_testcase(str(path))
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from interdiction.grid import parse_map
+from interdiction.incremental import DistField
+
+
+@pytest.mark.parametrize("name", ["basic", "bridge", "smaller_endless"])
+def test_random_edits_match_full_bfs(name):
+    grid = parse_map(f"maps/{name}.txt")
+    rng = random.Random(0)
+    cells = sorted(grid.buildable)
+    df = DistField(grid)
+    for _ in range(400):
+        v = rng.choice(cells)
+        if v in df.walls:
+            df.remove_wall(v)
+        else:
+            df.add_wall(v)
+        assert df.dist == grid.dist_field(df.walls)
+    assert df.evaluate() == grid.evaluate(df.walls)
+
+
+def test_disconnect_and_reconnect(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ####..
+        T.....
+    """))
+    df = DistField(grid)
+    df.apply(add=[(0, 4), (1, 4)])
+    assert df.evaluate() == grid.evaluate(df.walls)
+    df.add_wall((2, 4))
+    df.add_wall((1, 5))
+    assert df.evaluate()[0] is None
+    assert df.dist == grid.dist_field(df.walls)
+    df.apply(remove=[(0, 4), (2, 4), (1, 4)])
+    assert df.dist == grid.dist_field(df.walls)
+    assert df.evaluate()[0] is not None
+    with pytest.raises(ValueError):
+        df.add_wall((1, 0))     # obstacle
@@ -0,0 +1,74 @@
+import numpy as np
+
+import islands
+from genetic_algorithm import FitnessCache, fitness, run_ga
+from islands import migrate, run_island, run_islands
+
+
+def _islands(k, size=5, genes=4):
+    # island i's individual j is all 10*i + j, with fitness 10*i + j
+    pops = [np.full((size, genes), 10 * i, dtype=np.uint8)
+            + np.arange(size, dtype=np.uint8)[:, None] for i in range(k)]
+    fits = [np.arange(size, dtype=float) + 10 * i for i in range(k)]
+    return pops, fits
+
+
+def test_migrants_replace_the_next_islands_worst():
+    pops, fits = _islands(3)
+    before = [p.copy() for p in pops]
+    migrate(pops, fits, 2)
+    for i in range(3):
+        src = (i - 1) % 3           # the ring: i-1 sends to i
+        # the two worst (slots 0, 1) now hold the sender's two best,
+        # fitness carried along; sent before any island received
+        assert sorted(fits[i][:2]) == [10 * src + 3, 10 * src + 4]
+        for j in (0, 1):
+            assert (pops[i][j] == fits[i][j]).all()
+        assert (pops[i][2:] == before[i][2:]).all()
+        assert fits[i][2:].tolist() == [10 * i + 2, 10 * i + 3, 10 * i + 4]
+
+
+def test_no_migration_with_one_island_or_no_migrants():
+    for k, migrants in ((1, 2), (3, 0)):
+        pops, fits = _islands(k)
+        before = [(p.copy(), f.copy()) for p, f in zip(pops, fits)]
+        migrate(pops, fits, migrants)
+        for (p0, f0), p, f in zip(before, pops, fits):
+            assert (p0 == p).all() and (f0 == f).all()
+
+
+def test_run_islands_reports_every_epoch():
+    spawns, dst = [(0, 0)], (5, 5)
+    best, score, history = run_islands(
+        6, 6, spawns, dst, islands=2, generations=5, migrate_every=2,
+        migrants=1, pop_size=8, workers=1, seed=0, verbose=False)
+    assert [h[0] for h in history] == [2, 4, 5]
+    assert all(len(h[3]) == 2 for h in history)
+    assert score == history[-1][2] == max(history[-1][3])
+    assert fitness(best, 6, 6, spawns, dst) == score
+
+
+def test_carried_fitness_and_cache_skip_reevaluation():
+    problem = (6, 6, [(0, 0)], (5, 5), set(), set())
+    first = {}
+    run_ga(*problem, pop_size=8, generations=2, seed=0, verbose=False,
+           stats=first)
+    assert first["evaluations"] > 0
+    again = {}
+    cache = FitnessCache(100)
+    run_ga(*problem, generations=0, verbose=False, init_pop=first["pop"],
+           init_fits=first["fitness"], cache=cache, stats=again)
+    assert again["evaluations"] == 0 and again["cache"] is cache
+    assert (again["fitness"] == first["fitness"]).all()
+
+
+def test_island_worker_keeps_its_cache_within_a_run(monkeypatch):
+    monkeypatch.setattr(islands, "_cache", None)
+    problem = (6, 6, [(0, 0)], (5, 5), set(), set())
+    pop, fits, _b, _s = run_island(problem, None, None, 2, 0,
+                                   {"pop_size": 8}, run_id="a")
+    cache = islands._cache[1]
+    run_island(problem, pop, fits, 2, 1, {}, run_id="a")
+    assert islands._cache[1] is cache
+    run_island(problem, pop, fits, 2, 1, {}, run_id="b")
+    assert islands._cache[1] is not cache
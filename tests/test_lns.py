@@ -1,7 +1,14 @@
+import json
 import random
 
+from interdiction.contract import contract
 from interdiction.grid import parse_map
-from interdiction.lns import _pick_center, _window_cells, run_lns
+from interdiction.lns import (ArmSelector, MemoEntry, TimeScheduler,
+                              WindowMemo, _band_cells, _pair_cells,
+                              _pair_squares, _path_neighborhood,
+                              _pick_center, _window_cells, lns_arms, run_lns)
+from interdiction.master import SolveResult
+from interdiction.telemetry import Telemetry
 
 
 def test_window_cells_clipped_to_grid(make_map):
@@ -50,3 +57,212 @@ def test_lns_no_hints_also_improves():
     res = run_lns(grid, set(), total_time=15.0, subsolve_time=5.0, rng=rng,
                   corridor_hint=False)
     assert res.maximin > baseline
+
+
+def test_arm_selector_tries_every_arm_then_exploits():
+    arms = lns_arms((6, 8), corridor_hint=True)
+    # 2 sizes x (2 square centers + 3 path shapes) x hint on/off
+    assert len(arms) == 20
+    assert len(lns_arms((6, 8), corridor_hint=False)) == 10
+    sel = ArmSelector(arms)
+    rng = random.Random(0)
+    seen = set()
+    for _ in range(len(arms)):
+        arm = sel.pick(rng)
+        seen.add(arm)
+        # only one arm ever pays off
+        sel.update(arm, 5 if arm == arms[0] else 0, 1.0)
+    assert seen == set(arms)
+    picks = []
+    for _ in range(40):
+        arm = sel.pick(rng)
+        picks.append(arm)
+        sel.update(arm, 5 if arm == arms[0] else 0, 1.0)
+    assert picks.count(arms[0]) > len(picks) // 2
+    stats = dict(sel.summary())
+    assert stats[arms[0]].wins == stats[arms[0]].pulls
+    assert stats[arms[1]].gain == 0 and stats[arms[1]].rate() == 0.0
+
+
+def test_lns_reports_arm_stats():
+    grid = parse_map("maps/basic.txt")
+    res = run_lns(grid, set(), total_time=8.0, subsolve_time=2.0,
+                  rng=random.Random(0), window_sizes=(4, 6))
+    pulls = sum(st.pulls for _arm, st in res.arm_stats)
+    assert pulls > 0
+    assert sum(st.gain for _arm, st in res.arm_stats) == \
+        res.maximin - res.trajectory[0][2]
+
+
+def test_memo_entry_proof_of_no_gain():
+    assert MemoEntry("OPTIMAL", 10, 10, 1.0).proves_no_gain(10)
+    assert not MemoEntry("OPTIMAL", 12, 12, 1.0).proves_no_gain(10)
+    # hinted windows report infeasibility with a -inf bound
+    assert MemoEntry("NO_SOLUTION", None, float("-inf"), 1.0) \
+        .proves_no_gain(10)
+    assert not MemoEntry("TIME_LIMIT", 10, 40.5, 1.0).proves_no_gain(10)
+
+
+def test_memo_keys_the_graph_and_records_time_spent(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        .....T
+    """))
+    window = _window_cells(grid, (1, 2), 2)
+    a = contract(grid, window, set())
+    b = contract(grid, window, {(0, 5)})    # outside wall: same graph
+    c = contract(grid, window, {(1, 0)})    # reroutes the spawn's edges
+    assert isinstance(a.signature(), frozenset)
+    assert WindowMemo.key(a, True, False) == WindowMemo.key(b, True, False)
+    assert WindowMemo.key(a, True, False) != WindowMemo.key(c, True, False)
+    memo = WindowMemo()
+    key = WindowMemo.key(a, True, False)
+    # an extended solve ran past its soft limit: the memo keeps the seconds
+    memo.record(key, SolveResult("TIME_LIMIT", set(), 5, (5,), 9.0,
+                                 runtime=7.5))
+    assert memo.get(key).seconds == 7.5
+
+
+def test_memo_skips_repeated_windows_on_tiny_map(make_map):
+    # every window covers the whole map, so after the first proof every
+    # later pick is the same subproblem
+    grid = parse_map(make_map("""
+        S...
+        ....
+        ...T
+    """))
+    res = run_lns(grid, set(), total_time=4.0, subsolve_time=2.0,
+                  rng=random.Random(0), window_sizes=(8,),
+                  corridor_hint=False)
+    assert res.memo_lookups > 2
+    assert res.memo_skips >= res.memo_lookups - 2
+
+
+def test_time_scheduler_tightens_only_for_sizes_that_prove():
+    sched = TimeScheduler(base=10.0, cap=40.0)
+    assert sched.limit(12) == 10.0
+    for rt in (0.2, 0.3, 0.25, 0.4):
+        sched.record(12, SolveResult("OPTIMAL", set(), 5, (5,), 5.0,
+                                     runtime=rt))
+        sched.record(20, SolveResult("TIME_LIMIT", set(), 5, (5,), 90.0,
+                                     runtime=10.0))
+    assert sched.limit(12) == 0.8           # 2 x p90 proof time
+    assert sched.limit(20) == 10.0          # never proves: keep the base
+    (size, n, proved, _median, limit), _ = sched.summary()
+    assert (size, n, proved, limit) == (12, 4, 1.0, 0.8)
+
+
+def test_screen_rejects_windows_that_cannot_improve(make_map):
+    # X cells pin the only route; windows on the dead-end row can't help
+    grid = parse_map(make_map("""
+        S....
+        XXXX.
+        ....T
+    """))
+    res = run_lns(grid, set(), total_time=3.0, subsolve_time=1.0,
+                  rng=random.Random(0), window_sizes=(2,),
+                  corridor_hint=False)
+    assert res.screen_rejects > 0
+    assert res.maximin == 6
+
+
+def test_band_follows_path_until_budget(make_map):
+    g = parse_map(make_map("""
+        S.........
+        ..........
+        ..........
+        ..........
+        .........T
+    """))
+    path = g.shortest_path(set(), g.spawns[0])
+    band = _band_cells(g, path, 6, budget=20, radius=1)
+    assert len(band) >= 20
+    # the band is a neighborhood of a contiguous stretch through the start
+    on_path = [i for i, v in enumerate(path) if v in band]
+    assert 6 in on_path
+    assert on_path == list(range(on_path[0], on_path[-1] + 1))
+    # never more than the whole path's band
+    full = _band_cells(g, path, 0, budget=10 ** 6, radius=1)
+    assert band <= full
+
+
+def test_path_neighborhood_covers_every_spawn_path(make_map):
+    g = parse_map(make_map("""
+        S...T
+        .....
+        S....
+    """))
+    _, per = g.evaluate(set())
+    rng = random.Random(0)
+    band = _path_neighborhood(g, set(), per, rng, 2, "band")
+    assert band & set(g.shortest_path(set(), g.spawns[0]))
+    bands = _path_neighborhood(g, set(), per, rng, 2, "bands")
+    for s in g.spawns:
+        assert s in bands or bands & set(g.shortest_path(set(), s))
+
+
+def test_pair_regions_are_disjoint_squares_on_the_path(make_map):
+    g = parse_map(make_map("""
+        S.........
+        ..........
+        ..........
+        .........T
+    """))
+    path = g.shortest_path(set(), g.spawns[0])
+    rng = random.Random(2)
+    for _ in range(50):
+        first, second = _pair_squares(g, path, rng, 4)
+        for sq in (first, second):
+            # a side-3 square around a path cell, clipped at the edges
+            assert 4 <= len(sq) <= 9 and sq & set(path)
+            rows, cols = {r for r, _c in sq}, {c for _r, c in sq}
+            assert len(sq) == len(rows) * len(cols) and len(rows) <= 3 \
+                and len(cols) <= 3
+        assert not first & second
+    assert _pair_cells(g, path, random.Random(2), 4) == \
+        set().union(*_pair_squares(g, path, random.Random(2), 4))
+
+
+class _FakeExchange:
+    def __init__(self, walls, val):
+        self.pending = (walls, None, val)
+        self.offers = []
+        self.polls = 0
+        self.pool_size = 17
+
+    def offer(self, walls, anchors, maximin):
+        self.offers.append(maximin)
+
+    def poll(self):
+        self.polls += 1
+        got, self.pending = self.pending, None
+        return got
+
+    def done(self):
+        return self.polls >= 3
+
+
+def test_lns_adopts_exchange_incumbent_and_stops_when_done(make_map,
+                                                           tmp_path):
+    grid = parse_map(make_map("""
+        S......
+        .......
+        .......
+        ......T
+    """))
+    walls = {(0, 1), (1, 1), (2, 1), (1, 3), (2, 3), (3, 3)}
+    val, _ = grid.evaluate(walls)
+    assert val > grid.evaluate(set())[0]
+    ex = _FakeExchange(walls, val)
+    with Telemetry(tmp_path / "t.jsonl") as tel:
+        res = run_lns(grid, set(), total_time=60.0, subsolve_time=2.0,
+                      rng=random.Random(0), window_sizes=(4,), exchange=ex,
+                      telemetry=tel)
+    assert res.maximin >= val
+    assert res.trajectory[1][2] == val
+    assert ex.polls == 3
+    assert all(v > val for v in ex.offers)
+    recs = [json.loads(ln) for ln in
+            (tmp_path / "t.jsonl").read_text().splitlines()]
+    assert recs and all(r["pool"] == 17 for r in recs)
@@ -0,0 +1,79 @@
+import random
+
+from interdiction.cli import main
+from interdiction.grid import load_map, parse_map, parse_solution, \
+    tile2_decompose
+from interdiction.multilevel import coarsen, multilevel_seed, project
+
+
+def test_coarsen_classifies_supercells(make_map):
+    grid = parse_map(make_map("""
+        S.##.
+        ..##X
+        ....S
+        .T...
+        S....
+    """))
+    c = coarsen(grid, 2)
+    assert (c.rows, c.cols) == (3, 3)
+    assert c.target == (1, 0)
+    # (4, 0) shares no supercell with T; (0, 0) and (2, 4) keep their own
+    assert c.spawns == ((0, 0), (1, 2), (2, 0))
+    assert c.obstacles == {(0, 1)}
+    assert c.unbuildables == {(0, 2)}       # holds the X
+    assert (1, 1) in c.buildable and (2, 2) in c.buildable
+
+
+def test_coarsen_drops_spawns_in_the_target_supercell(make_map):
+    grid = parse_map(make_map("""
+        ST..
+        ....
+        ...S
+    """))
+    c = coarsen(grid, 2)
+    assert c.target == (0, 0) and c.spawns == ((1, 1),)
+
+
+def test_coarse_endless_keeps_every_spawn_connected():
+    grid = load_map("maps/endless.txt")
+    c = coarsen(grid, 2)
+    assert (c.rows, c.cols) == (30, 30)
+    assert len(c.spawns) == len(grid.spawns)
+    assert c.evaluate(set())[0] is not None
+
+
+def test_projection_walls_whole_supercells_and_stays_connected():
+    grid = load_map("maps/endless.txt")
+    c = coarsen(grid, 2)
+    coarse_walls = {v for v in c.buildable if v[1] % 2 == 1 and v[0] != 0}
+    walls = project(grid, coarse_walls, 2)
+    assert walls <= grid.buildable
+    assert grid.evaluate(walls)[0] is not None
+    walls2 = project(grid, coarse_walls, 2, blocks2=True)
+    tile2_decompose(walls2)
+    assert grid.evaluate(walls2)[0] is not None
+
+
+def test_multilevel_seed_runs_coarse_lns():
+    grid = load_map("maps/smaller_endless.txt")
+    walls, history = multilevel_seed(grid, factor=2, levels=2,
+                                     total_time=6.0, rng=random.Random(0),
+                                     subsolve_time=1.0, window_sizes=(6, 8))
+    assert [h[:2] for h in history] == [(10, 10), (19, 19)]
+    assert all(end >= start for _r, _c, start, end, _t in history)
+    assert grid.evaluate(walls)[0] > grid.evaluate(set())[0]
+
+
+def test_cli_multilevel_seeds_lns(make_map, tmp_path, capsys):
+    path = make_map("\n".join(["S" + "." * 11] + ["." * 12] * 6
+                              + ["." * 11 + "T"]))
+    out_file = str(tmp_path / "sol.txt")
+    assert main([path, "--multilevel", "2", "--levels", "1",
+                 "--time", "8", "--coarse-frac", "0.5",
+                 "--bound-mode", "sequential", "--bound-frac", "0.2",
+                 "--subsolve-time", "1", "--window-sizes", "4,6",
+                 "--no-corridor-hint", "--out", out_file]) == 0
+    out = capsys.readouterr().out
+    assert "[multilevel] 4x6: maximin" in out
+    grid = parse_map(path)
+    assert grid.evaluate(parse_solution(grid, out_file))[0] is not None
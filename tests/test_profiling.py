@@ -0,0 +1,58 @@
+import pytest
+
+from interdiction import profiling
+from interdiction.cli import main
+from interdiction.contract import contract
+from interdiction.grid import parse_map
+from interdiction.lns import _window_cells
+from interdiction.window_master import solve_window
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def _window_solve():
+    grid = parse_map("maps/basic.txt")
+    window = _window_cells(grid, (3, 3), 4)
+    cw = contract(grid, window, set())
+    return solve_window(cw, time_limit=5, corridor_hint=False)
+
+
+def test_disabled_collects_nothing():
+    assert profiling.timer("x") is profiling.timer("y")
+    _window_solve()
+    assert profiling.report() == []
+
+
+def test_enabled_times_hot_paths():
+    profiling.enable()
+    res = _window_solve()
+    rows = {name: (calls, secs) for name, calls, secs in profiling.report()}
+    assert rows["contract"][0] == 1
+    assert rows["window.optimize"][0] == 1
+    assert rows["window.callback"][0] == res.callbacks
+    assert rows["window.build"][1] == pytest.approx(res.build_time)
+    assert rows["contract.portals"][1] is None
+    assert "window.callback" in profiling.format_report()
+
+
+def test_cli_profile_table_and_dumps(make_map, tmp_path, capsys):
+    path = make_map("""
+        S......
+        .......
+        ......T
+    """)
+    dump = tmp_path / "prof"
+    assert main([path, "--time", "4", "--bound-mode", "sequential",
+                 "--subsolve-time", "1", "--window-sizes", "4",
+                 "--profile", "--profile-dump", str(dump),
+                 "--out", str(tmp_path / "sol.txt")]) == 0
+    out = capsys.readouterr().out
+    assert "phase.lns" in out and "master.callback" in out
+    assert (dump / "lns.prof").exists() and (dump / "bound.prof").exists()
+    assert not profiling.ENABLED
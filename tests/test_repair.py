@@ -0,0 +1,62 @@
+import random
+
+from interdiction.contract import contract
+from interdiction.grid import parse_map, square2
+from interdiction.lns import run_lns
+from interdiction.repair import repair_window
+
+
+def test_repair_improves_empty_window_and_is_exact(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        ......
+        .....T
+    """))
+    window = {(r, c) for r in range(4) for c in range(6)}
+    cw = contract(grid, window, set())
+    res = repair_window(cw, rng=random.Random(0))
+    assert res.status == "HEURISTIC"
+    assert res.walls <= cw.free
+    val, per = grid.evaluate(res.walls)
+    assert val == res.maximin and per == res.per_spawn
+    assert res.maximin > grid.evaluate(set())[0]
+
+
+def test_repair_never_worse_than_destroyed_start(make_map):
+    grid = parse_map("maps/basic.txt")
+    walls = {(r, 1) for r in range(6)}
+    seed_val, _ = grid.evaluate(walls)
+    window = {(r, c) for r in range(7) for c in range(3)}
+    cw = contract(grid, window, set())
+    for seed in range(5):
+        res = repair_window(cw, rng=random.Random(seed), warm_start=walls,
+                            iters=50)
+        assert grid.evaluate(res.walls)[0] == res.maximin
+
+
+def test_repair_blocks2_keeps_tiling(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        ......
+        .....T
+    """))
+    window = {(r, c) for r in range(4) for c in range(1, 5)}
+    cw = contract(grid, window, set())
+    res = repair_window(cw, rng=random.Random(1), blocks2=True,
+                        warm_anchors=set())
+    tiles = [v for a in res.anchors for v in square2(a)]
+    assert len(tiles) == len(set(tiles)) and set(tiles) == res.walls
+    assert res.walls <= cw.free
+
+
+def test_lns_with_repair_only_improves():
+    grid = parse_map("maps/basic.txt")
+    baseline, _ = grid.evaluate(set())
+    res = run_lns(grid, set(), total_time=3.0, rng=random.Random(0),
+                  window_sizes=(4, 6), repair_ratio=1.0)
+    assert res.maximin > baseline
+    assert res.repair_stats.pulls > 0
+    assert res.repair_stats.gain == res.maximin - baseline
+    assert all(st.pulls == 0 for _arm, st in res.arm_stats)
@@ -0,0 +1,102 @@
+import pytest
+
+from interdiction.archive import EliteArchive
+from interdiction.cli import main
+from interdiction.grid import parse_map, square2, tile2_decompose
+from interdiction.seedgen import STYLES, connect, generate, realize
+
+
+@pytest.mark.parametrize("style", STYLES)
+@pytest.mark.parametrize("blocks2", [False, True])
+def test_seeds_are_feasible_and_beat_empty(style, blocks2):
+    grid = parse_map("maps/bridge.txt")
+    walls, val, n = generate(grid, style, blocks2=blocks2)
+    assert n > 1
+    assert walls <= grid.buildable
+    assert grid.evaluate(walls)[0] == val
+    assert val > grid.evaluate(set())[0]
+    if blocks2:
+        anchors = tile2_decompose(walls)
+        assert {v for a in anchors for v in square2(a)} == walls
+
+
+def test_serpentine_bridge_beats_hand_comb_seed():
+    grid = parse_map("maps/bridge.txt")
+    _walls, val, _n = generate(grid, "serpentine")
+    assert val > 300     # maps/bridge_comb_seed.txt scores 218
+
+
+def test_connect_clears_whole_blocks_around_a_cut_spawn(make_map):
+    grid = parse_map(make_map("""
+        ..S...
+        ..#...
+        ......
+        .....T
+    """))
+    mask = {(r, c) for r in range(2) for c in range(6)}
+    owner = realize(grid, mask, blocks2=True)
+    assert set(owner.values()) == {(0, 0), (0, 3)}
+    assert grid.evaluate(set(owner))[0] is None
+    walls = connect(grid, owner)
+    assert grid.evaluate(walls)[0] is not None
+    assert len(tile2_decompose(walls)) == 1     # one block cleared, whole
+
+
+def test_connect_keeps_base_walls(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        .....T
+    """))
+    base = {(0, 1)}
+    owner = realize(grid, {(1, 0), (1, 1), (1, 2)}, base=base)
+    walls = connect(grid, owner, base)
+    assert base <= walls
+    assert grid.evaluate(walls)[0] is not None
+
+
+def test_connect_routes_around_base_walls(make_map):
+    grid = parse_map(make_map("""
+        S.....
+        ......
+        .....T
+    """))
+    base = {(0, 1), (1, 1)}
+    owner = realize(grid, {(1, 0), (2, 0), (2, 1)}, base=base)
+    walls = connect(grid, owner, base)
+    assert base <= walls
+    assert grid.evaluate(walls)[0] is not None
+    # a spawn the base walls cut off stays cut off
+    base = {(0, 1), (1, 0), (1, 1)}
+    walls = connect(grid, realize(grid, {(2, 0)}, base=base), base)
+    assert walls == base | {(2, 0)}
+
+
+def test_comb_sweep_stays_small():
+    grid = parse_map("maps/bridge.txt")
+    assert generate(grid, "comb")[2] == 13
+    assert generate(grid, "comb", blocks2=True)[2] == 16
+
+
+def test_cli_seed_gen_feeds_initial_walls(capsys):
+    assert main(["maps/bridge.txt", "--seed-gen", "serpentine",
+                 "--eval-only", "--bound-method", "none"]) == 0
+    out = capsys.readouterr().out
+    _walls, val, _n = generate(parse_map("maps/bridge.txt"), "serpentine")
+    assert f"maximin: {val}" in out
+    with pytest.raises(SystemExit):
+        main(["maps/bridge.txt", "--seed-gen", "comb", "--seed", "x.txt"])
+
+
+def test_cli_seed_gen_falls_back_to_a_better_archive(tmp_path, capsys):
+    grid = parse_map("maps/bridge.txt")
+    walls, val, _n = generate(grid, "serpentine")
+    archive = EliteArchive(grid)
+    archive.add(walls)
+    archive.save(tmp_path / "bridge.elites")
+    assert main(["maps/bridge.txt", "--seed-gen", "spiral", "--eval-only",
+                 "--bound-method", "none",
+                 "--archive", str(tmp_path / "bridge.elites")]) == 0
+    out = capsys.readouterr().out
+    assert "worse than the archive" in out
+    assert f"maximin: {val}" in out
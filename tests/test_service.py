@@ -0,0 +1,92 @@
+import http.client
+import io
+import json
+import threading
+import urllib.request
+
+from interdiction.service import EvalService, make_http_server, serve_lines
+
+TINY = "S....\n.....\n....T\n"
+
+
+def test_ops_track_walls_incrementally():
+    svc = EvalService()
+    r = svc.handle({"op": "load", "text": TINY, "name": "t", "id": 7})
+    assert r["ok"] and r["id"] == 7 and r["maximin"] == 6
+    r = svc.handle({"op": "delta", "name": "t", "add": [[1, 1], [1, 2]]})
+    assert (r["maximin"], r["walls"]) == (6, 2)
+    r = svc.handle({"op": "delta", "name": "t", "add": [[0, 1]],
+                    "remove": [[1, 2]], "paths": True})
+    assert r["maximin"] == 6 and r["walls"] == 2
+    path = r["paths"][0]
+    assert path[0] == [0, 0] and path[-1] == [2, 4] and len(path) == 7
+    r = svc.handle({"op": "set", "name": "t", "walls": [[0, 1], [1, 0]]})
+    assert r["maximin"] is None and r["per_spawn"] == [None]
+    r = svc.handle({"op": "delta", "name": "t", "add": [[0, 0]]})
+    assert not r["ok"] and "not buildable" in r["error"]
+    assert not svc.handle({"op": "eval", "name": "nope"})["ok"]
+    stats = svc.handle({"op": "stats"})["latency_ms"]
+    assert stats["delta"]["n"] == 2 and "p99" in stats["delta"]
+
+
+def test_malformed_requests_are_errors_not_crashes():
+    svc = EvalService()
+    assert svc.handle({"op": "load", "text": TINY, "name": "t"})["ok"]
+    bad = [
+        {"op": "eval", "name": ["t"]},
+        {"op": "eval", "name": {"a": 1}},
+        {"op": "unload"},
+        {"op": "load", "text": TINY},               # no name to keep it by
+        {"op": "load", "text": 5, "name": "x"},
+        {"op": "load", "text": TINY, "name": [1]},
+        {"op": "load", "map": ["maps/basic.txt"]},
+        {"op": "delta", "name": "t", "add": 3},
+        {"op": "set", "name": "t", "walls": [[1]]},
+        [1, 2],
+        None,
+    ]
+    for req in bad:
+        r = svc.handle(req)
+        assert not r["ok"] and r["error"], req
+    assert list(svc.maps) == ["t"]
+    assert svc.handle({"op": "eval", "name": "t"})["maximin"] == 6
+
+
+def test_json_lines_loop():
+    fin = io.StringIO(json.dumps({"op": "load", "text": TINY, "name": "t"})
+                      + "\nnot json\n\n"
+                      + json.dumps({"op": "eval", "name": "t"}) + "\n")
+    fout = io.StringIO()
+    serve_lines(EvalService(), fin, fout)
+    resps = [json.loads(ln) for ln in fout.getvalue().splitlines()]
+    assert [r["ok"] for r in resps] == [True, False, True]
+    assert resps[2]["maximin"] == 6
+
+
+def test_http_roundtrip():
+    server = make_http_server(EvalService(), 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    try:
+        def post(req):
+            data = json.dumps(req).encode()
+            with urllib.request.urlopen(url, data) as resp:
+                return json.loads(resp.read())
+
+        assert post({"op": "load", "text": TINY, "name": "t"})["ok"]
+        assert post({"op": "delta", "name": "t",
+                     "add": [[1, 1]]})["maximin"] == 6
+        with urllib.request.urlopen(url + "stats") as resp:
+            assert "delta" in json.loads(resp.read())["latency_ms"]
+        for length in ("abc", "-5"):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+            conn.putrequest("POST", "/")
+            conn.putheader("Content-Length", length)
+            conn.endheaders()
+            resp = conn.getresponse()
+            assert resp.status == 400
+            assert json.loads(resp.read())["error"] == "bad Content-Length"
+            conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
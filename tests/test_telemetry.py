@@ -0,0 +1,47 @@
+import json
+import random
+
+from interdiction.cli import main
+from interdiction.grid import parse_map
+from interdiction.lns import run_lns
+from interdiction.telemetry import Telemetry, format_summary, summarize
+
+
+def test_lns_writes_one_window_record_per_iteration(tmp_path):
+    grid = parse_map("maps/basic.txt")
+    path = tmp_path / "t.jsonl"
+    with Telemetry(path) as tel:
+        res = run_lns(grid, set(), total_time=5.0, subsolve_time=1.0,
+                      rng=random.Random(0), window_sizes=(4, 6),
+                      telemetry=tel)
+    recs = [json.loads(ln) for ln in path.read_text().splitlines()]
+    assert [r["iter"] for r in recs] == list(range(1, len(recs) + 1))
+    assert recs[-1]["best"] == res.maximin
+    assert sum(r["accepted"] for r in recs) == len(res.trajectory) - 1
+    assert all(r["pool"] is None for r in recs)     # no concurrent bound
+    mip = [r for r in recs
+           if r["mode"] == "mip" and r["outcome"] not in
+           ("memo_skip", "screen_reject")]
+    assert mip and all(r["callbacks"] >= 1 and r["build"] >= 0
+                       for r in mip)
+
+    s = summarize(path)
+    assert s["windows"] == len(recs)
+    assert abs(sum(s["parts"].values()) - s["window_seconds"]) < 1e-6
+    assert "gurobi" in format_summary(s)
+
+
+def test_cli_telemetry_records_phases(make_map, tmp_path):
+    path = make_map("""
+        S......
+        .......
+        ......T
+    """)
+    tel = tmp_path / "t.jsonl"
+    assert main([path, "--time", "4", "--bound-mode", "sequential",
+                 "--subsolve-time", "1", "--window-sizes", "4",
+                 "--telemetry", str(tel),
+                 "--out", str(tmp_path / "sol.txt")]) == 0
+    s = summarize(tel)
+    assert set(s["phases"]) == {"bounds", "lns", "bound"}
+    assert s["windows"] > 0
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from solver import compute_distances, place_piece, read_map_file, score_of
+from tempering import ladder, run_replica, swap_probability
+
+
+def test_ladder_is_geometric_between_the_endpoints():
+    temps = ladder(0.1, 2.0, 5)
+    assert temps[0] == pytest.approx(0.1) and temps[-1] == pytest.approx(2.0)
+    ratios = [b / a for a, b in zip(temps, temps[1:])]
+    assert ratios == pytest.approx([20 ** 0.25] * 4)
+    assert ladder(0.1, 2.0, 1) == [0.1]
+
+
+def test_swap_probability_sign():
+    cold, hot = 0.5, 2.0
+    # the better state sits at the hotter temperature: always move it down
+    assert swap_probability(10, 14, cold, hot) == 1.0
+    assert swap_probability(10, 10, cold, hot) == 1.0
+    # the better state is already cold: swap it up only sometimes
+    p = swap_probability(14, 10, cold, hot)
+    assert p == pytest.approx(math.exp(-4 * (1 / cold - 1 / hot)))
+    assert 0 < p < 1
+    assert swap_probability(14, 10, cold, hot) == \
+        swap_probability(10, 14, hot, cold)
+
+
+def test_replica_round_returns_its_chain_state():
+    lines, spawns, target, obstacles, unbuildables = \
+        read_map_file("maps/basic.txt")
+    problem = (lines, spawns, target, obstacles, unbuildables)
+    pieces, score, best_grid, best_score, its = run_replica(
+        problem, [], 0.5, 0.3, 1, "path", 0.9)
+    assert its > 0
+    grid = [list(row) for row in lines]
+    for coords, symbol in pieces:
+        place_piece(grid, coords, symbol)
+    assert score == score_of(compute_distances(grid, target), spawns)
+    assert best_score >= score
+    assert best_score == score_of(compute_distances(best_grid, target),
+                                  spawns)
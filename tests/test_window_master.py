@@ -2,6 +2,7 @@ import random
 
 import pytest
 
+from interdiction import window_master
 from interdiction.contract import contract
 from interdiction.grid import parse_map
 from interdiction.master import MasterSolver
@@ -106,3 +107,62 @@ def test_warm_start_accepted(make_map):
     again = solve_window(cw, time_limit=60, corridor_hint=False,
                          warm_start=ref.walls)
     assert again.maximin == ref.maximin
+
+
+def test_bound_stop_proves_no_gain_early(make_map):
+    # the open 6x8 map takes far longer than the test to prove optimal,
+    # but capping z at 20 puts the root bound below an incumbent of 30,
+    # so BestBdStop must end the solve at once
+    grid = parse_map(make_map("""
+        S.......
+        ........
+        ........
+        ........
+        ........
+        .......T
+    """))
+    cw = contract(grid, _window(grid, 0, 0, 8), set())
+    res = solve_window(cw, time_limit=30, corridor_hint=False,
+                       bound_stop=30, maximin_ub=20)
+    assert res.status == "BOUND_STOP"
+    assert res.bound <= 20
+    assert res.runtime < 5
+
+
+def test_soft_limit_extension_never_exceeds_cap(make_map, monkeypatch):
+    # the open 6x8 map cannot be proved optimal in a second; with the
+    # staleness rule disabled the solve must run past the soft limit
+    # and stop at the extend_to cap
+    monkeypatch.setattr(window_master, "STALE_FRAC", 1e9)
+    grid = parse_map(make_map("""
+        S.......
+        ........
+        ........
+        ........
+        ........
+        .......T
+    """))
+    cw = contract(grid, _window(grid, 0, 0, 8), set())
+    res = solve_window(cw, time_limit=0.2, extend_to=1.0,
+                       corridor_hint=False)
+    assert res.status == "TIME_LIMIT"
+    assert res.runtime > 0.8            # extended past the soft limit
+    assert res.runtime <= 1.5           # but not past the cap
+
+
+def test_window_solve_over_two_regions(make_map):
+    grid = parse_map(make_map("""
+        S......
+        .......
+        .......
+        ......T
+    """))
+    window = _window(grid, 0, 0, 2) | _window(grid, 2, 4, 2)
+    free = window & grid.buildable
+    master = MasterSolver(grid, rng=random.Random(0))
+    ref = master.solve(free=free, fixed_walls=set(), time_limit=60)
+    got = solve_window(contract(grid, window, set()), time_limit=60,
+                       corridor_hint=False)
+    assert got.status == "OPTIMAL" and ref.status == "OPTIMAL"
+    assert got.maximin == ref.maximin
+    assert grid.evaluate(got.walls)[0] == got.maximin